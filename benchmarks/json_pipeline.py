@@ -0,0 +1,134 @@
+"""
+Benchmark of the JSON handling of REST API requests and responses
+
+Compares the previous text based pipeline (request bodies dumped to `str`
+which httpx then encodes again, responses decoded to `str` before parsing,
+and non-native types encoded by walking the MRO for every single value) with
+the bytes based one used now (`json.dumps_bytes` and `json.loads` of the raw
+response content, with encoders cached per type).
+
+The response is a page of SuiteQL results, the request a bulk payload with
+`Decimal` amounts and dates, which need a custom encoder.
+
+Run with: python benchmarks/json_pipeline.py [number of rows]
+"""
+
+import datetime
+import sys
+import time
+from decimal import Decimal
+
+import httpx
+
+from netsuite import json
+
+COLUMNS_PER_ROW = 20
+
+
+def make_suiteql_page(num_rows: int) -> bytes:
+    items = [
+        {
+            "links": [],
+            "id": str(i),
+            "tranid": f"SO{i}",
+            "trandate": "4/3/2021",
+            "memo": f"Order number {i} – åäö",
+            **{f"custbody_{column}": str(i * column) for column in range(16)},
+        }
+        for i in range(num_rows)
+    ]
+    return json.dumps_bytes(
+        {
+            "links": [],
+            "count": num_rows,
+            "hasMore": True,
+            "items": items,
+            "offset": 0,
+            "totalResults": num_rows * 10,
+        }
+    )
+
+
+def make_bulk_payload(num_rows: int) -> list:
+    return [
+        {
+            "externalId": f"SO{i}",
+            "tranDate": datetime.date(2021, 3, 4),
+            "item": {
+                "items": [
+                    {"item": {"id": str(line)}, "rate": Decimal(f"{line}.95")}
+                    for line in range(10)
+                ]
+            },
+        }
+        for i in range(num_rows)
+    ]
+
+
+def legacy_default(obj):
+    if isinstance(obj, str):
+        return str(obj)
+    for base in obj.__class__.__mro__[:-1]:
+        try:
+            encoder = json._ENCODERS_BY_TYPE[base]
+        except KeyError:
+            continue
+        return encoder(obj)
+    raise TypeError(obj)
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def report(name, legacy, current):
+    legacy_seconds, legacy_result = timed(legacy)
+    current_seconds, current_result = timed(current)
+    assert legacy_result == current_result
+    print(f"{name}:")
+    print(f"    text pipeline: {legacy_seconds * 1000:8.1f} ms")
+    print(f"   bytes pipeline: {current_seconds * 1000:8.1f} ms")
+    print(f"          speedup: {legacy_seconds / current_seconds:.2f}x")
+
+
+def main():
+    num_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    print(f"JSON backend: {json.BACKEND}")
+
+    content = make_suiteql_page(num_rows)
+    headers = {"Content-Type": "application/json; charset=utf-8"}
+
+    def parse_legacy():
+        response = httpx.Response(200, content=content, headers=headers)
+        return json.loads(response.text)
+
+    def parse_current():
+        response = httpx.Response(200, content=content, headers=headers)
+        return json.loads(response.content)
+
+    report(
+        f"SuiteQL page of {num_rows} rows ({len(content) / 1024:.0f} kB)",
+        parse_legacy,
+        parse_current,
+    )
+
+    payload = make_bulk_payload(num_rows)
+
+    def dump_legacy():
+        data = json.dumps(payload, default=legacy_default)
+        return httpx.Request("POST", "https://example.com", data=data).read()
+
+    def dump_current():
+        data = json.dumps_bytes(payload)
+        return httpx.Request("POST", "https://example.com", content=data).read()
+
+    report(f"Bulk payload of {num_rows} records", dump_legacy, dump_current)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark of signing REST API/Restlet requests with OAuth 1.0a
+
+Compares how requests used to be signed (a new authlib `OAuth1Auth` per
+request with `force_include_body=True`, which hashes the whole body) with
+the `OAuth1Signer` that's now created once per client.
+
+Run with: python benchmarks/oauth1.py [body size in kB]
+"""
+
+import sys
+import time
+
+import httpx
+from authlib.integrations.httpx_client import OAuth1Auth
+from authlib.oauth1.rfc5849.client_auth import ClientAuth
+from authlib.oauth1.rfc5849.signature import generate_signature_base_string
+from oauthlib.oauth1.rfc5849.signature import sign_hmac_sha256
+
+from netsuite import Config, TokenAuth
+from netsuite.auth import OAuth1Signer
+
+URL = "https://123456-sb1.suitetalk.api.netsuite.com/services/rest/query/v1/suiteql?limit=1000&offset=0"
+
+AUTH = TokenAuth(
+    consumer_key="abcdefghijklmnopqrstuvwxyz0123456789",
+    consumer_secret="abcdefghijklmnopqrstuvwxyz0123456789",
+    token_id="abcdefghijklmnopqrstuvwxyz0123456789",
+    token_secret="abcdefghijklmnopqrstuvwxyz0123456789",
+)
+CONFIG = Config(account="123456_SB1", auth=AUTH)
+
+
+def authlib_hmac_sha256_sign_method(client, request):
+    base_string = generate_signature_base_string(request)
+    return sign_hmac_sha256(base_string, client.client_secret, client.token_secret)
+
+
+ClientAuth.register_signature_method("HMAC-SHA256", authlib_hmac_sha256_sign_method)
+
+
+def make_request(body: bytes) -> httpx.Request:
+    return httpx.Request(
+        "POST", URL, headers={"Content-Type": "application/json"}, content=body
+    )
+
+
+def legacy_sign(body: bytes) -> httpx.Request:
+    oauth = OAuth1Auth(
+        client_id=AUTH.consumer_key,
+        client_secret=AUTH.consumer_secret,
+        token=AUTH.token_id,
+        token_secret=AUTH.token_secret,
+        realm=CONFIG.account,
+        force_include_body=True,
+        signature_method="HMAC-SHA256",
+    )
+    return next(oauth.sync_auth_flow(make_request(body)))
+
+
+SIGNER = OAuth1Signer.from_config(CONFIG)
+
+
+def current_sign(body: bytes) -> httpx.Request:
+    return next(SIGNER.sync_auth_flow(make_request(body)))
+
+
+def signatures_per_second(fn, body: bytes, duration: float = 1.0) -> float:
+    count = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < duration:
+        fn(body)
+        count += 1
+    return count / elapsed
+
+
+def main():
+    body_size = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    for size in sorted({1, body_size}):
+        body = b"x" * (size * 1024)
+        legacy = signatures_per_second(legacy_sign, body)
+        current = signatures_per_second(current_sign, body)
+        print(f"{size} kB body:")
+        print(f"    authlib, new per request: {legacy:10.0f} signatures/s")
+        print(f"    OAuth1Signer, per client: {current:10.0f} signatures/s")
+        print(f"                     speedup: {current / legacy:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
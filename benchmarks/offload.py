@@ -0,0 +1,87 @@
+"""
+Benchmark of event loop stalls while decoding large JSON responses
+
+Decodes a SuiteQL style response of several MB a number of times, while a
+ticker coroutine measures how late it gets scheduled. Compares decoding on
+the event loop with offloading through `Offloader` to a thread pool and to a
+process pool. JSON decoding holds the GIL, so with a thread pool the loop can
+still stall for the duration of a single decode. A process pool avoids that,
+at the cost of pickling the decoded result back.
+
+Run with: python benchmarks/offload.py [number of rows]
+"""
+
+import asyncio
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from netsuite import json
+from netsuite.offload import Offloader
+
+TICK = 0.001
+
+
+def make_response(num_rows: int) -> bytes:
+    return json.dumps_bytes(
+        {
+            "count": num_rows,
+            "hasMore": False,
+            "items": [
+                {"id": str(i), **{f"field_{c}": f"value {i} {c}" for c in range(20)}}
+                for i in range(num_rows)
+            ],
+        }
+    )
+
+
+async def max_loop_lag(work) -> float:
+    done = False
+    lag = 0.0
+
+    async def ticker():
+        nonlocal lag
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lag = max(lag, time.perf_counter() - start - TICK)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(TICK * 5)
+    await work()
+    done = True
+    await task
+    return lag
+
+
+async def measure(offloader: Offloader, content: bytes, repeat: int = 5):
+    async def work():
+        for _ in range(repeat):
+            await offloader.run(len(content), json.loads, content)
+
+    start = time.perf_counter()
+    lag = await max_loop_lag(work)
+    return lag, time.perf_counter() - start
+
+
+def main():
+    num_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    content = make_response(num_rows)
+    print(f"JSON backend: {json.BACKEND}, response of {len(content) / 2**20:.1f} MB")
+
+    with ThreadPoolExecutor(1) as threads, ProcessPoolExecutor(1) as processes:
+        for name, offloader in [
+            ("on event loop", Offloader()),
+            ("thread pool", Offloader(threshold=2**20, executor=threads)),
+            ("process pool", Offloader(threshold=2**20, executor=processes)),
+        ]:
+            lag, seconds = asyncio.run(measure(offloader, content))
+            print(
+                f"{name:>14}: max loop lag {lag * 1000:7.1f} ms, "
+                f"total {seconds * 1000:7.1f} ms, "
+                f"offloaded {offloader.stats.offloaded_seconds * 1000:7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Micro-benchmark of SOAP `TokenPassport` header generation
+
+Compares the previous implementation (new passport per request, `random`
+based nonce, zeep type lookups on every call) with the cached passport
+builder used by `NetSuiteSoapApi.request`. Each round generates the passport
+and renders it into a SOAP header, like zeep does when sending a request.
+
+Run with: python benchmarks/passport.py
+"""
+
+import base64
+import copy
+import hmac
+import random
+import timeit
+from datetime import datetime
+
+from lxml import etree
+from zeep import xsd
+from zeep.client import Factory
+
+from netsuite import Config
+from netsuite.soap_api import passport
+
+CORE_NS = "urn:core_2021_1.platform.webservices.netsuite.com"
+MESSAGES_NS = "urn:messages_2021_1.platform.webservices.netsuite.com"
+SOAP_ENV_NS = "http://schemas.xmlsoap.org/soap/envelope/"
+CORE_XSD = f"""
+<schema xmlns="http://www.w3.org/2001/XMLSchema"
+        xmlns:platformCore="{CORE_NS}"
+        targetNamespace="{CORE_NS}"
+        elementFormDefault="qualified">
+  <complexType name="TokenPassportSignature">
+    <simpleContent>
+      <extension base="string">
+        <attribute name="algorithm" type="string" use="required"/>
+      </extension>
+    </simpleContent>
+  </complexType>
+  <complexType name="TokenPassport">
+    <sequence>
+      <element name="account" type="string"/>
+      <element name="consumerKey" type="string"/>
+      <element name="token" type="string"/>
+      <element name="nonce" type="string"/>
+      <element name="timestamp" type="long"/>
+      <element name="signature" type="platformCore:TokenPassportSignature"/>
+    </sequence>
+  </complexType>
+</schema>
+"""
+
+NUMBER = 20_000
+
+
+class FakeSoapApi:
+    def __init__(self) -> None:
+        schema = xsd.Schema(etree.fromstring(CORE_XSD))
+        self.Core = Factory(schema, "type", CORE_NS)
+        self.token_passport_element = xsd.Element(
+            etree.QName(MESSAGES_NS, "tokenPassport"),
+            schema.get_type(f"{{{CORE_NS}}}TokenPassport"),
+        )
+
+    def _get_namespace(self, name: str, sub_namespace: str) -> str:
+        return f"urn:{name}_2021_1.{sub_namespace}.webservices.netsuite.com"
+
+
+class LegacyTokenPassport:
+    """The implementation before the passport builder was cached"""
+
+    def __init__(
+        self, ns, *, account, consumer_key, consumer_secret, token_id, token_secret
+    ):
+        self.ns = ns
+        self.account = account
+        self.consumer_key = consumer_key
+        self.consumer_secret = consumer_secret
+        self.token_id = token_id
+        self.token_secret = token_secret
+
+    def _get_signature_value(self, nonce, timestamp):
+        key = "&".join((self.consumer_secret, self.token_secret))
+        message = "&".join(
+            (self.account, self.consumer_key, self.token_id, nonce, timestamp)
+        )
+        hashed = hmac.new(
+            key=key.encode("utf-8"), msg=message.encode("utf-8"), digestmod="sha256"
+        ).digest()
+        return base64.b64encode(hashed).decode()
+
+    def get_element(self):
+        nonce = "".join([str(random.randint(0, 9)) for i in range(20)])
+        timestamp = str(int(datetime.now().timestamp()))
+        signature = self.ns.Core.TokenPassportSignature(
+            self._get_signature_value(nonce, timestamp), algorithm="HMAC-SHA256"
+        )
+        return self.ns.Core.TokenPassport(
+            account=self.account,
+            consumerKey=self.consumer_key,
+            token=self.token_id,
+            nonce=nonce,
+            timestamp=timestamp,
+            signature=signature,
+        )
+
+
+def legacy_make(ns, config):
+    auth = config.auth
+    token_passport = LegacyTokenPassport(
+        ns,
+        account=config.account,
+        consumer_key=auth.consumer_key,
+        consumer_secret=auth.consumer_secret,
+        token_id=auth.token_id,
+        token_secret=auth.token_secret,
+    )
+    return {"tokenPassport": token_passport.get_element()}
+
+
+def main():
+    config = Config(
+        account="123456_SB1",
+        auth={
+            "consumer_key": "a" * 64,
+            "consumer_secret": "b" * 64,
+            "token_id": "c" * 64,
+            "token_secret": "d" * 64,
+        },
+    )
+    ns = FakeSoapApi()
+
+    def legacy():
+        header = etree.Element(f"{{{SOAP_ENV_NS}}}Header")
+        value = copy.deepcopy(legacy_make(ns, config)["tokenPassport"])
+        ns.token_passport_element.render(header, value)
+        return header
+
+    def cached():
+        header = etree.Element(f"{{{SOAP_ENV_NS}}}Header")
+        element = passport.get_passport(ns, config).get_xml_element()
+        header.append(copy.deepcopy(element))
+        return header
+
+    assert etree.tostring(legacy()).count(b"<") == etree.tostring(cached()).count(b"<")
+
+    results = {}
+    for name, fn in (("legacy", legacy), ("cached", cached)):
+        fn()  # Warm up
+        seconds = min(timeit.repeat(fn, number=NUMBER, repeat=5))
+        results[name] = seconds
+        print(
+            f"{name:>7}: {seconds / NUMBER * 1e6:7.2f} µs/passport "
+            f"({NUMBER / seconds:,.0f} passports/s)"
+        )
+
+    print(f"speedup: {results['legacy'] / results['cached']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark of converting SOAP responses into built-in python data structures
+
+Compares the default path (zeep parses the response into its object graph,
+which `helpers.to_builtin` then serializes) with `XmlConverter`, which is
+what `NetSuiteSoapApi(response_mode="builtin")` uses.
+
+The schema is the trimmed down NetSuite WSDL used by the test suite, with a
+`getList` response of sales orders with item lines.
+
+Run with: python benchmarks/soap_converter.py [number of records]
+"""
+
+import pathlib
+import sys
+import time
+
+import zeep
+from lxml import etree
+
+from netsuite.soap_api import helpers
+from netsuite.soap_api.converter import XmlConverter
+
+WSDL_PATH = pathlib.Path(__file__).parents[1] / "tests" / "fixtures" / "netsuite.wsdl"
+
+LINES_PER_RECORD = 10
+
+
+def make_response(num_records: int) -> bytes:
+    lines = "".join(
+        f"""<tranSales:item>
+          <tranSales:item internalId="{line}" type="inventoryItem">
+            <platformCore:name>Item {line}</platformCore:name>
+          </tranSales:item>
+          <tranSales:line>{line}</tranSales:line>
+          <tranSales:description>Line number {line}</tranSales:description>
+          <tranSales:quantity>{line}.0</tranSales:quantity>
+          <tranSales:amount>{line * 9.95}</tranSales:amount>
+        </tranSales:item>"""
+        for line in range(1, LINES_PER_RECORD + 1)
+    )
+    records = "".join(
+        f"""<platformCore:readResponse>
+      <platformCore:status isSuccess="true"/>
+      <platformCore:record internalId="{i}" externalId="SO{i}" xsi:type="tranSales:SalesOrder">
+        <tranSales:entity internalId="{i % 97}" type="customer"/>
+        <tranSales:tranId>SO{i}</tranSales:tranId>
+        <tranSales:tranDate>2021-03-04T05:06:07.000-08:00</tranSales:tranDate>
+        <tranSales:total>{i * 99.5}</tranSales:total>
+        <tranSales:itemList replaceAll="false">{lines}</tranSales:itemList>
+      </platformCore:record>
+    </platformCore:readResponse>"""
+        for i in range(num_records)
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
+    xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+    xmlns:platformMsgs="urn:messages_2021_1.platform.webservices.netsuite.com"
+    xmlns:platformCore="urn:core_2021_1.platform.webservices.netsuite.com"
+    xmlns:tranSales="urn:sales_2021_1.transactions.webservices.netsuite.com">
+  <soapenv:Header>
+    <platformMsgs:documentInfo><platformMsgs:nsId>WEBSERVICES</platformMsgs:nsId></platformMsgs:documentInfo>
+  </soapenv:Header>
+  <soapenv:Body>
+    <platformMsgs:getListResponse>
+      <platformCore:readResponseList>
+        <platformCore:status isSuccess="true"/>
+        {records}
+      </platformCore:readResponseList>
+    </platformMsgs:getListResponse>
+  </soapenv:Body>
+</soapenv:Envelope>""".encode()
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    num_records = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    client = zeep.Client(str(WSDL_PATH))
+    operation = client.service._binding.get("getList")
+    converter = XmlConverter(client.wsdl.types)
+    content = make_response(num_records)
+    parser = etree.XMLParser(huge_tree=True)
+
+    def via_zeep():
+        result = operation.process_reply(etree.fromstring(content, parser))
+        return helpers.to_builtin(result.body)
+
+    def via_converter():
+        return converter.envelope_to_builtin(converter.parse(content))["body"]
+
+    print(
+        f"{num_records} sales orders with {LINES_PER_RECORD} lines each "
+        f"({len(content) / 1024 / 1024:.1f} MB)"
+    )
+    zeep_seconds, zeep_result = timed(via_zeep)
+    converter_seconds, converter_result = timed(via_converter)
+    assert zeep_result == converter_result
+
+    print(f"     zeep + to_builtin: {zeep_seconds * 1000:8.1f} ms")
+    print(f"          XmlConverter: {converter_seconds * 1000:8.1f} ms")
+    print(f"speedup: {zeep_seconds / converter_seconds:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
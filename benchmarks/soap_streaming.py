@@ -0,0 +1,127 @@
+"""
+Benchmark of peak memory use when parsing a large search response
+
+Compares zeep parsing the whole response into its object graph (what
+`NetSuiteSoapApi.search` does) with `RecordStreamParser` being fed the
+response in chunks (what `NetSuiteSoapApi.stream_search` does), converting
+each record into a zeep object and then dropping it.
+
+Memory is measured with `tracemalloc`, which only sees allocations made by
+python, not the ones lxml makes for its own XML tree.
+
+Run with: python benchmarks/soap_streaming.py [number of records]
+"""
+
+import pathlib
+import sys
+import tracemalloc
+
+import zeep
+from lxml import etree
+
+from netsuite.soap_api.converter import XmlConverter
+from netsuite.soap_api.streaming import RecordStreamParser
+
+WSDL_PATH = pathlib.Path(__file__).parents[1] / "tests" / "fixtures" / "netsuite.wsdl"
+
+LINES_PER_RECORD = 10
+CHUNK_SIZE = 64 * 1024
+
+
+def make_response(num_records: int) -> bytes:
+    lines = "".join(
+        f"""<tranSales:item>
+          <tranSales:item internalId="{line}" type="inventoryItem">
+            <platformCore:name>Item {line}</platformCore:name>
+          </tranSales:item>
+          <tranSales:line>{line}</tranSales:line>
+          <tranSales:description>Line number {line}</tranSales:description>
+          <tranSales:quantity>{line}.0</tranSales:quantity>
+          <tranSales:amount>{line * 9.95}</tranSales:amount>
+        </tranSales:item>"""
+        for line in range(1, LINES_PER_RECORD + 1)
+    )
+    records = "".join(
+        f"""<platformCore:record internalId="{i}" xsi:type="tranSales:SalesOrder">
+        <tranSales:entity internalId="{i % 97}" type="customer"/>
+        <tranSales:tranId>SO{i}</tranSales:tranId>
+        <tranSales:tranDate>2021-03-04T05:06:07.000-08:00</tranSales:tranDate>
+        <tranSales:total>{i * 99.5}</tranSales:total>
+        <tranSales:itemList replaceAll="false">{lines}</tranSales:itemList>
+      </platformCore:record>"""
+        for i in range(num_records)
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
+    xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+    xmlns:platformMsgs="urn:messages_2021_1.platform.webservices.netsuite.com"
+    xmlns:platformCore="urn:core_2021_1.platform.webservices.netsuite.com"
+    xmlns:tranSales="urn:sales_2021_1.transactions.webservices.netsuite.com">
+  <soapenv:Body>
+    <platformMsgs:searchResponse>
+      <platformCore:searchResult>
+        <platformCore:status isSuccess="true"/>
+        <platformCore:totalRecords>{num_records}</platformCore:totalRecords>
+        <platformCore:pageSize>{num_records}</platformCore:pageSize>
+        <platformCore:totalPages>1</platformCore:totalPages>
+        <platformCore:pageIndex>1</platformCore:pageIndex>
+        <platformCore:recordList>{records}</platformCore:recordList>
+      </platformCore:searchResult>
+    </platformMsgs:searchResponse>
+  </soapenv:Body>
+</soapenv:Envelope>""".encode()
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    try:
+        result = fn()
+        return tracemalloc.get_traced_memory()[1], result
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    num_records = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    client = zeep.Client(str(WSDL_PATH))
+    operation = client.service._binding.get("search")
+    record_element = dict(
+        client.get_type(
+            "{urn:core_2021_1.platform.webservices.netsuite.com}RecordList"
+        ).elements
+    )["record"]
+    converter = XmlConverter(client.wsdl.types)
+    content = make_response(num_records)
+    parser = etree.XMLParser(huge_tree=True)
+
+    def via_zeep():
+        result = operation.process_reply(etree.fromstring(content, parser))
+        return len(result.body.searchResult.recordList.record)
+
+    def via_stream():
+        stream_parser = RecordStreamParser(
+            convert_record=lambda element: record_element.parse(
+                element, client.wsdl.types
+            ),
+            convert_status=converter.element_to_builtin,
+        )
+        count = 0
+        for offset in range(0, len(content), CHUNK_SIZE):
+            for _ in stream_parser.feed(content[offset : offset + CHUNK_SIZE]):
+                count += 1
+        return count + len(stream_parser.close())
+
+    print(
+        f"{num_records} sales orders with {LINES_PER_RECORD} lines each "
+        f"({len(content) / 1024 / 1024:.1f} MB)"
+    )
+    zeep_peak, zeep_count = peak_memory(via_zeep)
+    stream_peak, stream_count = peak_memory(via_stream)
+    assert zeep_count == stream_count == num_records
+
+    print(f"         zeep: {zeep_peak / 1024 / 1024:8.1f} MB peak")
+    print(f"    streaming: {stream_peak / 1024 / 1024:8.1f} MB peak")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,21 @@
 from . import constants  # noqa
+from .auth import *  # noqa
+from .bulk_write import *  # noqa
+from .circuit_breaker import *  # noqa
 from .client import *  # noqa
 from .config import *  # noqa
+from .deadline import *  # noqa
+from .hedging import *  # noqa
+from .journal import *  # noqa
+from .oauth2 import *  # noqa
+from .pipeline import *  # noqa
+from .record_cache import *  # noqa
+from .registry import *  # noqa
 from .rest_api import *  # noqa
 from .restlet import *  # noqa
+from .restlet_batch import *  # noqa
+from .scheduler import *  # noqa
 from .soap_api import *  # noqa
+from .streaming import *  # noqa
+from .sync import *  # noqa
+from .token_pool import *  # noqa
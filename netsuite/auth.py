@@ -0,0 +1,207 @@
+import base64
+import hashlib
+import hmac
+import secrets
+import time
+from typing import Dict, Generator, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, quote
+
+import httpx
+
+from .config import Config
+from .token_pool import PooledToken, TokenPool, is_credential_failure_status
+
+__all__ = ("OAuth1Signer", "TokenPoolAuth")
+
+SIGNATURE_METHODS = {
+    "HMAC-SHA256": hashlib.sha256,
+    "HMAC-SHA1": hashlib.sha1,
+}
+
+FORM_URLENCODED = "application/x-www-form-urlencoded"
+
+
+def _escape(value: str) -> str:
+    # RFC 5849 section 3.6 percent encoding, i.e. everything but unreserved
+    # characters is escaped
+    return quote(value, safe="~")
+
+
+class OAuth1Signer(httpx.Auth):
+    """
+    Signs requests using OAuth 1.0a, which NetSuite calls Token-Based
+    Authentication (TBA)
+
+    Create one per client and reuse it. The signing key and the static part
+    of the parameters and `Authorization` header are computed once. Only what
+    RFC 5849 requires is signed: the OAuth parameters, the query string and
+    form encoded bodies. Other bodies (like JSON) aren't read or hashed.
+
+    Args:
+        consumer_key:
+            Consumer key of the integration record
+        consumer_secret:
+            Consumer secret of the integration record
+        token_id:
+            ID of the access token
+        token_secret:
+            Secret of the access token
+        realm:
+            The NetSuite account ID, e.g. `123456_SB1`
+        signature_method:
+            `HMAC-SHA256` (default) or `HMAC-SHA1`
+    """
+
+    requires_request_body = False
+
+    def __init__(
+        self,
+        consumer_key: str,
+        consumer_secret: str,
+        token_id: str,
+        token_secret: str,
+        realm: str,
+        signature_method: str = "HMAC-SHA256",
+    ) -> None:
+        try:
+            digestmod = SIGNATURE_METHODS[signature_method]
+        except KeyError:
+            raise ValueError(
+                f"Unsupported signature method {signature_method!r}, must be one "
+                f"of {tuple(SIGNATURE_METHODS)}"
+            ) from None
+        self.consumer_key = consumer_key
+        self.token_id = token_id
+        self.realm = realm
+        self.signature_method = signature_method
+
+        key = f"{_escape(consumer_secret)}&{_escape(token_secret)}"
+        self._hmac = hmac.new(key.encode("utf-8"), digestmod=digestmod)
+        self._static_params: List[Tuple[str, str]] = [
+            ("oauth_consumer_key", _escape(consumer_key)),
+            ("oauth_signature_method", signature_method),
+            ("oauth_token", _escape(token_id)),
+            ("oauth_version", "1.0"),
+        ]
+        self._header_prefix = f'OAuth realm="{_escape(realm)}", ' + ", ".join(
+            f'{name}="{value}"' for name, value in self._static_params
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} realm={self.realm} "
+            f"consumer_key={self.consumer_key[:6]}... "
+            f"signature_method={self.signature_method}>"
+        )
+
+    @classmethod
+    def from_config(
+        cls, config: Config, signature_method: str = "HMAC-SHA256"
+    ) -> "OAuth1Signer":
+        auth = config.auth
+        return cls(
+            consumer_key=auth.consumer_key,  # type: ignore[union-attr]
+            consumer_secret=auth.consumer_secret,  # type: ignore[union-attr]
+            token_id=auth.token_id,  # type: ignore[union-attr]
+            token_secret=auth.token_secret,  # type: ignore[union-attr]
+            realm=config.account,
+            signature_method=signature_method,
+        )
+
+    def auth_flow(
+        self, request: httpx.Request
+    ) -> Generator[httpx.Request, httpx.Response, None]:
+        form_params: Iterable[Tuple[str, str]] = ()
+        if request.headers.get("Content-Type", "").startswith(FORM_URLENCODED):
+            form_params = parse_qsl(request.read().decode(), keep_blank_values=True)
+        request.headers["Authorization"] = self.sign(
+            request.method, request.url, form_params
+        )
+        yield request
+
+    def sign(
+        self,
+        method: str,
+        url: httpx.URL,
+        form_params: Iterable[Tuple[str, str]] = (),
+        *,
+        nonce: Optional[str] = None,
+        timestamp: Optional[str] = None,
+    ) -> str:
+        """Return the `Authorization` header value for a request"""
+        if nonce is None:
+            nonce = secrets.token_hex(16)
+        if timestamp is None:
+            timestamp = str(int(time.time()))
+
+        params = [
+            *self._static_params,
+            ("oauth_nonce", nonce),
+            ("oauth_timestamp", timestamp),
+        ]
+        params.extend(
+            (_escape(name), _escape(value)) for name, value in url.params.multi_items()
+        )
+        params.extend((_escape(name), _escape(value)) for name, value in form_params)
+        params.sort()
+
+        path = url.raw_path.partition(b"?")[0].decode("ascii")
+        base_url = f"{url.scheme}://{url.netloc.decode('ascii')}{path}"
+        base_string = "&".join(
+            (
+                method.upper(),
+                _escape(base_url),
+                _escape("&".join(f"{name}={value}" for name, value in params)),
+            )
+        )
+        mac = self._hmac.copy()
+        mac.update(base_string.encode("utf-8"))
+        signature = base64.b64encode(mac.digest()).decode("ascii")
+
+        return (
+            f'{self._header_prefix}, oauth_nonce="{nonce}", '
+            f'oauth_timestamp="{timestamp}", '
+            f'oauth_signature="{_escape(signature)}"'
+        )
+
+
+class TokenPoolAuth(httpx.Auth):
+    """
+    Signs each request using the least loaded credential of a `TokenPool`
+
+    The credential is held until the response arrives. Credentials that get
+    a `401` or `429` response are taken out of rotation for a while.
+    """
+
+    requires_response_body = False
+
+    def __init__(
+        self, pool: TokenPool, realm: str, signature_method: str = "HMAC-SHA256"
+    ) -> None:
+        self.pool = pool
+        self._signers: Dict[PooledToken, OAuth1Signer] = {
+            token: OAuth1Signer(
+                consumer_key=token.auth.consumer_key,
+                consumer_secret=token.auth.consumer_secret,
+                token_id=token.auth.token_id,
+                token_secret=token.auth.token_secret,
+                realm=realm,
+                signature_method=signature_method,
+            )
+            for token in pool.tokens
+        }
+
+    def sync_auth_flow(
+        self, request: httpx.Request
+    ) -> Generator[httpx.Request, httpx.Response, None]:
+        raise RuntimeError("Token pools are only supported async")
+
+    async def async_auth_flow(self, request: httpx.Request):
+        token = await self.pool.acquire()
+        failed = False
+        try:
+            signed = next(self._signers[token].auth_flow(request))
+            response = yield signed
+            failed = is_credential_failure_status(response.status_code)
+        finally:
+            await self.pool.release(token, failed=failed)
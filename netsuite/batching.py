@@ -0,0 +1,144 @@
+import asyncio
+import contextvars
+from functools import cached_property
+from typing import Dict, Generic, Hashable, List, Set, Tuple, TypeVar
+
+from .deadline import within_deadline
+
+__all__ = ("Batcher",)
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class Batcher(Generic[K, T, R]):
+    """
+    Base of the clients gathering concurrent calls into batched requests
+
+    Items passed to `_submit` are buffered per key, and passed to `_send` as
+    one batch once `max_batch_size` of them are buffered, or `_delay` seconds
+    after the first of them. `_send` must resolve the future of each item.
+
+    A batch is sent in a fresh context, without the deadline or priority of
+    the caller which started it, as it's shared by callers with their own.
+    Each caller only waits for its item until its own deadline.
+
+    Once `max_pending` items are buffered or being sent, callers wait for a
+    batch to finish before their item is buffered. Use as an async context
+    manager, or call `aclose`, so that buffered items are sent before
+    shutting down.
+
+    Args:
+        max_batch_size:
+            Maximum number of items per batch
+        max_pending:
+            Maximum number of items buffered or being sent
+    """
+
+    def __init__(self, *, max_batch_size: int, max_pending: int) -> None:
+        if max_batch_size < 1:
+            raise ValueError("`max_batch_size` must be at least 1")
+        if max_pending < 1:
+            raise ValueError("`max_pending` must be at least 1")
+        self.max_batch_size = max_batch_size
+        self.max_pending = max_pending
+        self._pending: Dict[K, List[Tuple[T, "asyncio.Future[R]"]]] = {}
+        self._timers: Dict[K, asyncio.TimerHandle] = {}
+        self._in_flight: Set["asyncio.Task[None]"] = set()
+        self._closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type=None, exc_value=None, traceback=None) -> None:
+        await self.aclose()
+
+    @cached_property
+    def _slots(self) -> asyncio.Semaphore:
+        # NOTE: Shouldn't be put in __init__ as we might not have a running
+        #       event loop at that time.
+        return asyncio.Semaphore(self.max_pending)
+
+    @property
+    def _delay(self) -> float:
+        """Seconds to wait for more items before sending a batch"""
+        raise NotImplementedError
+
+    @property
+    def _buffered(self) -> int:
+        return sum(len(pending) for pending in self._pending.values())
+
+    async def flush(self) -> None:
+        """Send all buffered items, and wait until all batches are done"""
+        for key in list(self._pending):
+            self._flush(key)
+        while self._in_flight:
+            await asyncio.wait(set(self._in_flight))
+
+    async def aclose(self) -> None:
+        """Flush, and reject calls from now on"""
+        self._closed = True
+        await self.flush()
+
+    async def _submit(self, key: K, item: T) -> R:
+        if self._closed:
+            raise RuntimeError(f"{self.__class__.__name__} is closed")
+        await within_deadline(self._slots.acquire())
+        if self._closed:
+            self._slots.release()
+            raise RuntimeError(f"{self.__class__.__name__} is closed")
+
+        # The item is sent even if the caller is cancelled from now on
+        future: "asyncio.Future[R]" = asyncio.get_running_loop().create_future()
+        pending = self._pending.setdefault(key, [])
+        pending.append((item, future))
+        if len(pending) >= self.max_batch_size:
+            self._flush(key)
+        elif len(pending) == 1:
+            self._timers[key] = asyncio.get_running_loop().call_later(
+                self._delay, self._flush, key
+            )
+        return await within_deadline(future)
+
+    def _flush(self, key: K) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        pending = self._pending.pop(key, None)
+        if not pending:
+            return
+        task = contextvars.Context().run(
+            asyncio.ensure_future, self._send_and_release(key, pending)
+        )
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def _send_and_release(
+        self, key: K, pending: List[Tuple[T, "asyncio.Future[R]"]]
+    ) -> None:
+        try:
+            await self._send(key, pending)
+        except asyncio.CancelledError:
+            for _, future in pending:
+                future.cancel()
+            raise
+        except Exception as ex:
+            for _, future in pending:
+                # Done if the caller was cancelled
+                if not future.done():
+                    future.set_exception(ex)
+        else:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(RuntimeError("No result for the batch item"))
+        finally:
+            for _ in pending:
+                self._slots.release()
+
+    async def _send(self, key: K, pending: List[Tuple[T, "asyncio.Future[R]"]]) -> None:
+        """
+        Send a batch, resolving the future of each item. An error it raises
+        is set on all futures not yet done.
+        """
+        raise NotImplementedError
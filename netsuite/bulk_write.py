@@ -0,0 +1,376 @@
+import asyncio
+import logging
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Union,
+)
+
+from .rest_api import NetSuiteRestApi
+from .soap_api.client import NetSuiteSoapApi
+from .soap_api.exceptions import NetsuiteResponseError
+from .soap_api.results import WriteResult
+
+logger = logging.getLogger(__name__)
+
+__all__ = ("BulkWritePlan", "BulkWriteResult", "Ref")
+
+OPERATIONS = ("add", "update", "upsert")
+
+REST_METHODS = {"add": "POST", "update": "PATCH", "upsert": "PUT"}
+
+
+class Ref:
+    """
+    Placeholder for the internal ID of another record of a `BulkWritePlan`
+
+    Put it in a field of a record, where a reference to the other record is
+    expected. It's replaced once the other record is written: by a
+    `RecordRef` for the SOAP API, and by `{"id": ...}` for the REST API.
+    """
+
+    __slots__ = ("key",)
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.key!r})"
+
+
+class _Node:
+    __slots__ = ("key", "record", "operation", "record_type", "depends_on")
+
+    def __init__(
+        self,
+        key: str,
+        record: Any,
+        operation: str,
+        record_type: Optional[str],
+        depends_on: Set[str],
+    ) -> None:
+        self.key = key
+        self.record = record
+        self.operation = operation
+        self.record_type = record_type
+        self.depends_on = depends_on
+
+
+class BulkWriteResult:
+    """Outcome of a `BulkWritePlan`, per record key"""
+
+    def __init__(self) -> None:
+        self.results: Dict[str, WriteResult] = {}
+        self.skipped: List[str] = []
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} written={len(self.internal_ids)} "
+            f"failed={len(self.failed)} skipped={len(self.skipped)}>"
+        )
+
+    @property
+    def internal_ids(self) -> Dict[str, str]:
+        """Internal IDs of the successfully written records"""
+        return {
+            key: result.internal_id
+            for key, result in self.results.items()
+            if result.is_success and result.internal_id is not None
+        }
+
+    @property
+    def failed(self) -> Dict[str, WriteResult]:
+        return {
+            key: result for key, result in self.results.items() if not result.is_success
+        }
+
+    @property
+    def is_success(self) -> bool:
+        return not self.failed and not self.skipped
+
+    def raise_for_status(self) -> None:
+        """
+        Raise `NetsuiteResponseError` if any record failed, or was skipped
+        because a record it depends on failed
+        """
+        if self.is_success:
+            return
+        details: List[Any] = [
+            detail
+            for result in self.failed.values()
+            for detail in result.status_details
+        ]
+        if self.skipped:
+            details.append(f"Skipped because of failed dependencies: {self.skipped}")
+        raise NetsuiteResponseError(details)
+
+
+class BulkWritePlan:
+    """
+    Write records which reference each other, in as few rounds as possible
+
+    Each record is added under a key, usually its external ID. A record
+    depends on the records whose `Ref` it contains, and on those passed as
+    `depends_on`. The records are split in layers: the first one holds the
+    records without dependencies, the next one those only depending on
+    records of the first layer, and so on. The records of a layer are
+    written at the same time, with list operations for the SOAP API, and the
+    internal IDs of the written records are filled into the `Ref`s of the
+    next layers. Records depending on a failed record are skipped.
+
+    `Ref`s are replaced in the records passed in.
+
+    >>> plan = BulkWritePlan()
+    >>> plan.add("CUST-1", customer)
+    >>> plan.add("SO-1", sales_order)  # Has `entity=Ref("CUST-1")`
+    >>> result = await plan.run(ns.soap_api)
+    >>> result.internal_ids
+    {"CUST-1": "1234", "SO-1": "5678"}
+    """
+
+    def __init__(self) -> None:
+        self._nodes: Dict[str, _Node] = {}
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} records={len(self._nodes)}>"
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def add(
+        self,
+        key: str,
+        record: Any,
+        *,
+        operation: str = "add",
+        record_type: Optional[str] = None,
+        depends_on: Iterable[str] = (),
+    ) -> None:
+        """
+        Add a record to write
+
+        Args:
+            key:
+                Name of the record, to reference it with `Ref`. For the REST
+                API `update` and `upsert` operations, it's the external ID
+                the record is written by.
+            record:
+                The record. A zeep object for the SOAP API, a dict for the
+                REST API.
+            operation:
+                `add`, `update` or `upsert`
+            record_type:
+                Type of the record, e.g. `customer`. Required for the REST
+                API.
+            depends_on:
+                Keys of records to write before this one, in addition to
+                those referenced by `Ref`s
+        """
+        if key in self._nodes:
+            raise ValueError(f"Duplicate record key {key!r}")
+        if operation not in OPERATIONS:
+            raise ValueError(f"`operation` must be one of {OPERATIONS}")
+        dependencies = {ref.key for ref in _find_refs(record)} | set(depends_on)
+        self._nodes[key] = _Node(key, record, operation, record_type, dependencies)
+
+    def layers(self) -> List[List[str]]:
+        """
+        Keys of the records in the order they're written, a layer at a time
+
+        Raises:
+            ValueError: If records depend on unknown keys, or on each other
+        """
+        for node in self._nodes.values():
+            unknown = node.depends_on - self._nodes.keys()
+            if unknown:
+                raise ValueError(f"{node.key!r} depends on unknown {sorted(unknown)}")
+
+        remaining = {key: set(node.depends_on) for key, node in self._nodes.items()}
+        layers = []
+        while remaining:
+            layer = [key for key, dependencies in remaining.items() if not dependencies]
+            if not layer:
+                raise ValueError(f"Dependency cycle among {sorted(remaining)}")
+            for key in layer:
+                del remaining[key]
+            for dependencies in remaining.values():
+                dependencies.difference_update(layer)
+            layers.append(layer)
+        return layers
+
+    async def run(
+        self, client: Union[NetSuiteSoapApi, NetSuiteRestApi]
+    ) -> BulkWriteResult:
+        """
+        Write all records with the SOAP API (using `addList`, `updateList`
+        and `upsertList`) or the REST API
+
+        A record whose request fails, e.g. with a timeout, gets a failed
+        result like a record NetSuite rejects, and records depending on it
+        are skipped. A record referencing one written without an internal ID
+        being returned fails without being written.
+
+        Raises:
+            ValueError: If the plan is invalid, before anything is written
+        """
+        layers = self.layers()
+        if isinstance(client, NetSuiteRestApi):
+            missing = [
+                key for key, node in self._nodes.items() if node.record_type is None
+            ]
+            if missing:
+                raise ValueError(
+                    f"Records {missing} need a `record_type` for the REST API"
+                )
+        result = BulkWriteResult()
+        failed: Set[str] = set()
+        internal_ids: Dict[str, str] = {}
+        for index, layer in enumerate(layers):
+            nodes = []
+            for key in layer:
+                node = self._nodes[key]
+                if node.depends_on & failed:
+                    result.skipped.append(key)
+                    failed.add(key)
+                    continue
+                # Written, but NetSuite didn't return their internal ID
+                unresolved = {ref.key for ref in _find_refs(node.record)}
+                unresolved -= internal_ids.keys()
+                if unresolved:
+                    result.results[key] = WriteResult(
+                        node.record,
+                        is_success=False,
+                        status_details=[
+                            f"No internal ID was returned for {sorted(unresolved)}, "
+                            f"referenced by {key!r}"
+                        ],
+                    )
+                    failed.add(key)
+                    continue
+                _resolve_refs(
+                    node.record,
+                    lambda ref: _make_ref(client, internal_ids[ref.key]),
+                )
+                nodes.append(node)
+            logger.debug(
+                f"Writing layer {index + 1}/{len(layers)} of {len(nodes)} records"
+            )
+            if isinstance(client, NetSuiteRestApi):
+                written = await _write_rest(client, nodes)
+            else:
+                written = await _write_soap(client, nodes)
+            for node, write_result in zip(nodes, written):
+                result.results[node.key] = write_result
+                if not write_result.is_success:
+                    failed.add(node.key)
+                elif write_result.internal_id is not None:
+                    internal_ids[node.key] = write_result.internal_id
+        return result
+
+
+async def _write_soap(
+    soap_api: NetSuiteSoapApi, nodes: Sequence[_Node]
+) -> List[WriteResult]:
+    by_operation: Dict[str, List[_Node]] = {}
+    for node in nodes:
+        by_operation.setdefault(node.operation, []).append(node)
+    operations = list(by_operation)
+    list_results = await asyncio.gather(
+        *(
+            _write_soap_list(soap_api, operation, by_operation[operation])
+            for operation in operations
+        )
+    )
+    results = {
+        id(node): write_result
+        for operation, list_result in zip(operations, list_results)
+        for node, write_result in zip(by_operation[operation], list_result)
+    }
+    return [results[id(node)] for node in nodes]
+
+
+async def _write_soap_list(
+    soap_api: NetSuiteSoapApi, operation: str, nodes: Sequence[_Node]
+) -> List[WriteResult]:
+    records = [node.record for node in nodes]
+    try:
+        return list(await getattr(soap_api, f"{operation}List")(records))
+    except Exception as ex:
+        # The other operations of the layer may have been written
+        logger.warning(f"`{operation}List` of {len(records)} records failed: {ex!r}")
+        return [WriteResult.from_error(record, ex) for record in records]
+
+
+async def _write_rest(
+    rest_api: NetSuiteRestApi, nodes: Sequence[_Node]
+) -> List[WriteResult]:
+    return list(await asyncio.gather(*(_write_rest_record(rest_api, n) for n in nodes)))
+
+
+async def _write_rest_record(rest_api: NetSuiteRestApi, node: _Node) -> WriteResult:
+    subpath = f"/record/v1/{node.record_type}"
+    if node.operation != "add":
+        subpath = f"{subpath}/eid:{node.key}"
+    try:
+        response = await rest_api.request(
+            REST_METHODS[node.operation], subpath, json=node.record
+        )
+    except Exception as ex:
+        # The other records of the layer may have been written
+        logger.warning(f"Writing {node.key!r} failed: {ex!r}")
+        return WriteResult.from_error(node.record, ex)
+    if not 200 <= response.status_code <= 299:
+        return WriteResult(
+            node.record, is_success=False, status_details=[response.text]
+        )
+    # The written record is in the `Location` header, e.g.
+    # `https://.../record/v1/customer/1234`
+    internal_id = response.headers.get("Location", "").rstrip("/").rsplit("/", 1)[-1]
+    return WriteResult(
+        node.record, is_success=True, base_ref={"internalId": internal_id or None}
+    )
+
+
+def _make_ref(client: Union[NetSuiteSoapApi, NetSuiteRestApi], internal_id: str) -> Any:
+    if isinstance(client, NetSuiteRestApi):
+        return {"id": internal_id}
+    return client.Core.RecordRef(internalId=internal_id)
+
+
+def _container(value: Any) -> Union[dict, list, None]:
+    if isinstance(value, (dict, list)):
+        return value
+    # The fields of a zeep object
+    values = getattr(value, "__values__", None)
+    return values if isinstance(values, dict) else None
+
+
+def _find_refs(value: Any) -> Iterator[Ref]:
+    if isinstance(value, Ref):
+        yield value
+        return
+    container = _container(value)
+    if container is not None:
+        items = container.values() if isinstance(container, dict) else container
+        for item in items:
+            yield from _find_refs(item)
+
+
+def _resolve_refs(value: Any, make_ref: Callable[[Ref], Any]) -> None:
+    container = _container(value)
+    if container is None:
+        return
+    keys = container.keys() if isinstance(container, dict) else range(len(container))
+    for key in list(keys):
+        item = container[key]
+        if isinstance(item, Ref):
+            container[key] = make_ref(item)
+        else:
+            _resolve_refs(item, make_ref)
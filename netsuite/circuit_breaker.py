@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+import httpx
+
+from .exceptions import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+__all__ = ("CircuitBreaker", "CircuitBreakers")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+StateChangeHook = Callable[["CircuitBreaker", str, str], None]
+
+
+class CircuitBreaker:
+    """
+    Fail fast while an account's endpoint seems to be down
+
+    The circuit opens after `failure_threshold` consecutive failures
+    (timeouts, connection errors or 5xx responses). While open, requests are
+    rejected immediately with `CircuitOpenError`. After `reset_timeout`
+    seconds it's half open: up to `half_open_requests` trial requests are let
+    through, the first success closing the circuit again and a failure opening
+    it for another `reset_timeout`.
+
+    Use `CircuitBreakers` to get one per account and endpoint class.
+    """
+
+    def __init__(
+        self,
+        account: str,
+        endpoint: str,
+        *,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_requests: int = 1,
+        on_state_change: Optional[StateChangeHook] = None,
+    ) -> None:
+        self.account = account
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_requests = half_open_requests
+        self.on_state_change = on_state_change
+        self.failures = 0
+        self.rejected = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trials = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} {self.account}/{self.endpoint} "
+            f"state={self.state} failures={self.failures}>"
+        )
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self.retry_after == 0:
+            self._set_state(HALF_OPEN)
+        return self._state
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until the circuit is half open again, 0 if not open"""
+        if self._state != OPEN:
+            return 0.0
+        return max(self._opened_at + self.reset_timeout - time.monotonic(), 0.0)
+
+    def raise_if_open(self) -> None:
+        """Reject a request if the circuit is open, without taking a trial"""
+        if self.state == OPEN:
+            self.rejected += 1
+            raise CircuitOpenError(self.account, self.endpoint, self.retry_after)
+
+    def allow(self) -> None:
+        """
+        Let a request through, or reject it
+
+        Must be followed by `record`, once the outcome of the request is known.
+        """
+        self.raise_if_open()
+        if self._state == HALF_OPEN:
+            if self._trials >= self.half_open_requests:
+                self.rejected += 1
+                raise CircuitOpenError(self.account, self.endpoint, 0.0)
+            self._trials += 1
+
+    def record(self, failed: Optional[bool]) -> None:
+        """
+        Record the outcome of a request let through by `allow`
+
+        Args:
+            failed:
+                Whether the endpoint seems down. `None` if unknown, e.g. when
+                the request was cancelled.
+        """
+        if self._state == HALF_OPEN and self._trials > 0:
+            self._trials -= 1
+        if failed is None:
+            return
+        if not failed:
+            self.failures = 0
+            if self._state != CLOSED:
+                self._set_state(CLOSED)
+            return
+
+        self.failures += 1
+        if self._state == HALF_OPEN or (
+            self._state == CLOSED and self.failures >= self.failure_threshold
+        ):
+            self._opened_at = time.monotonic()
+            self._set_state(OPEN)
+
+    @contextmanager
+    def attempt(
+        self, is_failure: Callable[[BaseException], bool]
+    ) -> Iterator["Attempt"]:
+        """
+        Make a request through the breaker
+
+        The request fails if it raises an error for which `is_failure` is
+        true, or if `failed` is set on the yielded `Attempt`. A request cut
+        short by its deadline counts as neither a failure nor a success.
+        """
+        self.allow()
+        attempt = Attempt()
+        try:
+            yield attempt
+            if attempt.failed is None:
+                attempt.failed = False
+        except asyncio.TimeoutError:
+            # Includes `DeadlineExceeded`, which says nothing of the endpoint
+            raise
+        except Exception as ex:
+            if attempt.failed is None:
+                attempt.failed = is_failure(ex)
+            raise
+        finally:
+            self.record(attempt.failed)
+
+    def _set_state(self, state: str) -> None:
+        old_state, self._state = self._state, state
+        self._trials = 0
+        if state == OPEN:
+            logger.warning(
+                f"Circuit of {self.account}/{self.endpoint} opened after "
+                f"{self.failures} consecutive failures"
+            )
+        else:
+            logger.info(f"Circuit of {self.account}/{self.endpoint} is {state}")
+        if self.on_state_change is not None:
+            try:
+                self.on_state_change(self, old_state, state)
+            except Exception:
+                logger.exception("Circuit breaker state change hook failed")
+
+
+class Attempt:
+    """Outcome of a request made through a `CircuitBreaker`"""
+
+    __slots__ = ("failed",)
+
+    def __init__(self) -> None:
+        self.failed: Optional[bool] = None
+
+
+class CircuitBreakers:
+    """
+    The circuit breakers of all accounts and endpoint classes (`rest_api`,
+    `restlet` and `soap_api`), with the same settings
+
+    Pass the same instance to all clients, e.g. through the `circuit_breakers`
+    option of `NetSuiteRestApi`, `NetSuiteRestlet` and `NetSuiteSoapApi`.
+
+    Args:
+        failure_threshold:
+            Consecutive failures after which a circuit opens
+        reset_timeout:
+            Seconds a circuit stays open before trial requests are let through
+        half_open_requests:
+            Number of concurrent trial requests
+        on_state_change:
+            Called with the breaker, the old and the new state whenever a
+            circuit changes state, e.g. to pause schedulers
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_requests: int = 1,
+        on_state_change: Optional[StateChangeHook] = None,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_requests = half_open_requests
+        self.on_state_change = on_state_change
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {list(self._breakers.values())!r}>"
+
+    def __iter__(self):
+        return iter(self._breakers.values())
+
+    def get(self, account: str, endpoint: str) -> CircuitBreaker:
+        breaker = self._breakers.get((account, endpoint))
+        if breaker is None:
+            breaker = self._breakers[(account, endpoint)] = CircuitBreaker(
+                account,
+                endpoint,
+                failure_threshold=self.failure_threshold,
+                reset_timeout=self.reset_timeout,
+                half_open_requests=self.half_open_requests,
+                on_state_change=self.on_state_change,
+            )
+        return breaker
+
+
+def is_outage_error(exc: BaseException) -> bool:
+    """Whether an HTTP error means the endpoint seems down"""
+    return isinstance(exc, (httpx.TimeoutException, httpx.NetworkError))
+
+
+def is_outage_status(status_code: int) -> bool:
+    return status_code >= 500
@@ -1,8 +1,7 @@
-import asyncio
-
 import IPython
 
 from ..client import NetSuite
+from ..sync import SyncNetSuite
 
 __all__ = ()
 
@@ -18,15 +17,20 @@ def add_parser(parser, subparser):
 
 def interact(config, args):
     ns = NetSuite(config)
+    # Blocking calls run on their own loop, as IPython's is busy running the
+    # cell which makes them
+    sync_ns = SyncNetSuite(config)
 
     user_ns = {
         "ns": ns,
-        "query": lambda **kwargs: asyncio.run(ns.rest_api.suiteql(**kwargs)),
+        "sync_ns": sync_ns,
+        "query": sync_ns.rest_api.suiteql,
     }
 
     banner1 = """Welcome to Netsuite WS client interactive mode
 Available vars:
     `ns` - NetSuite client
+    `sync_ns` - NetSuite client with blocking methods
     `query` - run SuiteQL sync
 
 Example usage:
@@ -40,7 +44,11 @@ Example usage:
 
     query_results = await ns.rest_api.suiteql("SELECT * FROM salesOrder")
     query_results = query("SELECT * FROM salesOrder")
+    customer = sync_ns.rest_api.get("/record/v1/customer/1")
 """
 
     print(banner1)
-    IPython.start_ipython(argv=[], user_ns=user_ns)
+    try:
+        IPython.start_ipython(argv=[], user_ns=user_ns)
+    finally:
+        sync_ns.close()
@@ -1,7 +1,6 @@
 from .. import json
 from ..client import NetSuite
 from ..config import Config
-from ..soap_api import helpers
 
 __all__ = ()
 
@@ -66,7 +65,8 @@ def _add_get_parser(parser, subparser):
 
 
 def _get_soap_api_or_error(parser, config: Config):
-    ns = NetSuite(config)
+    # Responses are only dumped as JSON, so skip building zeep objects
+    ns = NetSuite(config, soap_api_options={"response_mode": "builtin"})
 
     try:
         return ns.soap_api  # Cached property that initializes NetSuiteRestApi
@@ -75,4 +75,4 @@ def _get_soap_api_or_error(parser, config: Config):
 
 
 def _dump_response(resp) -> str:
-    return json.dumps(helpers.to_builtin(resp))
+    return json.dumps(resp)
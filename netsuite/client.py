@@ -1,7 +1,9 @@
 from functools import cached_property
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Union
 
 from .config import Config
+from .oauth2 import OAuth2TokenCache
+from .pipeline import Pipeline, Source, suiteql_rows
 from .rest_api import NetSuiteRestApi
 from .restlet import NetSuiteRestlet
 from .soap_api import NetSuiteSoapApi
@@ -17,11 +19,16 @@ class NetSuite:
         soap_api_options: Optional[Dict[str, Any]] = None,
         rest_api_options: Optional[Dict[str, Any]] = None,
         restlet_options: Optional[Dict[str, Any]] = None,
+        token_cache: Optional[OAuth2TokenCache] = None,
     ):
         self._config = config
         self._soap_api_options = soap_api_options or {}
-        self._rest_api_options = rest_api_options or {}
-        self._restlet_options = restlet_options or {}
+        self._rest_api_options = dict(rest_api_options or {})
+        self._restlet_options = dict(restlet_options or {})
+        if token_cache is not None:
+            # Share OAuth 2.0 access tokens between the REST API and Restlets
+            self._rest_api_options.setdefault("token_cache", token_cache)
+            self._restlet_options.setdefault("token_cache", token_cache)
 
     @cached_property
     def rest_api(self) -> NetSuiteRestApi:
@@ -34,3 +41,14 @@ class NetSuite:
     @cached_property
     def restlet(self) -> NetSuiteRestlet:
         return NetSuiteRestlet(self._config, **self._restlet_options)
+
+    def pipeline(
+        self, source: Union[str, Source], *, queue_size: int = 100
+    ) -> Pipeline:
+        """
+        Start a `Pipeline` from an iterable or async iterable, or from the
+        rows of a SuiteQL query, paged through with the REST API
+        """
+        if isinstance(source, str):
+            source = suiteql_rows(self.rest_api, source)
+        return Pipeline(source, queue_size=queue_size)
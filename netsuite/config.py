@@ -2,12 +2,19 @@ import configparser
 import os
 import re
 import typing as t
+from functools import cached_property
 
 from pydantic import BaseModel
 
 from .constants import DEFAULT_INI_PATH, DEFAULT_INI_SECTION
+from .token_pool import TokenPool
 
-__all__ = ("Config", "TokenAuth", "UsernamePasswordAuth")
+__all__ = (
+    "Config",
+    "OAuth2ClientCredentialsAuth",
+    "TokenAuth",
+    "UsernamePasswordAuth",
+)
 
 
 class TokenAuth(BaseModel):
@@ -15,6 +22,9 @@ class TokenAuth(BaseModel):
     consumer_secret: str
     token_id: str
     token_secret: str
+    # Concurrency allocated to the integration record, when using several
+    # credentials (see `TokenPool`)
+    concurrent_requests: t.Optional[int] = None
 
 
 class UsernamePasswordAuth(BaseModel):
@@ -28,11 +38,30 @@ class UsernamePasswordAuth(BaseModel):
     password: str
 
 
+class OAuth2ClientCredentialsAuth(BaseModel):
+    """
+    OAuth 2.0 client credentials (machine-to-machine) flow
+
+    Only supported by the REST API and Restlets. `certificate_id` is the ID
+    NetSuite assigns to the certificate uploaded for the integration record,
+    and `private_key` its PEM encoded private key.
+    """
+
+    client_id: str
+    certificate_id: str
+    private_key: str
+    algorithm: t.Literal["PS256", "PS384", "PS512", "ES256", "ES384", "ES512"] = "PS256"
+    scopes: t.List[str] = ["rest_webservices", "restlets"]
+
+
 class Config(BaseModel):
     account: str
-    auth: t.Union[TokenAuth, UsernamePasswordAuth]
-    # TODO: Support OAuth2
-    # auth: Union[OAuth2, TokenAuth]
+    auth: t.Union[
+        TokenAuth,
+        UsernamePasswordAuth,
+        OAuth2ClientCredentialsAuth,
+        t.List[TokenAuth],
+    ]
 
     log_level: t.Optional[str] = None
 
@@ -43,6 +72,17 @@ class Config(BaseModel):
     def is_token_auth(self) -> bool:
         return isinstance(self.auth, TokenAuth)
 
+    @property
+    def is_oauth2_auth(self) -> bool:
+        return isinstance(self.auth, OAuth2ClientCredentialsAuth)
+
+    @cached_property
+    def token_pool(self) -> t.Optional[TokenPool]:
+        """Pool shared by all clients, when several token credentials are given"""
+        if isinstance(self.auth, list):
+            return TokenPool(self.auth)
+        return None
+
     @property
     def is_sandbox(self) -> bool:
         return re.search(r"_SB[\d]+$", self.account) is not None
@@ -67,6 +107,7 @@ class Config(BaseModel):
             if (
                 key in TokenAuth.model_fields
                 or key in UsernamePasswordAuth.model_fields
+                or key in OAuth2ClientCredentialsAuth.model_fields
             ):
                 reorganized["auth"][key] = val
             else:
@@ -86,6 +127,9 @@ class Config(BaseModel):
         - `NETSUITE_TOKEN_SECRET`: The token secret for OAuth.
         - `NETSUITE_USERNAME`: The username for login auth (only for odbc).
         - `NETSUITE_PASSWORD`: The password for login auth (only for odbc).
+        - `NETSUITE_CLIENT_ID`: The client ID for OAuth 2.0.
+        - `NETSUITE_CERTIFICATE_ID`: The certificate ID for OAuth 2.0.
+        - `NETSUITE_PRIVATE_KEY`: The PEM encoded private key for OAuth 2.0.
         - `NETSUITE_LOG_LEVEL`: log level for NetSuite debugging
 
         Returns a dictionary of available config options.
@@ -100,6 +144,9 @@ class Config(BaseModel):
             "token_secret",
             "username",
             "password",
+            "client_id",
+            "certificate_id",
+            "private_key",
             "log_level",
         ]
         prefix = "NETSUITE_"
@@ -123,8 +170,10 @@ class Config(BaseModel):
         selected_configuration = iniconf[section]
 
         auth_type = selected_configuration.get("auth_type", "token")
-        if auth_type != "token":
-            raise RuntimeError(f"Only token auth is supported, not `{auth_type}`")
+        if auth_type not in ("token", "oauth2"):
+            raise RuntimeError(
+                f"Only token and oauth2 auth are supported, not `{auth_type}`"
+            )
 
         raw = {key: val for key, val in selected_configuration.items()}
         reorganized = cls._reorganize_auth_keys(raw)
@@ -6,3 +6,8 @@ DEFAULT_INI_PATH: str = os.environ.get(
     os.path.expanduser("~/.config/netsuite.ini"),
 )
 DEFAULT_INI_SECTION: str = "netsuite"
+# Max number of records per SuiteTalk SOAP list write (addList, upsertList etc.)
+SOAP_WRITE_LIST_LIMIT: int = 200
+# Max number of records per SuiteTalk SOAP asynchronous list job
+SOAP_ASYNC_WRITE_LIST_LIMIT: int = 400
+SOAP_ASYNC_GET_LIST_LIMIT: int = 2000
@@ -0,0 +1,193 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Iterator, Optional, TypeVar, Union
+
+import httpx
+
+from .exceptions import DeadlineExceeded
+
+__all__ = ("Deadline", "current_deadline", "deadline")
+
+T = TypeVar("T")
+
+_current_deadline: ContextVar[Optional["Deadline"]] = ContextVar(
+    "netsuite_deadline", default=None
+)
+
+
+class Deadline:
+    """
+    A point in time by which all requests of an operation must be done
+
+    Use through the `deadline` context manager, rather than directly.
+
+    Args:
+        seconds:
+            Time budget of the operation
+        connect, read, write, pool:
+            Upper limits of the respective HTTP timeouts of each request,
+            which are otherwise only bounded by the time left
+    """
+
+    def __init__(
+        self,
+        seconds: float,
+        *,
+        connect: Optional[float] = None,
+        read: Optional[float] = None,
+        write: Optional[float] = None,
+        pool: Optional[float] = None,
+    ) -> None:
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        self.connect = connect
+        self.read = read
+        self.write = write
+        self.pool = pool
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} remaining={self.remaining:.3f}s>"
+
+    @property
+    def remaining(self) -> float:
+        """Seconds left, 0 once expired"""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining <= 0
+
+    def check(self) -> None:
+        """Raise `DeadlineExceeded` if there's no time left"""
+        if self.expired:
+            raise DeadlineExceeded(self.seconds)
+
+    def timeout(
+        self, default: Union[None, float, httpx.Timeout] = None
+    ) -> httpx.Timeout:
+        """
+        HTTP timeouts for a request made now: those of `default` and of the
+        phase limits, capped by the time left
+        """
+        self.check()
+        remaining = self.remaining
+        default = httpx.Timeout(default)
+
+        def cap(*limits: Optional[float]) -> float:
+            return min([remaining, *(limit for limit in limits if limit is not None)])
+
+        return httpx.Timeout(
+            connect=cap(default.connect, self.connect),
+            read=cap(default.read, self.read),
+            write=cap(default.write, self.write),
+            pool=cap(default.pool, self.pool),
+        )
+
+    async def wait_for(self, awaitable: Awaitable[T]) -> T:
+        """Await `awaitable`, cancelling it once the deadline passes"""
+        try:
+            return await asyncio.wait_for(awaitable, self.remaining)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(self.seconds) from None
+
+
+def current_deadline() -> Optional[Deadline]:
+    """The deadline of the operation being run, if any"""
+    return _current_deadline.get()
+
+
+def check_deadline() -> None:
+    """Raise `DeadlineExceeded` if the current deadline has passed"""
+    current = _current_deadline.get()
+    if current is not None:
+        current.check()
+
+
+def deadline_timeout(
+    default: Union[None, float, httpx.Timeout]
+) -> Union[None, float, httpx.Timeout]:
+    """HTTP timeouts of a request made now, `default` if there's no deadline"""
+    current = _current_deadline.get()
+    return default if current is None else current.timeout(default)
+
+
+@contextmanager
+def deadline_errors() -> Iterator[None]:
+    """
+    Raise HTTP timeouts caused by the current deadline as `DeadlineExceeded`,
+    so they aren't mistaken for a slow endpoint
+    """
+    try:
+        yield
+    except httpx.TimeoutException as ex:
+        current = _current_deadline.get()
+        if current is not None and current.expired:
+            raise DeadlineExceeded(current.seconds) from ex
+        raise
+
+
+async def within_deadline(awaitable: Awaitable[T]) -> T:
+    """Await `awaitable`, cancelling it once the current deadline passes"""
+    current = _current_deadline.get()
+    if current is None:
+        return await awaitable
+    return await current.wait_for(awaitable)
+
+
+async def without_deadline(fn: Callable[[], Awaitable[T]]) -> T:
+    """
+    Await `fn()` outside of the current deadline, for work shared by callers
+    with deadlines of their own
+    """
+    token = _current_deadline.set(None)
+    try:
+        return await fn()
+    finally:
+        _current_deadline.reset(token)
+
+
+@contextmanager
+def deadline(
+    seconds: float,
+    *,
+    connect: Optional[float] = None,
+    read: Optional[float] = None,
+    write: Optional[float] = None,
+    pool: Optional[float] = None,
+) -> Iterator[Deadline]:
+    """
+    Bound the time of all requests made inside the block, by any client
+
+    The deadline flows through everything started within it, including
+    tasks, pagination and hedged requests. The timeouts of each request are
+    capped by the time left, and requests still waiting for a concurrency
+    slot are cancelled once it passes. Requests then raise `DeadlineExceeded`
+    (an `asyncio.TimeoutError`). Nested deadlines can only shorten the
+    outer one.
+
+    >>> with deadline(120, connect=5):
+    ...     async for record in ns.soap_api.stream_search(record):
+    ...         ...
+
+    Args:
+        seconds:
+            Time budget of the block
+        connect, read, write, pool:
+            Upper limits of the respective HTTP timeouts of each request
+    """
+    new = Deadline(seconds, connect=connect, read=read, write=write, pool=pool)
+    outer = _current_deadline.get()
+    if outer is not None:
+        if outer.expires_at < new.expires_at:
+            new.expires_at = outer.expires_at
+            new.seconds = outer.seconds
+        for phase in ("connect", "read", "write", "pool"):
+            if getattr(new, phase) is None:
+                setattr(new, phase, getattr(outer, phase))
+    token = _current_deadline.set(new)
+    try:
+        yield new
+    finally:
+        _current_deadline.reset(token)
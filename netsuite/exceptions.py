@@ -1,3 +1,6 @@
+import asyncio
+
+
 class NetsuiteAPIRequestError(Exception):
     """Raised when a Netsuite REST API request fails"""
 
@@ -11,3 +14,39 @@ class NetsuiteAPIRequestError(Exception):
 
 class NetsuiteAPIResponseParsingError(NetsuiteAPIRequestError):
     """Raised when parsing a Netsuite REST API response fails"""
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of making a request while an endpoint seems to be down"""
+
+    def __init__(self, account: str, endpoint: str, retry_after: float):
+        self.account = account
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+    def __str__(self):
+        return (
+            f"Circuit of {self.account}/{self.endpoint} is open, "
+            f"retry after {self.retry_after:.1f}s"
+        )
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """Raised when the deadline of an operation passes before it's done"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def __str__(self):
+        return f"Deadline of {self.seconds:g}s exceeded"
+
+
+class RestletBatchError(Exception):
+    """Raised for a call of a batch whose Restlet reported an error for it"""
+
+    def __init__(self, code: str, message: str):
+        self.code = code
+        self.message = message
+
+    def __str__(self):
+        return f"{self.code} - {self.message}"
@@ -0,0 +1,213 @@
+import asyncio
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Deque, Optional, Set, Tuple, TypeVar
+
+__all__ = ("Hedger", "HedgeStats")
+
+T = TypeVar("T")
+
+
+class _Timer:
+    __slots__ = ("start", "end", "started")
+
+    def __init__(self, started: bool = True) -> None:
+        self.start: Optional[float] = None
+        self.end: Optional[float] = None
+        self.started = asyncio.Event()
+        if started:
+            self.restart()
+
+    def restart(self) -> None:
+        self.start = time.monotonic()
+        self.started.set()
+
+    @property
+    def elapsed(self) -> float:
+        if self.start is None:
+            return 0.0
+        end = time.monotonic() if self.end is None else self.end
+        return end - self.start
+
+
+_timer: ContextVar[Optional[_Timer]] = ContextVar("netsuite_hedge_timer", default=None)
+
+
+def start_timer() -> None:
+    """
+    Start the latency timer of the request being hedged, if any
+
+    Called once the request got its concurrency slot, so that the time spent
+    queued for it isn't taken for NetSuite being slow.
+    """
+    timer = _timer.get()
+    if timer is not None:
+        timer.restart()
+
+
+class HedgeStats:
+    """Counters of a `Hedger`"""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} requests={self.requests} "
+            f"hedged={self.hedged} hedge_wins={self.hedge_wins}>"
+        )
+
+    def as_dict(self) -> dict:
+        return dict(vars(self))
+
+
+class Hedger:
+    """
+    Send a duplicate of a request which takes longer than usual, and use
+    whichever response arrives first
+
+    The delay before hedging is the `percentile` of the latencies of the last
+    `window` requests, so only the slowest requests are duplicated. Until
+    `min_samples` latencies are known, requests aren't hedged. The duplicate
+    goes through the same concurrency limit as any other request, and the
+    time spent waiting for it isn't counted in latencies.
+
+    Only use for idempotent requests, i.e. reads.
+
+    Args:
+        percentile:
+            Percentile of recent latencies after which a request is hedged
+        window:
+            Number of recent latencies to compute the percentile from
+        min_samples:
+            Number of latencies needed before hedging
+        min_delay:
+            Lower bound of the delay, in seconds
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        *,
+        window: int = 1000,
+        min_samples: int = 20,
+        min_delay: float = 0.05,
+    ) -> None:
+        if not 0 < percentile < 100:
+            raise ValueError("`percentile` must be between 0 and 100")
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.stats = HedgeStats()
+        self._latencies: Deque[float] = deque(maxlen=window)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} p{self.percentile:g} delay={self.delay}>"
+
+    @property
+    def delay(self) -> Optional[float]:
+        """Seconds after which a request is hedged, `None` if too few samples"""
+        if len(self._latencies) < self.min_samples:
+            return None
+        latencies = sorted(self._latencies)
+        index = min(int(len(latencies) * self.percentile / 100), len(latencies) - 1)
+        return max(latencies[index], self.min_delay)
+
+    def record(self, latency: float) -> None:
+        self._latencies.append(latency)
+
+    async def run(
+        self, fn: Callable[[], Awaitable[T]], *, deferred_start: bool = False
+    ) -> T:
+        """
+        Call `fn`, and call it again if it's slow, returning the first result
+
+        Args:
+            fn:
+                Function making the request
+            deferred_start:
+                Whether `fn` calls `start_timer` once the request is sent,
+                e.g. after waiting for a concurrency slot. Its latency, and
+                the delay before hedging it, are then counted from that call.
+        """
+        self.stats.requests += 1
+        delay = self.delay
+        primary, timer = self._start(fn, deferred_start)
+        try:
+            await self._wait_delay(primary, timer, delay)
+        except BaseException:
+            primary.cancel()
+            raise
+        if primary.done():
+            return self._result(primary, timer)
+
+        self.stats.hedged += 1
+        hedge, _ = self._start(fn, deferred_start)
+        pending: Set["asyncio.Task[T]"] = {primary, hedge}
+        try:
+            while True:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                succeeded = [task for task in done if task.exception() is None]
+                if succeeded:
+                    # Prefer the primary, in case both finished at the same time
+                    if primary in succeeded:
+                        return self._result(primary, timer)
+                    self.stats.hedge_wins += 1
+                    # Only the primary's latency is recorded, as the hedge's
+                    # doesn't tell how long requests take without hedging.
+                    # It's cancelled, so it's known to take at least this long.
+                    self.record(timer.elapsed)
+                    return hedge.result()
+                if not pending:
+                    # Both failed
+                    return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _wait_delay(
+        self, task: "asyncio.Task[T]", timer: _Timer, delay: Optional[float]
+    ) -> None:
+        """Wait until `task` is done or has run for `delay` since its timer started"""
+        if delay is None:
+            await asyncio.wait({task})
+            return
+        if not timer.started.is_set():
+            # Not counting down while the task waits for its concurrency slot
+            started = asyncio.ensure_future(timer.started.wait())
+            try:
+                await asyncio.wait({task, started}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                started.cancel()
+        while not task.done():
+            remaining = delay - timer.elapsed
+            if remaining <= 0:
+                return
+            await asyncio.wait({task}, timeout=remaining)
+
+    def _start(
+        self, fn: Callable[[], Awaitable[T]], deferred_start: bool
+    ) -> Tuple["asyncio.Task[T]", _Timer]:
+        timer = _Timer(started=not deferred_start)
+        return asyncio.ensure_future(_timed(fn, timer)), timer
+
+    def _result(self, task: "asyncio.Task[T]", timer: _Timer) -> T:
+        result = task.result()
+        # Not started if it failed before being sent
+        if timer.start is not None:
+            self.record(timer.elapsed)
+        return result
+
+
+async def _timed(fn: Callable[[], Awaitable[T]], timer: _Timer) -> T:
+    # Set in the task's own copy of the context
+    _timer.set(timer)
+    try:
+        return await fn()
+    finally:
+        timer.end = time.monotonic()
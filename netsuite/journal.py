@@ -0,0 +1,380 @@
+import asyncio
+import logging
+import os
+import pathlib
+import pickle
+import sqlite3
+import threading
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from . import constants
+from .soap_api import helpers
+from .soap_api.results import WriteResult
+
+logger = logging.getLogger(__name__)
+
+__all__ = ("DeadLetter", "Journal", "JournaledJob", "JobResult")
+
+# Kinds of journal entries
+PAGE = "page"
+FINISHED = "finished"
+DONE = "done"
+DEAD = "dead"
+
+FetchPage = Callable[[int], Awaitable[Tuple[List[Any], bool]]]
+WriteBatch = Callable[[List[Any]], Awaitable[Sequence[WriteResult]]]
+
+
+class DeadLetter:
+    """An item NetSuite rejected, kept for a later replay"""
+
+    __slots__ = ("key", "item", "error")
+
+    def __init__(self, key: str, item: Any, error: str) -> None:
+        self.key = key
+        self.item = item
+        self.error = error
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.key!r} error={self.error!r}>"
+
+
+class JobResult:
+    """Outcome of a run of `JournaledJob.write`"""
+
+    def __init__(self) -> None:
+        self.written = 0
+        self.dead = 0
+        self.skipped = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} written={self.written} "
+            f"dead={self.dead} skipped={self.skipped}>"
+        )
+
+    def as_dict(self) -> dict:
+        return dict(vars(self))
+
+
+class Journal:
+    """
+    Append-only SQLite log of the progress of long running jobs, so they can
+    resume where they stopped after a crash or restart
+
+    Dead letters are pickled, so the database must only be writable by
+    trusted users.
+
+    >>> journal = Journal("~/.cache/netsuite-jobs.sqlite")
+    >>> job = journal.job("nightly-customer-push")
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]) -> None:
+        self.path = pathlib.Path(path).expanduser()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "job_id TEXT, kind TEXT, key TEXT, data BLOB, error TEXT, "
+                "created_at REAL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS entries_job ON entries (job_id, kind)"
+            )
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.path}>"
+
+    def job(self, job_id: str) -> "JournaledJob":
+        return JournaledJob(self, job_id)
+
+    def reset(self, job_id: str) -> None:
+        """Forget all progress of a job, to run it from the start again"""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM entries WHERE job_id = ?", (job_id,))
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _append(
+        self,
+        job_id: str,
+        kind: str,
+        entries: Iterable[Tuple[str, Optional[bytes], Optional[str]]],
+    ) -> None:
+        now = time.time()
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                [(job_id, kind, key, data, error, now) for key, data, error in entries],
+            )
+
+    def _keys(self, job_id: str, kind: str) -> Set[str]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key FROM entries WHERE job_id = ? AND kind = ?",
+                (job_id, kind),
+            ).fetchall()
+        return {key for key, in rows}
+
+    def _dead_letters(self, job_id: str) -> List[DeadLetter]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, data, error FROM entries "
+                "WHERE job_id = ? AND kind = ? ORDER BY rowid",
+                (job_id, DEAD),
+            ).fetchall()
+        done = self._keys(job_id, DONE)
+        # The latest entry of a key wins, when an item failed again on replay
+        latest: Dict[str, DeadLetter] = {}
+        for key, data, error in rows:
+            if key not in done:
+                latest.pop(key, None)
+                latest[key] = DeadLetter(key, pickle.loads(data), error)
+        return list(latest.values())
+
+
+class JournaledJob:
+    """
+    A job whose progress is kept in a `Journal`
+
+    Reading jobs page through results with `pages` or `suiteql`, and resume
+    after the last page fully processed. Writing jobs send items with
+    `write`, and skip items written by earlier runs. Items NetSuite rejects
+    become dead letters, which are retried only by `replay`.
+    """
+
+    def __init__(self, journal: Journal, job_id: str) -> None:
+        self.journal = journal
+        self.job_id = job_id
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.job_id!r}>"
+
+    @property
+    def checkpoint(self) -> Optional[int]:
+        """Index of the last page fully processed, `None` if none"""
+        pages = self.journal._keys(self.job_id, PAGE)
+        return max((int(page) for page in pages), default=None)
+
+    @property
+    def is_finished(self) -> bool:
+        """Whether all pages were processed"""
+        return bool(self.journal._keys(self.job_id, FINISHED))
+
+    async def pages(self, fetch_page: FetchPage) -> AsyncIterator[List[Any]]:
+        """
+        Yield pages, starting after the checkpoint
+
+        A page is journaled as processed once the next one is asked for, so a
+        page being processed during a crash is yielded again on restart.
+
+        Args:
+            fetch_page:
+                Called with the index of a page. Returns its items, and
+                whether there are more pages.
+        """
+        if self.is_finished:
+            return
+        checkpoint = self.checkpoint
+        index = 0 if checkpoint is None else checkpoint + 1
+        if index:
+            logger.info(f"Resuming job {self.job_id!r} at page {index}")
+        while True:
+            items, has_more = await fetch_page(index)
+            yield items
+            self.journal._append(self.job_id, PAGE, [(str(index), None, None)])
+            if not has_more:
+                self.journal._append(self.job_id, FINISHED, [("", None, None)])
+                return
+            index += 1
+
+    def suiteql(
+        self, rest_api: Any, q: str, *, page_size: int = 1000
+    ) -> AsyncIterator[List[Any]]:
+        """Yield the rows of a SuiteQL query a page at a time, see `pages`"""
+
+        async def fetch_page(index: int) -> Tuple[List[Any], bool]:
+            result = await rest_api.suiteql(
+                q, limit=page_size, offset=index * page_size
+            )
+            return result["items"], result["hasMore"]
+
+        return self.pages(fetch_page)
+
+    async def write(
+        self,
+        items: Iterable[Any],
+        write_batch: WriteBatch,
+        *,
+        key: Callable[[Any], str],
+        batch_size: int = constants.SOAP_WRITE_LIST_LIMIT,
+        concurrency: int = 4,
+        max_attempts: int = 3,
+        backoff: float = 1.0,
+    ) -> JobResult:
+        """
+        Write items in batches, skipping those done by earlier runs
+
+        >>> await job.write(
+        ...     records, ns.soap_api.upsertList, key=lambda r: r.externalId
+        ... )
+
+        Args:
+            items:
+                The items to write
+            write_batch:
+                Writes a list of items, returning a `WriteResult` per item,
+                e.g. `NetSuiteSoapApi.upsertList`
+            key:
+                Returns the unique key of an item, e.g. its external ID
+            batch_size:
+                Number of items per call of `write_batch`
+            concurrency:
+                Number of batches written at a time
+            max_attempts:
+                Attempts of a batch which raises an error, e.g. a timeout.
+                If all fail, no more batches are started, and the error is
+                raised once the batches being written are done and
+                journaled. The job can then be resumed later.
+            backoff:
+                Seconds to wait before the second attempt, doubling after
+                each attempt
+        """
+        result = JobResult()
+        seen = self.journal._keys(self.job_id, DONE) | self.journal._keys(
+            self.job_id, DEAD
+        )
+        pending = []
+        for item in items:
+            if str(key(item)) in seen:
+                result.skipped += 1
+            else:
+                pending.append(item)
+
+        await self._write_batches(
+            helpers.chunked(pending, batch_size),
+            write_batch,
+            key,
+            concurrency,
+            max_attempts,
+            backoff,
+            result,
+        )
+        return result
+
+    def dead_letters(self) -> List[DeadLetter]:
+        """Items NetSuite rejected, and which weren't replayed successfully"""
+        return self.journal._dead_letters(self.job_id)
+
+    async def replay(
+        self,
+        write_batch: WriteBatch,
+        *,
+        batch_size: int = constants.SOAP_WRITE_LIST_LIMIT,
+        concurrency: int = 4,
+        max_attempts: int = 3,
+        backoff: float = 1.0,
+    ) -> JobResult:
+        """Write the dead letters again, e.g. after fixing the cause"""
+        letters = {letter.key: letter for letter in self.dead_letters()}
+        items = {id(letter.item): key for key, letter in letters.items()}
+        result = JobResult()
+        await self._write_batches(
+            helpers.chunked([letter.item for letter in letters.values()], batch_size),
+            write_batch,
+            lambda item: items[id(item)],
+            concurrency,
+            max_attempts,
+            backoff,
+            result,
+        )
+        return result
+
+    async def _write_batches(
+        self,
+        batches: Iterable[List[Any]],
+        write_batch: WriteBatch,
+        key: Callable[[Any], str],
+        concurrency: int,
+        max_attempts: int,
+        backoff: float,
+        result: JobResult,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("`concurrency` must be at least 1")
+        # Shared by the workers, so each batch is written once
+        batches = iter(batches)
+        errors: List[Exception] = []
+
+        async def worker() -> None:
+            for batch in batches:
+                if errors:
+                    # Left for the job to be resumed
+                    return
+                try:
+                    await self._write_batch(
+                        batch, write_batch, key, max_attempts, backoff, result
+                    )
+                except Exception as ex:
+                    errors.append(ex)
+                    return
+
+        # Batches being written when one fails are finished and journaled
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        if errors:
+            raise errors[0]
+
+    async def _write_batch(
+        self,
+        batch: List[Any],
+        write_batch: WriteBatch,
+        key: Callable[[Any], str],
+        max_attempts: int,
+        backoff: float,
+        result: JobResult,
+    ) -> None:
+        for attempt in range(1, max_attempts + 1):
+            try:
+                write_results = await write_batch(batch)
+                # The request failed as a whole, e.g. for `upsertList`
+                errors = [r.error for r in write_results if r.error is not None]
+                if errors:
+                    raise errors[0]
+                break
+            except Exception:
+                if attempt == max_attempts:
+                    raise
+                delay = backoff * 2 ** (attempt - 1)
+                logger.warning(
+                    f"Batch of job {self.job_id!r} failed, retrying in {delay}s",
+                    exc_info=True,
+                )
+                await asyncio.sleep(delay)
+
+        done, dead = [], []
+        for item, write_result in zip(batch, write_results):
+            if write_result.is_success:
+                done.append((str(key(item)), None, None))
+            else:
+                data = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+                dead.append((str(key(item)), data, repr(write_result.status_details)))
+        self.journal._append(self.job_id, DONE, done)
+        self.journal._append(self.job_id, DEAD, dead)
+        result.written += len(done)
+        result.dead += len(dead)
@@ -1,62 +1,44 @@
 import datetime
+import json as _stdlib_json
+import os
 from decimal import Decimal
 from enum import Enum
 from pathlib import Path
-from typing import Any, Callable, Dict, Type, Union
+from typing import Any, Callable, Dict, Tuple, Type, Union
 from uuid import UUID
 
-__all__ = ("dumps", "loads")
+__all__ = ("dumps", "dumps_bytes", "loads", "set_backend", "BACKEND")
 
 try:
-    import orjson as _json
+    import msgspec as _msgspec
 except ImportError:
-    import json as _json  # type: ignore[no-redef]
+    HAS_MSGSPEC = False
+else:
+    HAS_MSGSPEC = True
 
+try:
+    import orjson as _orjson
+except ImportError:
     HAS_ORJSON = False
 else:
     HAS_ORJSON = True
 
+Encoder = Callable[[Any], Any]
+Loads = Callable[[Union[str, bytes]], Any]
+DumpsBytes = Callable[..., bytes]
+Dumps = Callable[..., str]
 
-loads = _json.loads
-
-
-def dumps(obj: Any, *args, **kw) -> str:
-    if HAS_ORJSON:
-        kw["default"] = _orjson_default
-        return _json.dumps(obj, *args, **kw).decode("utf-8")
-    else:
-        return _json.dumps(obj, *args, **kw)  # type: ignore[return-value]
-
-
-def _orjson_default(obj: Any) -> Any:
-    """Handle cases which orjson doesn't know what to do with"""
-
-    # Handle that orjson doesn't support subclasses of str
-    if isinstance(obj, str):
-        return str(obj)
-    else:
-        encoder = _get_encoder(obj)
-        return encoder(obj)
+BACKEND: str
+loads: Loads
+dumps_bytes: DumpsBytes
+dumps: Dumps
 
 
 def _isoformat(o: Union[datetime.date, datetime.time]) -> str:
     return o.isoformat()
 
 
-def _get_encoder(obj: Any) -> Any:
-    for base in obj.__class__.__mro__[:-1]:
-        try:
-            encoder = _ENCODERS_BY_TYPE[base]
-        except KeyError:
-            continue
-        return encoder(obj)
-    else:  # We have exited the for loop without finding a suitable encoder
-        raise TypeError(
-            f"Object of type '{obj.__class__.__name__}' is not JSON serializable"
-        )
-
-
-_ENCODERS_BY_TYPE: Dict[Type[Any], Callable[[Any], Any]] = {
+_ENCODERS_BY_TYPE: Dict[Type[Any], Encoder] = {
     bytes: lambda o: o.decode(),
     datetime.date: _isoformat,
     datetime.datetime: _isoformat,
@@ -69,3 +51,108 @@ _ENCODERS_BY_TYPE: Dict[Type[Any], Callable[[Any], Any]] = {
     set: list,
     UUID: str,
 }
+
+# Encoder resolved for each concrete type seen so far, so that the MRO only
+# has to be walked once per type
+_encoder_cache: Dict[Type[Any], Encoder] = {}
+
+
+def _get_encoder(cls: Type[Any]) -> Encoder:
+    try:
+        return _encoder_cache[cls]
+    except KeyError:
+        pass
+    for base in cls.__mro__[:-1]:
+        try:
+            encoder = _ENCODERS_BY_TYPE[base]
+        except KeyError:
+            continue
+        _encoder_cache[cls] = encoder
+        return encoder
+    else:  # We have exited the for loop without finding a suitable encoder
+        raise TypeError(f"Object of type '{cls.__name__}' is not JSON serializable")
+
+
+def _default(obj: Any) -> Any:
+    """Handle cases which the JSON backend doesn't know what to do with"""
+
+    # Handle that orjson doesn't support subclasses of str
+    if isinstance(obj, str):
+        return str(obj)
+    else:
+        return _get_encoder(obj.__class__)(obj)
+
+
+def _msgspec_backend() -> Tuple[Loads, DumpsBytes, Dumps]:
+    default_encoder = _msgspec.json.Encoder(enc_hook=_default, decimal_format="number")
+
+    def dumps_bytes(obj: Any, *args, **kw) -> bytes:
+        if "default" in kw:
+            encoder = _msgspec.json.Encoder(
+                enc_hook=kw.pop("default"), decimal_format="number"
+            )
+        else:
+            encoder = default_encoder
+        return encoder.encode(obj, *args, **kw)
+
+    def dumps(obj: Any, *args, **kw) -> str:
+        return dumps_bytes(obj, *args, **kw).decode("utf-8")
+
+    return _msgspec.json.decode, dumps_bytes, dumps
+
+
+def _orjson_backend() -> Tuple[Loads, DumpsBytes, Dumps]:
+    def dumps_bytes(obj: Any, *args, **kw) -> bytes:
+        kw.setdefault("default", _default)
+        return _orjson.dumps(obj, *args, **kw)
+
+    def dumps(obj: Any, *args, **kw) -> str:
+        kw.setdefault("default", _default)
+        return _orjson.dumps(obj, *args, **kw).decode("utf-8")
+
+    return _orjson.loads, dumps_bytes, dumps
+
+
+def _stdlib_backend() -> Tuple[Loads, DumpsBytes, Dumps]:
+    def dumps_bytes(obj: Any, *args, **kw) -> bytes:
+        kw.setdefault("default", _default)
+        return _stdlib_json.dumps(obj, *args, **kw).encode("utf-8")
+
+    def dumps(obj: Any, *args, **kw) -> str:
+        kw.setdefault("default", _default)
+        return _stdlib_json.dumps(obj, *args, **kw)
+
+    return _stdlib_json.loads, dumps_bytes, dumps
+
+
+_BACKENDS = {
+    "msgspec": (lambda: HAS_MSGSPEC, _msgspec_backend),
+    "orjson": (lambda: HAS_ORJSON, _orjson_backend),
+    "json": (lambda: True, _stdlib_backend),
+}
+
+
+def set_backend(name: str) -> None:
+    """
+    Use another JSON backend: `"orjson"`, `"msgspec"` or `"json"`
+
+    NOTE: msgspec is only used when explicitly selected, here or with the
+          `NETSUITE_JSON_BACKEND` environment variable, as it encodes
+          `bytes` as base64, `timedelta` as an ISO 8601 duration and UTC
+          datetimes with a `Z` suffix, unlike the other backends.
+    """
+    global BACKEND, loads, dumps_bytes, dumps
+
+    try:
+        is_installed, make_backend = _BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown JSON backend {name!r}") from None
+    if not is_installed():
+        raise RuntimeError(f"JSON backend {name!r} isn't installed")
+    loads, dumps_bytes, dumps = make_backend()
+    BACKEND = name
+
+
+set_backend(
+    os.environ.get("NETSUITE_JSON_BACKEND") or ("orjson" if HAS_ORJSON else "json")
+)
@@ -0,0 +1,347 @@
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+import pathlib
+import tempfile
+import time
+from functools import cached_property
+from typing import Any, Callable, Dict, Generator, Optional, Tuple, Union
+
+import httpx
+
+from . import json
+from .config import Config, OAuth2ClientCredentialsAuth
+from .exceptions import NetsuiteAPIRequestError
+
+try:
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, padding, utils
+except ImportError:
+    CRYPTOGRAPHY_INSTALLED = False
+else:
+    CRYPTOGRAPHY_INSTALLED = True
+
+    HASHES: Dict[str, Callable[[], hashes.HashAlgorithm]] = {
+        "256": hashes.SHA256,
+        "384": hashes.SHA384,
+        "512": hashes.SHA512,
+    }
+
+logger = logging.getLogger(__name__)
+
+__all__ = (
+    "AccessToken",
+    "FileTokenStore",
+    "OAuth2ClientCredentials",
+    "OAuth2TokenCache",
+    "TokenStore",
+    "default_token_cache",
+)
+
+CLIENT_ASSERTION_TYPE = "urn:ietf:params:oauth:client-assertion-type:jwt-bearer"
+# How long the signed JWT used to request an access token is valid
+CLIENT_ASSERTION_LIFETIME = 300
+
+
+class AccessToken:
+    """A bearer token, valid until the `expires_at` UNIX timestamp"""
+
+    def __init__(self, access_token: str, expires_at: float) -> None:
+        self.access_token = access_token
+        self.expires_at = expires_at
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} expires_at={self.expires_at}>"
+
+    def expires_within(self, seconds: float) -> bool:
+        return self.expires_at - time.time() <= seconds
+
+    @property
+    def is_expired(self) -> bool:
+        return self.expires_within(0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"access_token": self.access_token, "expires_at": self.expires_at}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AccessToken":
+        return cls(data["access_token"], data["expires_at"])
+
+
+class TokenStore:
+    """Where an `OAuth2TokenCache` persists tokens. Stores nothing by default."""
+
+    def load(self, key: str) -> Optional[AccessToken]:
+        return None
+
+    def save(self, key: str, token: AccessToken) -> None:
+        pass
+
+
+class FileTokenStore(TokenStore):
+    """
+    Persist tokens in a JSON file, so they survive process restarts
+
+    The file is only readable by the current user, and is replaced atomically
+    so that processes sharing it never see a partial write.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]) -> None:
+        self.path = pathlib.Path(path).expanduser()
+
+    def load(self, key: str) -> Optional[AccessToken]:
+        data = self._read().get(key)
+        return None if data is None else AccessToken.from_dict(data)
+
+    def save(self, key: str, token: AccessToken) -> None:
+        data = {
+            other_key: other_token
+            for other_key, other_token in self._read().items()
+            if other_token["expires_at"] > time.time()
+        }
+        data[key] = token.to_dict()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name)
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                fp.write(json.dumps_bytes(data))
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            return json.loads(self.path.read_bytes())
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            logger.warning(f"Ignoring invalid token store {self.path}")
+            return {}
+
+
+class OAuth2TokenCache:
+    """
+    Access tokens shared by all clients using the same credentials
+
+    A token is refreshed in the background once it's within `refresh_margin`
+    seconds of expiring, while requests keep using the current one. Only a
+    single refresh per credential and event loop is made at a time, however
+    many requests are waiting for it.
+
+    Args:
+        store:
+            Where to persist tokens, e.g. a `FileTokenStore`
+        refresh_margin:
+            Seconds before expiry to start refreshing the token
+    """
+
+    def __init__(
+        self, store: Optional[TokenStore] = None, refresh_margin: float = 300
+    ) -> None:
+        self.store = store or TokenStore()
+        self.refresh_margin = refresh_margin
+        self._tokens: Dict[str, AccessToken] = {}
+        # Per event loop, as the cache is shared by clients of all threads
+        self._refreshes: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Task] = {}
+
+    async def get_token(self, auth: "OAuth2ClientCredentials") -> AccessToken:
+        key = auth.cache_key
+        token = self._tokens.get(key)
+        if token is None:
+            token = self.store.load(key)
+            if token is not None:
+                self._tokens[key] = token
+
+        if token is None or token.is_expired:
+            return await self._refresh(auth)
+        if token.expires_within(self.refresh_margin):
+            self._refresh(auth)
+        return token
+
+    def invalidate(self, auth: "OAuth2ClientCredentials", token: AccessToken) -> None:
+        """Stop using `token`, e.g. after it's been rejected"""
+        key = auth.cache_key
+        if self._tokens.get(key) is token:
+            # Kept, but as expired, so that the token isn't loaded from the
+            # store again
+            self._tokens[key] = AccessToken(token.access_token, expires_at=0)
+
+    def _refresh(self, auth: "OAuth2ClientCredentials") -> "asyncio.Task[AccessToken]":
+        key = auth.cache_key
+        refresh_key = (asyncio.get_running_loop(), key)
+        task = self._refreshes.get(refresh_key)
+        if task is None or task.done():
+            task = self._refreshes[refresh_key] = asyncio.ensure_future(
+                self._fetch(key, auth)
+            )
+            task.add_done_callback(_retrieve_exception)
+        return task
+
+    async def _fetch(self, key: str, auth: "OAuth2ClientCredentials") -> AccessToken:
+        try:
+            # Another process sharing the store might have refreshed already
+            token = self.store.load(key)
+            current = self._tokens.get(key)
+            if (
+                token is None
+                or token.expires_within(self.refresh_margin)
+                or (current is not None and current.access_token == token.access_token)
+            ):
+                token = await auth.request_token()
+                self.store.save(key, token)
+        except Exception:
+            logger.exception("Failed to refresh OAuth 2.0 access token")
+            raise
+        finally:
+            self._refreshes.pop((asyncio.get_running_loop(), key), None)
+        self._tokens[key] = token
+        return token
+
+
+def _retrieve_exception(task: asyncio.Future) -> None:
+    # Background refreshes aren't awaited by anyone. Their errors are logged
+    # already, so just mark them as retrieved.
+    if not task.cancelled():
+        task.exception()
+
+
+_default_token_cache = OAuth2TokenCache()
+
+
+def default_token_cache() -> OAuth2TokenCache:
+    """The in-memory token cache used by clients unless given another one"""
+    return _default_token_cache
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+class OAuth2ClientCredentials(httpx.Auth):
+    """
+    Authenticate requests with an OAuth 2.0 bearer token, obtained through
+    the client credentials (machine-to-machine) flow
+
+    Access tokens are requested using a JWT client assertion, signed with the
+    private key of the certificate uploaded to NetSuite, and kept in an
+    `OAuth2TokenCache`. Authenticating a request with a cached token is just
+    setting its `Authorization` header. If a token is rejected it's dropped
+    and the request is retried once with a fresh one.
+    """
+
+    requires_response_body = False
+
+    def __init__(
+        self, config: Config, token_cache: Optional[OAuth2TokenCache] = None
+    ) -> None:
+        if not CRYPTOGRAPHY_INSTALLED:
+            raise RuntimeError(
+                "Missing required dependencies for OAuth 2.0 support. "
+                "Install with `pip install netsuite[oauth2]`"
+            )
+        if not isinstance(config.auth, OAuth2ClientCredentialsAuth):
+            raise TypeError("`config.auth` must be `OAuth2ClientCredentialsAuth`")
+        self.config = config
+        self.auth: OAuth2ClientCredentialsAuth = config.auth
+        self.token_cache = token_cache or default_token_cache()
+
+    @cached_property
+    def token_url(self) -> str:
+        return (
+            f"https://{self.config.account_slugified}.suitetalk.api.netsuite.com"
+            "/services/rest/auth/oauth2/v1/token"
+        )
+
+    @cached_property
+    def cache_key(self) -> str:
+        key = "\n".join(
+            (
+                self.config.account,
+                self.auth.client_id,
+                self.auth.certificate_id,
+                " ".join(self.auth.scopes),
+            )
+        )
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def sync_auth_flow(
+        self, request: httpx.Request
+    ) -> Generator[httpx.Request, httpx.Response, None]:
+        raise RuntimeError("OAuth 2.0 authentication is only supported async")
+
+    async def async_auth_flow(self, request: httpx.Request):
+        token = await self.token_cache.get_token(self)
+        request.headers["Authorization"] = f"Bearer {token.access_token}"
+        response = yield request
+
+        if response.status_code == 401:
+            self.token_cache.invalidate(self, token)
+            token = await self.token_cache.get_token(self)
+            request.headers["Authorization"] = f"Bearer {token.access_token}"
+            yield request
+
+    async def request_token(self) -> AccessToken:
+        """Request a new access token from NetSuite"""
+        async with httpx.AsyncClient() as client:
+            resp = await client.post(
+                self.token_url,
+                data={
+                    "grant_type": "client_credentials",
+                    "client_assertion_type": CLIENT_ASSERTION_TYPE,
+                    "client_assertion": self.make_client_assertion(),
+                },
+            )
+        if resp.status_code != 200:
+            raise NetsuiteAPIRequestError(resp.status_code, resp.text)
+        data = json.loads(resp.content)
+        return AccessToken(
+            data["access_token"], time.time() + float(data["expires_in"])
+        )
+
+    def make_client_assertion(self, now: Optional[int] = None) -> str:
+        """Create the signed JWT which authenticates the token request"""
+        if now is None:
+            now = int(time.time())
+        header = {
+            "alg": self.auth.algorithm,
+            "typ": "JWT",
+            "kid": self.auth.certificate_id,
+        }
+        claims = {
+            "iss": self.auth.client_id,
+            "scope": list(self.auth.scopes),
+            "aud": self.token_url,
+            "iat": now,
+            "exp": now + CLIENT_ASSERTION_LIFETIME,
+        }
+        signing_input = (
+            f"{_b64url(json.dumps_bytes(header))}.{_b64url(json.dumps_bytes(claims))}"
+        )
+        signature = self._sign(signing_input.encode("ascii"))
+        return f"{signing_input}.{_b64url(signature)}"
+
+    @cached_property
+    def _private_key(self) -> Any:
+        return serialization.load_pem_private_key(
+            self.auth.private_key.encode("utf-8"), password=None
+        )
+
+    def _sign(self, data: bytes) -> bytes:
+        algorithm = self.auth.algorithm
+        digest = HASHES[algorithm[2:]]()
+        key = self._private_key
+        if algorithm.startswith("PS"):
+            return key.sign(
+                data,
+                padding.PSS(
+                    mgf=padding.MGF1(digest), salt_length=padding.PSS.DIGEST_LENGTH
+                ),
+                digest,
+            )
+        # JWS uses the raw `r || s` form of ECDSA signatures, not DER
+        r, s = utils.decode_dss_signature(key.sign(data, ec.ECDSA(digest)))
+        size = (key.curve.key_size + 7) // 8
+        return r.to_bytes(size, "big") + s.to_bytes(size, "big")
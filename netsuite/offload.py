@@ -0,0 +1,90 @@
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable, Optional, Tuple, TypeVar
+
+__all__ = ("Offloader", "OffloadStats")
+
+T = TypeVar("T")
+
+
+class OffloadStats:
+    """Counters of CPU heavy work done by an `Offloader`
+
+    Time is measured around the work itself, so `offloaded_seconds` is the
+    time that would otherwise have blocked the event loop.
+    """
+
+    def __init__(self) -> None:
+        self.offloaded_calls = 0
+        self.offloaded_bytes = 0
+        self.offloaded_seconds = 0.0
+        self.inline_calls = 0
+        self.inline_bytes = 0
+        self.inline_seconds = 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} "
+            f"offloaded_calls={self.offloaded_calls} "
+            f"offloaded_seconds={self.offloaded_seconds:.3f} "
+            f"inline_calls={self.inline_calls} "
+            f"inline_seconds={self.inline_seconds:.3f}>"
+        )
+
+    def as_dict(self) -> dict:
+        return dict(vars(self))
+
+
+def _timed(fn: Callable[..., T], *args: Any) -> Tuple[T, float]:
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+class Offloader:
+    """
+    Run CPU heavy work (parsing, signing etc.) in an executor instead of on
+    the event loop, when the payload it works on is large enough
+
+    Args:
+        threshold:
+            Payload size in bytes from which work is offloaded. `None`
+            disables offloading.
+        executor:
+            Executor to run work in. Defaults to the event loop's default
+            thread pool. A `ProcessPoolExecutor` can be used for work that
+            holds the GIL (like JSON decoding), as long as the function and
+            its arguments can be pickled.
+    """
+
+    def __init__(
+        self, threshold: Optional[int] = None, executor: Optional[Executor] = None
+    ) -> None:
+        self.threshold = threshold
+        self.executor = executor
+        self.stats = OffloadStats()
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold is not None
+
+    def should_offload(self, size: int) -> bool:
+        return self.enabled and size >= self.threshold  # type: ignore[operator]
+
+    async def run(self, size: int, fn: Callable[..., T], *args: Any) -> T:
+        """Call `fn(*args)`, in the executor if `size` reaches the threshold"""
+        stats = self.stats
+        if not self.should_offload(size):
+            result, seconds = _timed(fn, *args)
+            stats.inline_calls += 1
+            stats.inline_bytes += size
+            stats.inline_seconds += seconds
+            return result
+
+        loop = asyncio.get_running_loop()
+        result, seconds = await loop.run_in_executor(self.executor, _timed, fn, *args)
+        stats.offloaded_calls += 1
+        stats.offloaded_bytes += size
+        stats.offloaded_seconds += seconds
+        return result
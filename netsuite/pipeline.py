@@ -0,0 +1,351 @@
+import asyncio
+import inspect
+import logging
+import time
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Union,
+)
+
+logger = logging.getLogger(__name__)
+
+__all__ = ("Pipeline", "StageStats", "suiteql_rows")
+
+Source = Union[AsyncIterable[Any], Iterable[Any]]
+
+# Put in a queue after the last item
+_END = object()
+# Returned by filters to drop an item
+_DROP = object()
+
+
+class StageStats:
+    """Counters of a stage of a `Pipeline`"""
+
+    def __init__(self, name: str, workers: int, queue_size: int) -> None:
+        self.name = name
+        self.workers = workers
+        self.queue_size = queue_size
+        self.items_in = 0
+        self.items_out = 0
+        self.max_queue_fill = 0.0
+        self._fill_sum = 0.0
+        self._fill_samples = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} {self.name} items_out={self.items_out} "
+            f"throughput={self.throughput:.1f}/s "
+            f"mean_queue_fill={self.mean_queue_fill:.0%}>"
+        )
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Items put out per second"""
+        elapsed = self.elapsed
+        return self.items_out / elapsed if elapsed else 0.0
+
+    @property
+    def mean_queue_fill(self) -> float:
+        """
+        Mean fill ratio of the stage's input queue, sampled whenever an item
+        is taken from it. Close to 1 for the bottleneck of a pipeline.
+        """
+        return self._fill_sum / self._fill_samples if self._fill_samples else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "workers": self.workers,
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "elapsed": self.elapsed,
+            "throughput": self.throughput,
+            "mean_queue_fill": self.mean_queue_fill,
+            "max_queue_fill": self.max_queue_fill,
+        }
+
+    def _sample(self, queue: "asyncio.Queue[Any]") -> None:
+        fill = queue.qsize() / queue.maxsize
+        self.max_queue_fill = max(self.max_queue_fill, fill)
+        self._fill_sum += fill
+        self._fill_samples += 1
+
+
+class _Stage:
+    def __init__(
+        self, kind: str, fn: Any, workers: int, queue_size: int, name: str
+    ) -> None:
+        if workers < 1:
+            raise ValueError("`workers` must be at least 1")
+        if queue_size < 1:
+            # An unbounded queue would defeat the backpressure
+            raise ValueError("`queue_size` must be at least 1")
+        self.kind = kind
+        self.fn = fn
+        self.workers = workers
+        self.stats = StageStats(name, workers, queue_size)
+
+
+class Pipeline:
+    """
+    Stream items from a source through transforms into a sink, with bounded
+    memory
+
+    Stages are joined by queues of at most `queue_size` items, so a fast
+    stage waits for slower ones downstream instead of piling up items. Each
+    stage runs `workers` concurrent calls of its function, which can be a
+    plain or an async function. With more than one worker, items may be
+    reordered.
+
+    Nothing runs until `sink` is awaited. If any stage raises an error, the
+    other stages are cancelled and the error is raised by `sink`.
+
+    >>> stats = await (
+    ...     ns.pipeline("SELECT id, email FROM customer")
+    ...     .map(to_customer_record, workers=8)
+    ...     .batch(200)
+    ...     .sink(ns.soap_api.upsertList, workers=4)
+    ... )
+
+    Args:
+        source:
+            Iterable or async iterable of items
+        queue_size:
+            Default capacity of the queues between stages
+    """
+
+    def __init__(self, source: Source, *, queue_size: int = 100) -> None:
+        if queue_size < 1:
+            raise ValueError("`queue_size` must be at least 1")
+        self._source = source
+        self._queue_size = queue_size
+        self._stages: List[_Stage] = []
+        self._source_stats = StageStats("source", 1, queue_size)
+        self._ran = False
+
+    def __repr__(self) -> str:
+        stages = " -> ".join(stage.stats.name for stage in self._stages)
+        return f"<{self.__class__.__name__} source -> {stages}>"
+
+    @property
+    def stats(self) -> List[StageStats]:
+        """Counters of each stage, the source first"""
+        return [self._source_stats, *(stage.stats for stage in self._stages)]
+
+    def map(
+        self,
+        fn: Callable[[Any], Any],
+        *,
+        workers: int = 1,
+        queue_size: Optional[int] = None,
+        name: Optional[str] = None,
+    ) -> "Pipeline":
+        """Replace each item by `fn(item)`"""
+        return self._add("map", fn, workers, queue_size, name)
+
+    def filter(
+        self,
+        fn: Callable[[Any], Any],
+        *,
+        workers: int = 1,
+        queue_size: Optional[int] = None,
+        name: Optional[str] = None,
+    ) -> "Pipeline":
+        """Drop the items for which `fn(item)` is false"""
+
+        async def keep(item: Any) -> Any:
+            return item if await _call(fn, item) else _DROP
+
+        return self._add(
+            "map", keep, workers, queue_size, name or f"filter({_name(fn)})"
+        )
+
+    def batch(
+        self,
+        size: int,
+        *,
+        queue_size: Optional[int] = None,
+    ) -> "Pipeline":
+        """Group items into lists of `size` items, the last one maybe shorter"""
+        if size < 1:
+            raise ValueError("`size` must be at least 1")
+        return self._add("batch", size, 1, queue_size, f"batch({size})")
+
+    async def sink(
+        self,
+        fn: Callable[[Any], Any],
+        *,
+        workers: int = 1,
+        queue_size: Optional[int] = None,
+        name: Optional[str] = None,
+    ) -> List[StageStats]:
+        """
+        Pass each item to `fn`, running the whole pipeline
+
+        Returns:
+            The counters of each stage
+        """
+        self._add("sink", fn, workers, queue_size, name)
+        self._ran = True
+
+        queues: List["asyncio.Queue[Any]"] = [
+            asyncio.Queue(maxsize=stage.stats.queue_size) for stage in self._stages
+        ]
+        tasks = [asyncio.ensure_future(self._run_source(queues[0]))]
+        for index, stage in enumerate(self._stages):
+            outbox = queues[index + 1] if index + 1 < len(queues) else None
+            tasks.append(
+                asyncio.ensure_future(self._run_stage(stage, queues[index], outbox))
+            )
+
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return self.stats
+
+    def _add(
+        self,
+        kind: str,
+        fn: Any,
+        workers: int,
+        queue_size: Optional[int],
+        name: Optional[str],
+    ) -> "Pipeline":
+        if self._ran:
+            raise RuntimeError("A pipeline can only be run once")
+        stage = _Stage(
+            kind,
+            fn,
+            workers,
+            self._queue_size if queue_size is None else queue_size,
+            name or f"{kind}({_name(fn)})",
+        )
+        self._stages.append(stage)
+        return self
+
+    async def _run_source(self, outbox: "asyncio.Queue[Any]") -> None:
+        stats = self._source_stats
+        stats.started_at = time.monotonic()
+        async for item in _iterate(self._source):
+            stats.items_out += 1
+            await outbox.put(item)
+        await outbox.put(_END)
+        stats.finished_at = time.monotonic()
+
+    async def _run_stage(
+        self,
+        stage: _Stage,
+        inbox: "asyncio.Queue[Any]",
+        outbox: "Optional[asyncio.Queue[Any]]",
+    ) -> None:
+        stats = stage.stats
+        stats.started_at = time.monotonic()
+        if stage.kind == "batch":
+            await self._run_batch(stage, inbox, outbox)
+        else:
+            await asyncio.gather(
+                *(self._run_worker(stage, inbox, outbox) for _ in range(stage.workers))
+            )
+        if outbox is not None:
+            await outbox.put(_END)
+        stats.finished_at = time.monotonic()
+
+    async def _run_worker(
+        self,
+        stage: _Stage,
+        inbox: "asyncio.Queue[Any]",
+        outbox: "Optional[asyncio.Queue[Any]]",
+    ) -> None:
+        stats = stage.stats
+        while True:
+            stats._sample(inbox)
+            item = await inbox.get()
+            if item is _END:
+                # Let the other workers of the stage see the end too
+                await inbox.put(_END)
+                return
+            stats.items_in += 1
+            result = await _call(stage.fn, item)
+            if result is _DROP:
+                continue
+            stats.items_out += 1
+            if outbox is not None:
+                await outbox.put(result)
+
+    async def _run_batch(
+        self,
+        stage: _Stage,
+        inbox: "asyncio.Queue[Any]",
+        outbox: "Optional[asyncio.Queue[Any]]",
+    ) -> None:
+        assert outbox is not None
+        stats = stage.stats
+        batch: List[Any] = []
+        while True:
+            stats._sample(inbox)
+            item = await inbox.get()
+            if item is _END:
+                break
+            stats.items_in += 1
+            batch.append(item)
+            if len(batch) >= stage.fn:
+                stats.items_out += 1
+                await outbox.put(batch)
+                batch = []
+        if batch:
+            stats.items_out += 1
+            await outbox.put(batch)
+
+
+async def suiteql_rows(
+    rest_api: Any, q: str, *, page_size: int = 1000
+) -> AsyncIterator[Any]:
+    """Yield the rows of a SuiteQL query, paging through them"""
+    offset = 0
+    while True:
+        result = await rest_api.suiteql(q, limit=page_size, offset=offset)
+        for row in result["items"]:
+            yield row
+        if not result["hasMore"]:
+            return
+        offset += page_size
+
+
+async def _iterate(source: Source) -> AsyncIterator[Any]:
+    if isinstance(source, AsyncIterable):
+        async for item in source:
+            yield item
+    else:
+        for item in source:
+            yield item
+
+
+async def _call(fn: Callable[[Any], Any], item: Any) -> Any:
+    result = fn(item)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+def _name(fn: Any) -> str:
+    return getattr(fn, "__name__", None) or repr(fn)
@@ -0,0 +1,320 @@
+import logging
+import os
+import pathlib
+import pickle
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+logger = logging.getLogger(__name__)
+
+__all__ = ("RecordCache", "RecordCacheStats")
+
+# Versions are looked up in chunks, as SuiteQL limits the size of `IN` lists
+VERSION_QUERY_CHUNK_SIZE = 1000
+
+TABLE_NAME_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+Fetch = Callable[[List[int]], Awaitable[Dict[int, Any]]]
+Suiteql = Callable[..., Awaitable[Any]]
+
+
+class RecordCacheStats:
+    """Counters of a `RecordCache`"""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.sqlite_hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.changed = 0
+        self.version_queries = 0
+        self.evictions = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} hits={self.hits} misses={self.misses} "
+            f"revalidated={self.revalidated} changed={self.changed}>"
+        )
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> dict:
+        return dict(vars(self), hit_ratio=self.hit_ratio)
+
+
+class _Entry:
+    __slots__ = ("data", "version", "validated_at")
+
+    def __init__(
+        self, data: bytes, version: Optional[str], validated_at: float
+    ) -> None:
+        self.data = data
+        self.version = version
+        self.validated_at = validated_at
+
+
+class _SqliteTier:
+    def __init__(self, path: Union[str, os.PathLike]) -> None:
+        self.path = pathlib.Path(path).expanduser()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS records ("
+                "key TEXT PRIMARY KEY, data BLOB, version TEXT, validated_at REAL)"
+            )
+
+    def get(self, key: str) -> Optional[_Entry]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data, version, validated_at FROM records WHERE key = ?",
+                (key,),
+            ).fetchone()
+        return None if row is None else _Entry(*row)
+
+    def set(self, key: str, entry: _Entry) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)",
+                (key, entry.data, entry.version, entry.validated_at),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM records WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM records")
+
+
+class RecordCache:
+    """
+    Read-through cache of records fetched by ID, for reference data like
+    items, customers or subsidiaries
+
+    Records are kept in memory, least recently used ones being evicted above
+    `max_bytes`, and optionally in an SQLite database which survives process
+    restarts. Each caller gets its own copy of a cached record.
+
+    Records are served from the cache for `ttl` seconds. After that, all
+    records of a request needing revalidation are checked with a single
+    SuiteQL query of their `lastmodifieddate`, and only those which changed
+    are fetched again. The SuiteQL table is the record type, which holds for
+    most record types. Others can be mapped with `tables`.
+
+    The same cache can be shared by clients of several accounts.
+
+    Args:
+        max_bytes:
+            Memory budget, measured as the size of the serialized records
+        ttl:
+            Seconds a record is used without revalidation
+        sqlite_path:
+            Path of an SQLite database to also keep records in. Its contents
+            are unpickled, so it must only be writable by trusted users.
+        tables:
+            SuiteQL table of record types whose table has another name, e.g.
+            `{"inventoryItem": "item"}`
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: float = 300,
+        sqlite_path: Optional[Union[str, os.PathLike]] = None,
+        tables: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.tables = {
+            record_type.lower(): table for record_type, table in (tables or {}).items()
+        }
+        self.stats = RecordCacheStats()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._size = 0
+        self._sqlite = _SqliteTier(sqlite_path) if sqlite_path is not None else None
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} entries={len(self._entries)} "
+            f"size={self._size}/{self.max_bytes} stats={self.stats!r}>"
+        )
+
+    @property
+    def size(self) -> int:
+        """Bytes used by the records in memory"""
+        return self._size
+
+    async def get_many(
+        self,
+        namespace: str,
+        record_type: str,
+        ids: Sequence[int],
+        fetch: Fetch,
+        suiteql: Suiteql,
+    ) -> Dict[int, Any]:
+        """
+        Get records, from the cache if possible
+
+        Args:
+            namespace:
+                Separates records of different accounts and APIs
+            record_type:
+                Type of the records, also used as the SuiteQL table
+            ids:
+                Internal IDs of the records
+            fetch:
+                Called with the IDs of records not in the cache, or which
+                changed. Returns the records by ID.
+            suiteql:
+                Runs a SuiteQL query, like `NetSuiteRestApi.suiteql`
+
+        Returns:
+            The records by ID. Records which couldn't be fetched are missing.
+        """
+        now = time.time()
+        records: Dict[int, Any] = {}
+        unvalidated: Dict[int, Optional[_Entry]] = {}
+        for id_ in dict.fromkeys(int(id_) for id_ in ids):
+            entry = self._get(self._key(namespace, record_type, id_))
+            if entry is not None and now - entry.validated_at < self.ttl:
+                records[id_] = pickle.loads(entry.data)
+                self.stats.hits += 1
+            else:
+                unvalidated[id_] = entry
+        if not unvalidated:
+            return records
+
+        # Versions of the missing records are queried as well, before they're
+        # fetched. A record changing in between is just fetched again on its
+        # next revalidation.
+        versions = await self._query_versions(record_type, list(unvalidated), suiteql)
+        to_fetch = []
+        for id_, entry in unvalidated.items():
+            version = versions.get(id_)
+            if entry is None:
+                to_fetch.append(id_)
+            elif version is not None and version == entry.version:
+                entry.validated_at = now
+                self._set(self._key(namespace, record_type, id_), entry)
+                records[id_] = pickle.loads(entry.data)
+                self.stats.hits += 1
+                self.stats.revalidated += 1
+            else:
+                to_fetch.append(id_)
+                self.stats.changed += 1
+        if not to_fetch:
+            return records
+
+        self.stats.misses += len(to_fetch)
+        fetched = await fetch(to_fetch)
+        for id_, record in fetched.items():
+            if record is None:
+                continue
+            entry = _Entry(
+                pickle.dumps(record, pickle.HIGHEST_PROTOCOL), versions.get(id_), now
+            )
+            self._set(self._key(namespace, record_type, id_), entry)
+            records[id_] = record
+        return records
+
+    def invalidate(self, namespace: str, record_type: str, id_: int) -> None:
+        """Drop a record, e.g. after updating it"""
+        key = self._key(namespace, record_type, id_)
+        self._pop(key)
+        if self._sqlite is not None:
+            self._sqlite.delete(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+        if self._sqlite is not None:
+            self._sqlite.clear()
+
+    @staticmethod
+    def _key(namespace: str, record_type: str, id_: int) -> str:
+        return f"{namespace}:{record_type.lower()}:{id_}"
+
+    def _get(self, key: str) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        if self._sqlite is not None:
+            entry = self._sqlite.get(key)
+            if entry is not None:
+                self.stats.sqlite_hits += 1
+                self._set_memory(key, entry)
+        return entry
+
+    def _set(self, key: str, entry: _Entry) -> None:
+        self._set_memory(key, entry)
+        if self._sqlite is not None:
+            self._sqlite.set(key, entry)
+
+    def _set_memory(self, key: str, entry: _Entry) -> None:
+        self._pop(key)
+        if len(entry.data) > self.max_bytes:
+            return
+        self._entries[key] = entry
+        self._size += len(entry.data)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted.data)
+            self.stats.evictions += 1
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry.data)
+
+    async def _query_versions(
+        self, record_type: str, ids: List[int], suiteql: Suiteql
+    ) -> Dict[int, Optional[str]]:
+        table = self.tables.get(record_type.lower(), record_type.lower())
+        if not TABLE_NAME_RE.match(table):
+            raise ValueError(f"Invalid record type {record_type!r}")
+        versions: Dict[int, Optional[str]] = {}
+        for start in range(0, len(ids), VERSION_QUERY_CHUNK_SIZE):
+            chunk = ids[start : start + VERSION_QUERY_CHUNK_SIZE]
+            q = (
+                "SELECT id, TO_CHAR(lastmodifieddate, 'YYYY-MM-DD HH24:MI:SS') "
+                f"AS version FROM {table} "
+                f"WHERE id IN ({', '.join(str(id_) for id_ in chunk)})"
+            )
+            self.stats.version_queries += 1
+            try:
+                result = await suiteql(q, limit=len(chunk))
+            except Exception:
+                # Without versions all records are fetched again, so this
+                # only costs performance
+                logger.warning(
+                    f"Failed to query versions of {record_type} records",
+                    exc_info=True,
+                )
+                return {}
+            versions.update(_parse_versions(result))
+        return versions
+
+
+def _parse_versions(result: Any) -> List[Tuple[int, Optional[str]]]:
+    return [(int(row["id"]), row.get("version")) for row in result.get("items", [])]
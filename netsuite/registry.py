@@ -0,0 +1,264 @@
+import logging
+import time
+from collections import OrderedDict
+from functools import cached_property
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .client import NetSuite
+from .config import Config
+from .oauth2 import OAuth2TokenCache
+
+logger = logging.getLogger(__name__)
+
+__all__ = ("ClientRegistry",)
+
+
+class _Account:
+    def __init__(
+        self,
+        config: Config,
+        concurrent_requests: Optional[int],
+        soap_api_options: Dict[str, Any],
+        rest_api_options: Dict[str, Any],
+        restlet_options: Dict[str, Any],
+    ) -> None:
+        self.config = config
+        self.concurrent_requests = concurrent_requests
+        self.soap_api_options = soap_api_options
+        self.rest_api_options = rest_api_options
+        self.restlet_options = restlet_options
+
+
+class _Entry:
+    def __init__(self, client: NetSuite) -> None:
+        self.client = client
+        self.last_used = time.monotonic()
+
+
+class ClientRegistry:
+    """
+    `NetSuite` clients for many accounts, served from one process
+
+    Clients are created on first use and share resources: one HTTP connection
+    pool for the REST API and Restlets, one for the SOAP API, and the parsed
+    WSDL of each SOAP version (the bulk of a SOAP client's memory). Concurrency
+    limits stay per account.
+
+    Clients not used for `idle_timeout` seconds are evicted, as are the least
+    recently used ones when more than `max_clients` are alive. An evicted
+    client is created again when its account is next used.
+
+    Args:
+        max_clients:
+            Maximum number of accounts with a live client. `None` means no
+            limit.
+        idle_timeout:
+            Seconds after which an unused client is evicted. `None` disables
+            idle eviction.
+        http_limits:
+            Connection limits of the shared HTTP pools
+        soap_api_options:
+            Options for `NetSuiteSoapApi`, used for all accounts
+        rest_api_options:
+            Options for `NetSuiteRestApi`, used for all accounts
+        restlet_options:
+            Options for `NetSuiteRestlet`, used for all accounts
+        token_cache:
+            Cache of OAuth 2.0 access tokens
+    """
+
+    def __init__(
+        self,
+        *,
+        max_clients: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        http_limits: Optional[httpx.Limits] = None,
+        soap_api_options: Optional[Dict[str, Any]] = None,
+        rest_api_options: Optional[Dict[str, Any]] = None,
+        restlet_options: Optional[Dict[str, Any]] = None,
+        token_cache: Optional[OAuth2TokenCache] = None,
+    ) -> None:
+        if max_clients is not None and max_clients < 1:
+            raise ValueError("`max_clients` must be at least 1")
+        self.max_clients = max_clients
+        self.idle_timeout = idle_timeout
+        self.http_limits = http_limits or httpx.Limits(
+            max_connections=100, max_keepalive_connections=20
+        )
+        self._soap_api_options = soap_api_options or {}
+        self._rest_api_options = rest_api_options or {}
+        self._restlet_options = restlet_options or {}
+        self._token_cache = token_cache
+        self._accounts: Dict[str, _Account] = {}
+        self._clients: "OrderedDict[str, _Entry]" = OrderedDict()
+        # Parsed WSDL documents by SOAP version
+        self._wsdl_documents: Dict[str, Any] = {}
+        self.created = 0
+        self.evicted = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} accounts={len(self._accounts)} "
+            f"clients={len(self._clients)}>"
+        )
+
+    def __contains__(self, account: str) -> bool:
+        return account in self._accounts
+
+    def __len__(self) -> int:
+        return len(self._accounts)
+
+    async def __aenter__(self) -> "ClientRegistry":
+        return self
+
+    async def __aexit__(self, exc_type=None, exc_value=None, traceback=None) -> None:
+        await self.aclose()
+
+    @cached_property
+    def _http_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(limits=self.http_limits)
+
+    @cached_property
+    def _soap_http_client(self) -> httpx.AsyncClient:
+        # Separate from `_http_client`, as zeep sets its own default headers.
+        # Without a timeout, like zeep's own transport.
+        return httpx.AsyncClient(limits=self.http_limits, timeout=None)
+
+    @cached_property
+    def _wsdl_client(self) -> httpx.Client:
+        return httpx.Client(timeout=300)
+
+    @property
+    def accounts(self) -> List[str]:
+        """All registered accounts"""
+        return list(self._accounts)
+
+    @property
+    def active_accounts(self) -> List[str]:
+        """Accounts with a live client, least recently used first"""
+        return list(self._clients)
+
+    def register(
+        self,
+        config: Config,
+        *,
+        concurrent_requests: Optional[int] = None,
+        soap_api_options: Optional[Dict[str, Any]] = None,
+        rest_api_options: Optional[Dict[str, Any]] = None,
+        restlet_options: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Add an account, replacing its previous registration if any
+
+        Args:
+            config:
+                Configuration of the account
+            concurrent_requests:
+                Limit of concurrent requests to each of the account's APIs,
+                overriding the default of the API options
+            soap_api_options:
+                Options for this account's `NetSuiteSoapApi`
+            rest_api_options:
+                Options for this account's `NetSuiteRestApi`
+            restlet_options:
+                Options for this account's `NetSuiteRestlet`
+        """
+        self._accounts[config.account] = _Account(
+            config,
+            concurrent_requests,
+            {**self._soap_api_options, **(soap_api_options or {})},
+            {**self._rest_api_options, **(rest_api_options or {})},
+            {**self._restlet_options, **(restlet_options or {})},
+        )
+        self._clients.pop(config.account, None)
+
+    def unregister(self, account: str) -> None:
+        del self._accounts[account]
+        self._clients.pop(account, None)
+
+    def get(self, account: str) -> NetSuite:
+        """The client of a registered account, created if needed"""
+        entry = self._clients.get(account)
+        if entry is None:
+            try:
+                registration = self._accounts[account]
+            except KeyError:
+                raise KeyError(f"Account {account!r} isn't registered") from None
+            entry = self._clients[account] = _Entry(self._make_client(registration))
+            self.created += 1
+        else:
+            entry.last_used = time.monotonic()
+            self._clients.move_to_end(account)
+        self.evict()
+        return entry.client
+
+    def __getitem__(self, account: str) -> NetSuite:
+        return self.get(account)
+
+    def evict(self) -> List[str]:
+        """
+        Drop idle clients, and the least recently used ones above
+        `max_clients`
+
+        Called on every `get`, but can also be called periodically to free
+        clients of accounts which aren't used anymore.
+
+        Returns:
+            The accounts whose client was evicted
+        """
+        evicted = []
+        if self.idle_timeout is not None:
+            idle_since = time.monotonic() - self.idle_timeout
+            for account, entry in list(self._clients.items()):
+                if entry.last_used > idle_since:
+                    # Entries are ordered by last use
+                    break
+                evicted.append(account)
+        if self.max_clients is not None:
+            excess = len(self._clients) - len(evicted) - self.max_clients
+            if excess > 0:
+                remaining = (a for a in self._clients if a not in evicted)
+                evicted.extend(next(remaining) for _ in range(excess))
+
+        for account in evicted:
+            del self._clients[account]
+            logger.debug(f"Evicted NetSuite client of account {account}")
+        self.evicted += len(evicted)
+        return evicted
+
+    async def aclose(self) -> None:
+        """Drop all clients and close the shared connection pools"""
+        self._clients.clear()
+        for name in ("_http_client", "_soap_http_client"):
+            if name in self.__dict__:
+                await self.__dict__.pop(name).aclose()
+        if "_wsdl_client" in self.__dict__:
+            self.__dict__.pop("_wsdl_client").close()
+
+    def _make_client(self, registration: _Account) -> NetSuite:
+        soap_api_options = {
+            **registration.soap_api_options,
+            "http_client": self._soap_http_client,
+            "wsdl_client": self._wsdl_client,
+            "wsdl_documents": self._wsdl_documents,
+        }
+        rest_api_options = {
+            **registration.rest_api_options,
+            "http_client": self._http_client,
+        }
+        restlet_options = {
+            **registration.restlet_options,
+            "http_client": self._http_client,
+        }
+        if registration.concurrent_requests is not None:
+            for options in (soap_api_options, rest_api_options, restlet_options):
+                options["concurrent_requests"] = registration.concurrent_requests
+        return NetSuite(
+            registration.config,
+            soap_api_options=soap_api_options,
+            rest_api_options=rest_api_options,
+            restlet_options=restlet_options,
+            token_cache=self._token_cache,
+        )
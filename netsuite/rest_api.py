@@ -1,14 +1,26 @@
 import logging
+import os
+import re
+from concurrent.futures import Executor
 from functools import cached_property
-from typing import Sequence
+from typing import Any, AsyncIterator, Optional, Sequence, Union
+
+import httpx
 
 from . import rest_api_base
+from .circuit_breaker import CircuitBreakers
 from .config import Config
+from .hedging import Hedger
+from .oauth2 import OAuth2TokenCache
+from .record_cache import RecordCache
+from .scheduler import PriorityScheduler
 
 logger = logging.getLogger(__name__)
 
 __all__ = ("NetSuiteRestApi",)
 
+RECORD_PATH_RE = re.compile(r"^/record/v1/([A-Za-z_][A-Za-z0-9_]*)/(\d+)$")
+
 
 class NetSuiteRestApi(rest_api_base.RestApiBase):
     def __init__(
@@ -18,11 +30,29 @@ class NetSuiteRestApi(rest_api_base.RestApiBase):
         default_timeout: int = 60,
         concurrent_requests: int = 10,
         signature_method: str = rest_api_base.DEFAULT_SIGNATURE_METHOD,
+        offload_threshold: Optional[int] = None,
+        offload_executor: Optional[Executor] = None,
+        token_cache: Optional[OAuth2TokenCache] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        coalesce_reads: bool = False,
+        hedger: Optional[Hedger] = None,
+        circuit_breakers: Optional[CircuitBreakers] = None,
+        scheduler: Optional[PriorityScheduler] = None,
+        record_cache: Optional[RecordCache] = None,
     ):
         self._config = config
         self._default_timeout = default_timeout
         self._concurrent_requests = concurrent_requests
         self._signature_method = signature_method
+        self._offload_threshold = offload_threshold
+        self._offload_executor = offload_executor
+        self._token_cache = token_cache
+        self._http_client = http_client
+        self._coalesce_reads = coalesce_reads
+        self._hedger = hedger
+        self._circuit_breakers = circuit_breakers
+        self._scheduler = scheduler
+        self._record_cache = record_cache
 
     @cached_property
     def hostname(self) -> str:
@@ -31,7 +61,48 @@ class NetSuiteRestApi(rest_api_base.RestApiBase):
     async def request(self, method: str, subpath: str, **request_kw):
         return await self._request_impl(method, subpath, **request_kw)
 
+    async def stream(
+        self, method: str, subpath: str, **request_kw
+    ) -> AsyncIterator[bytes]:
+        """
+        Make a request, yielding the body in chunks as it's downloaded
+
+        Unlike the other methods, the body is never held in memory as a
+        whole. Pass `chunk_size` to get chunks of a fixed size.
+        """
+        async for chunk in self._stream(method, subpath, **request_kw):
+            yield chunk
+
+    async def stream_items(
+        self, method: str, subpath: str, *, key: Optional[str] = None, **request_kw
+    ) -> AsyncIterator[Any]:
+        """
+        Make a request, yielding the items of the JSON array it returns as
+        they're downloaded
+
+        Args:
+            key:
+                Key of the array in the object returned, e.g. `"items"` for
+                collections. By default the body is the array.
+        """
+        async for item in self._stream_items(method, subpath, key=key, **request_kw):
+            yield item
+
+    async def download(
+        self, subpath: str, path: Union[str, os.PathLike], **request_kw
+    ) -> int:
+        """
+        GET a response straight into a file, returning its size in bytes
+
+        The file is only replaced once the whole body was downloaded.
+        """
+        return await self._download("GET", subpath, path, **request_kw)
+
     async def get(self, subpath: str, **request_kw):
+        if self._record_cache is not None and not request_kw:
+            match = RECORD_PATH_RE.match(subpath)
+            if match is not None:
+                return await self._get_cached_record(match[1], int(match[2]))
         return await self._request("GET", subpath, **request_kw)
 
     async def post(self, subpath: str, **request_kw):
@@ -42,13 +113,22 @@ class NetSuiteRestApi(rest_api_base.RestApiBase):
         )
 
     async def put(self, subpath: str, **request_kw):
-        return await self._request("PUT", subpath, **request_kw)
+        try:
+            return await self._request("PUT", subpath, **request_kw)
+        finally:
+            self._invalidate_cached_record(subpath)
 
     async def patch(self, subpath: str, **request_kw):
-        return await self._request("PATCH", subpath, **request_kw)
+        try:
+            return await self._request("PATCH", subpath, **request_kw)
+        finally:
+            self._invalidate_cached_record(subpath)
 
     async def delete(self, subpath: str, **request_kw):
-        return await self._request("DELETE", subpath, **request_kw)
+        try:
+            return await self._request("DELETE", subpath, **request_kw)
+        finally:
+            self._invalidate_cached_record(subpath)
 
     # TODO maybe break out params vs poping?
     async def suiteql(self, q: str, limit: int = 10, offset: int = 0, **request_kw):
@@ -60,6 +140,9 @@ class NetSuiteRestApi(rest_api_base.RestApiBase):
 
         - https://docs.oracle.com/en/cloud/saas/netsuite/ns-online-help/section_156257799794.html#Using-SuiteQL
         """
+        # Queries only read, so can be coalesced and hedged like GET requests
+        request_kw.setdefault("coalesce", self._coalesce_reads)
+        request_kw.setdefault("hedge", True)
         return await self._request(
             "POST",
             "/query/v1/suiteql",
@@ -133,6 +216,35 @@ class NetSuiteRestApi(rest_api_base.RestApiBase):
             **request_kw,
         )
 
+    @property
+    def record_cache(self) -> Optional[RecordCache]:
+        return self._record_cache
+
+    async def _get_cached_record(self, record_type: str, internal_id: int):
+        async def fetch(ids):
+            return {
+                id_: await self._request("GET", f"/record/v1/{record_type}/{id_}")
+                for id_ in ids
+            }
+
+        records = await self._record_cache.get_many(  # type: ignore[union-attr]
+            f"{self._config.account}/rest",
+            record_type,
+            [internal_id],
+            fetch,
+            self.suiteql,
+        )
+        return records[internal_id]
+
+    def _invalidate_cached_record(self, subpath: str) -> None:
+        if self._record_cache is None:
+            return
+        match = RECORD_PATH_RE.match(subpath)
+        if match is not None:
+            self._record_cache.invalidate(
+                f"{self._config.account}/rest", match[1], int(match[2])
+            )
+
     def _make_hostname(self):
         return f"{self._config.account_slugified}.suitetalk.api.netsuite.com"
 
@@ -1,15 +1,45 @@
-import asyncio
 import logging
+import os
+import pathlib
+from concurrent.futures import Executor
+from contextlib import asynccontextmanager, nullcontext
 from functools import cached_property
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    ContextManager,
+    Dict,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import httpx
-from authlib.integrations.httpx_client import OAuth1Auth
-from authlib.oauth1.rfc5849.client_auth import ClientAuth
-from authlib.oauth1.rfc5849.signature import generate_signature_base_string
-from oauthlib.oauth1.rfc5849.signature import sign_hmac_sha256
 
 from . import json
+from .auth import OAuth1Signer, TokenPoolAuth
+from .circuit_breaker import (
+    Attempt,
+    CircuitBreaker,
+    CircuitBreakers,
+    is_outage_error,
+    is_outage_status,
+)
+from .config import Config
+from .deadline import (
+    check_deadline,
+    deadline_errors,
+    deadline_timeout,
+    within_deadline,
+)
 from .exceptions import NetsuiteAPIRequestError, NetsuiteAPIResponseParsingError
+from .hedging import Hedger, HedgeStats, start_timer
+from .oauth2 import OAuth2ClientCredentials, OAuth2TokenCache
+from .offload import Offloader, OffloadStats
+from .scheduler import PriorityScheduler, PriorityStats
+from .single_flight import SingleFlight
+from .streaming import JsonArrayStreamParser
 
 __all__ = ("RestApiBase",)
 
@@ -18,25 +48,65 @@ DEFAULT_SIGNATURE_METHOD = "HMAC-SHA256"
 logger = logging.getLogger(__name__)
 
 
-def authlib_hmac_sha256_sign_method(client, request):
-    """Sign a HMAC-SHA256 signature."""
-    base_string = generate_signature_base_string(request)
-    return sign_hmac_sha256(base_string, client.client_secret, client.token_secret)
-
-
-ClientAuth.register_signature_method("HMAC-SHA256", authlib_hmac_sha256_sign_method)
-
-
 class RestApiBase:
+    _config: Config
     _concurrent_requests: int = 10
     _default_timeout: int = 10
     _signature_method: str = DEFAULT_SIGNATURE_METHOD
+    _offload_threshold: Optional[int] = None
+    _offload_executor: Optional[Executor] = None
+    _token_cache: Optional[OAuth2TokenCache] = None
+    _http_client: Optional[httpx.AsyncClient] = None
+    _coalesce_reads: bool = False
+    _hedger: Optional[Hedger] = None
+    _circuit_breakers: Optional[CircuitBreakers] = None
+    _scheduler: Optional[PriorityScheduler] = None
+    # Endpoint class, which circuit breakers are per
+    _endpoint: str = "rest_api"
+
+    @cached_property
+    def _request_scheduler(self) -> PriorityScheduler:
+        if self._scheduler is not None:
+            return self._scheduler
+        return PriorityScheduler(self._concurrent_requests)
+
+    @property
+    def priority_stats(self) -> Dict[str, PriorityStats]:
+        """Queue depth and wait time of requests, per priority class"""
+        return self._request_scheduler.stats
 
     @cached_property
-    def _request_semaphore(self) -> asyncio.Semaphore:
-        # NOTE: Shouldn't be put in __init__ as we might not have a running
-        #       event loop at that time.
-        return asyncio.Semaphore(self._concurrent_requests)
+    def _auth(self) -> httpx.Auth:
+        return self._make_auth()
+
+    @cached_property
+    def _circuit_breaker(self) -> Optional[CircuitBreaker]:
+        if self._circuit_breakers is None:
+            return None
+        return self._circuit_breakers.get(self._config.account, self._endpoint)
+
+    @cached_property
+    def _single_flight(self) -> SingleFlight:
+        return SingleFlight()
+
+    @property
+    def coalesced_requests(self) -> int:
+        """Number of requests answered by an identical one already in flight"""
+        return self._single_flight.coalesced
+
+    @property
+    def hedge_stats(self) -> Optional[HedgeStats]:
+        """How often slow reads were hedged, and the hedge won"""
+        return None if self._hedger is None else self._hedger.stats
+
+    @cached_property
+    def _offloader(self) -> Offloader:
+        return Offloader(self._offload_threshold, self._offload_executor)
+
+    @property
+    def offload_stats(self) -> OffloadStats:
+        """Time spent parsing responses, on and off the event loop"""
+        return self._offloader.stats
 
     async def _request(self, method: str, subpath: str, **request_kw):
         resp = await self._request_impl(method, subpath, **request_kw)
@@ -48,58 +118,219 @@ class RestApiBase:
             return None
         else:
             try:
-                return json.loads(resp.text)
+                return await self._offloader.run(
+                    len(resp.content), json.loads, resp.content
+                )
             except Exception:
                 raise NetsuiteAPIResponseParsingError(resp.status_code, resp.text)
 
     async def _request_impl(
         self, method: str, subpath: str, **request_kw
     ) -> httpx.Response:
-        method = method.upper()
-        url = request_kw.pop("url", self._make_url(subpath))
+        check_deadline()
+        method, url, headers, timeout = self._prepare_request(
+            method, subpath, request_kw
+        )
 
-        headers = {**self._make_default_headers(), **request_kw.pop("headers", {})}
+        coalesce = request_kw.pop("coalesce", None)
+        if coalesce is None:
+            coalesce = self._coalesce_reads and method == "GET"
+        hedge = request_kw.pop("hedge", None)
+        if hedge is None:
+            hedge = method == "GET"
+        priority = request_kw.pop("priority", None)
 
-        timeout = request_kw.pop("timeout", self._default_timeout)
+        kw = {**request_kw}
+
+        def send() -> Awaitable[httpx.Response]:
+            if hedge and self._hedger is not None:
+                return self._hedger.run(
+                    lambda: self._send(method, url, headers, timeout, priority, kw),
+                    deferred_start=True,
+                )
+            return self._send(method, url, headers, timeout, priority, kw)
 
+        # Only requests fully described by these are known to be identical
+        if coalesce and kw.keys() <= {"params", "content"}:
+            key = (
+                method,
+                str(httpx.URL(url, params=kw.get("params"))),
+                tuple(sorted(headers.items())),
+                kw.get("content"),
+            )
+            return await within_deadline(self._single_flight.do(key, send))
+        # Also cancels the request while it's queued for a slot
+        return await within_deadline(send())
+
+    def _prepare_request(
+        self, method: str, subpath: str, request_kw: dict
+    ) -> Tuple[str, str, dict, Union[None, float, httpx.Timeout]]:
+        """Pop the options shared by all requests from `request_kw`"""
+        url = request_kw.pop("url", self._make_url(subpath))
+        headers = {**self._make_default_headers(), **request_kw.pop("headers", {})}
+        timeout = request_kw.pop("timeout", self._default_timeout)
         if "json" in request_kw:
-            request_kw["data"] = json.dumps(request_kw.pop("json"))
+            request_kw["content"] = json.dumps_bytes(request_kw.pop("json"))
+        return method.upper(), url, headers, timeout
 
-        kw = {**request_kw}
+    async def _stream(
+        self,
+        method: str,
+        subpath: str,
+        *,
+        chunk_size: Optional[int] = None,
+        **request_kw,
+    ) -> AsyncIterator[bytes]:
+        async with self._stream_response(method, subpath, **request_kw) as resp:
+            async for chunk in resp.aiter_bytes(chunk_size):
+                check_deadline()
+                yield chunk
+
+    async def _stream_items(
+        self, method: str, subpath: str, *, key: Optional[str] = None, **request_kw
+    ) -> AsyncIterator[Any]:
+        parser = JsonArrayStreamParser(key)
+        async with self._stream_response(method, subpath, **request_kw) as resp:
+            try:
+                async for chunk in resp.aiter_bytes():
+                    check_deadline()
+                    for item in parser.feed(chunk):
+                        yield item
+                    if parser.is_done:
+                        # Skip the rest of the body
+                        break
+                items = parser.close()
+            except ValueError as ex:
+                raise NetsuiteAPIResponseParsingError(resp.status_code, str(ex))
+        for item in items:
+            yield item
+
+    async def _download(
+        self,
+        method: str,
+        subpath: str,
+        path: Union[str, os.PathLike],
+        **request_kw,
+    ) -> int:
+        path = pathlib.Path(path)
+        # Only replaces the file once the whole body is written
+        partial_path = path.with_name(f"{path.name}.part")
+        size = 0
+        try:
+            with open(partial_path, "wb") as fp:
+                async for chunk in self._stream(method, subpath, **request_kw):
+                    fp.write(chunk)
+                    size += len(chunk)
+            os.replace(partial_path, path)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+        return size
+
+    @asynccontextmanager
+    async def _stream_response(
+        self, method: str, subpath: str, **request_kw
+    ) -> AsyncIterator[httpx.Response]:
+        """
+        Make a request without reading its body, for streaming it
+
+        The concurrency slot is held until the body has been consumed.
+        """
+        check_deadline()
+        method, url, headers, timeout = self._prepare_request(
+            method, subpath, request_kw
+        )
+        priority = request_kw.pop("priority", None)
+        logger.debug(f"Streaming {method} request to {url}")
+
+        breaker = self._circuit_breaker
+        if breaker is not None:
+            breaker.raise_if_open()
+
+        async with self._request_scheduler.slot(priority):
+            with self._breaker_attempt() as attempt, deadline_errors():
+                async with self._client() as c:
+                    async with c.stream(
+                        method,
+                        url,
+                        headers=headers,
+                        auth=self._auth,
+                        timeout=deadline_timeout(timeout),
+                        **request_kw,
+                    ) as resp:
+                        attempt.failed = is_outage_status(resp.status_code)
+                        if resp.status_code < 200 or resp.status_code > 299:
+                            await resp.aread()
+                            raise NetsuiteAPIRequestError(resp.status_code, resp.text)
+                        yield resp
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        headers: dict,
+        timeout: Union[None, float, httpx.Timeout],
+        priority: Optional[str],
+        kw: dict,
+    ) -> httpx.Response:
         logger.debug(
             f"Making {method.upper()} request to {url}. Keyword arguments: {kw}"
         )
 
-        async with self._request_semaphore:
-            async with httpx.AsyncClient() as c:
-                resp = await c.request(
-                    method=method,
-                    url=url,
-                    headers=headers,
-                    auth=self._make_auth(),
-                    timeout=timeout,
-                    **kw,
-                )
+        breaker = self._circuit_breaker
+        if breaker is not None:
+            # Checked before waiting for a slot too, so that queued
+            # requests fail fast once the circuit opens
+            breaker.raise_if_open()
 
-        resp_headers_json = json.dumps(dict(resp.headers))
-        logger.debug(f"Got response headers from NetSuite: {resp_headers_json}")
+        async with self._request_scheduler.slot(priority):
+            # A hedged request's latency doesn't include the wait for a slot
+            start_timer()
+            with self._breaker_attempt() as attempt, deadline_errors():
+                async with self._client() as c:
+                    resp = await c.request(
+                        method=method,
+                        url=url,
+                        headers=headers,
+                        auth=self._auth,
+                        # Capped by the time left once the request is sent
+                        timeout=deadline_timeout(timeout),
+                        **kw,
+                    )
+                attempt.failed = is_outage_status(resp.status_code)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            resp_headers_json = json.dumps(dict(resp.headers))
+            logger.debug(f"Got response headers from NetSuite: {resp_headers_json}")
 
         return resp
 
+    def _breaker_attempt(self) -> ContextManager[Attempt]:
+        if self._circuit_breaker is None:
+            return nullcontext(Attempt())
+        return self._circuit_breaker.attempt(is_outage_error)
+
+    @asynccontextmanager
+    async def _client(self) -> AsyncIterator[httpx.AsyncClient]:
+        if self._http_client is not None:
+            # Shared with other clients, so its connections are reused and it
+            # isn't closed here
+            yield self._http_client
+        else:
+            async with httpx.AsyncClient() as c:
+                yield c
+
     def _make_url(self, subpath: str):
         raise NotImplementedError
 
-    def _make_auth(self):
-        auth = self._config.auth
-        return OAuth1Auth(
-            client_id=auth.consumer_key,
-            client_secret=auth.consumer_secret,
-            token=auth.token_id,
-            token_secret=auth.token_secret,
-            realm=self._config.account,
-            force_include_body=True,
-            signature_method=self._signature_method,
-        )
+    def _make_auth(self) -> httpx.Auth:
+        if self._config.is_oauth2_auth:
+            return OAuth2ClientCredentials(self._config, self._token_cache)
+        if self._config.token_pool is not None:
+            return TokenPoolAuth(
+                self._config.token_pool, self._config.account, self._signature_method
+            )
+        return OAuth1Signer.from_config(self._config, self._signature_method)
 
     def _make_default_headers(self):
         return {"Content-Type": "application/json"}
@@ -1,8 +1,17 @@
 import logging
+import os
+from concurrent.futures import Executor
 from functools import cached_property
+from typing import Any, AsyncIterator, Optional, Union
+
+import httpx
 
 from . import rest_api_base
+from .circuit_breaker import CircuitBreakers
 from .config import Config
+from .hedging import Hedger
+from .oauth2 import OAuth2TokenCache
+from .scheduler import PriorityScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -10,6 +19,8 @@ __all__ = ("NetSuiteRestlet",)
 
 
 class NetSuiteRestlet(rest_api_base.RestApiBase):
+    _endpoint = "restlet"
+
     def __init__(
         self,
         config: Config,
@@ -17,11 +28,27 @@ class NetSuiteRestlet(rest_api_base.RestApiBase):
         default_timeout: int = 60,
         concurrent_requests: int = 10,
         signature_method: str = rest_api_base.DEFAULT_SIGNATURE_METHOD,
+        offload_threshold: Optional[int] = None,
+        offload_executor: Optional[Executor] = None,
+        token_cache: Optional[OAuth2TokenCache] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        coalesce_reads: bool = False,
+        hedger: Optional[Hedger] = None,
+        circuit_breakers: Optional[CircuitBreakers] = None,
+        scheduler: Optional[PriorityScheduler] = None,
     ):
         self._config = config
         self._default_timeout = default_timeout
         self._concurrent_requests = concurrent_requests
         self._signature_method = signature_method
+        self._offload_threshold = offload_threshold
+        self._offload_executor = offload_executor
+        self._token_cache = token_cache
+        self._http_client = http_client
+        self._coalesce_reads = coalesce_reads
+        self._hedger = hedger
+        self._circuit_breakers = circuit_breakers
+        self._scheduler = scheduler
 
     @cached_property
     def hostname(self) -> str:
@@ -43,6 +70,59 @@ class NetSuiteRestlet(rest_api_base.RestApiBase):
         subpath = self._make_restlet_params(script_id, deploy)
         return await self._request("DELETE", subpath, **request_kw)
 
+    async def stream(
+        self, script_id: int, *, deploy: int = 1, method: str = "GET", **request_kw
+    ) -> AsyncIterator[bytes]:
+        """
+        Call a Restlet, yielding the body in chunks as it's downloaded
+
+        Unlike the other methods, the body is never held in memory as a
+        whole. Pass `chunk_size` to get chunks of a fixed size.
+        """
+        subpath = self._make_restlet_params(script_id, deploy)
+        async for chunk in self._stream(method, subpath, **request_kw):
+            yield chunk
+
+    async def stream_items(
+        self,
+        script_id: int,
+        *,
+        deploy: int = 1,
+        method: str = "GET",
+        key: Optional[str] = None,
+        **request_kw,
+    ) -> AsyncIterator[Any]:
+        """
+        Call a Restlet, yielding the items of the JSON array it returns as
+        they're downloaded
+
+        Args:
+            key:
+                Key of the array in the object returned. By default the body
+                is the array.
+        """
+        subpath = self._make_restlet_params(script_id, deploy)
+        async for item in self._stream_items(method, subpath, key=key, **request_kw):
+            yield item
+
+    async def download(
+        self,
+        script_id: int,
+        path: Union[str, os.PathLike],
+        *,
+        deploy: int = 1,
+        method: str = "GET",
+        **request_kw,
+    ) -> int:
+        """
+        Call a Restlet, writing its response straight into a file, and
+        return its size in bytes
+
+        The file is only replaced once the whole body was downloaded.
+        """
+        subpath = self._make_restlet_params(script_id, deploy)
+        return await self._download(method, subpath, path, **request_kw)
+
     def _make_restlet_params(self, script_id: int, deploy: int = 1) -> str:
         return f"?script={script_id}&deploy={deploy}"
 
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+from typing import Any, Callable, List, Optional, Tuple
+
+import httpx
+
+from . import json
+from .batching import Batcher
+from .exceptions import RestletBatchError
+from .restlet import NetSuiteRestlet
+
+logger = logging.getLogger(__name__)
+
+__all__ = ("REFERENCE_DISPATCHER", "RestletBatchStub", "RestletMultiplexer")
+
+_Pending = List[Tuple[Any, "asyncio.Future[Any]"]]
+
+# A SuiteScript 2.1 Restlet implementing the batch contract of
+# `RestletMultiplexer`, given the function handling a single call
+REFERENCE_DISPATCHER = """\
+/**
+ * @NApiVersion 2.1
+ * @NScriptType Restlet
+ */
+define([], () => {
+  const handle = (body) => {
+    // The logic of a single, unbatched call
+  };
+
+  const post = (request) => ({
+    batch: request.batch.map(({ id, body }) => {
+      try {
+        return { id, body: handle(body) };
+      } catch (e) {
+        return { id, error: { code: e.name || "ERROR", message: e.message } };
+      }
+    }),
+  });
+
+  return { post };
+});
+"""
+
+
+class RestletMultiplexer(Batcher[Tuple[int, int], Any, Any]):
+    """
+    Send concurrent POSTs to the same Restlet as one batched request
+
+    Calls of `post` to the same script and deployment within `window`
+    seconds are sent as one POST of up to `max_batch_size` calls, which takes
+    one round trip and one concurrency slot instead of one per call.
+
+    The Restlet must implement this batch contract (see
+    `REFERENCE_DISPATCHER` for a SuiteScript implementation, and
+    `RestletBatchStub` for a local one to test with). The request body is
+
+        {"batch": [{"id": "0", "body": <payload>}, ...]}
+
+    and the response must hold an entry per call, in any order:
+
+        {"batch": [{"id": "0", "body": <result>},
+                   {"id": "1", "error": {"code": "...", "message": "..."}}]}
+
+    Each caller gets the `body` of its own entry, or a `RestletBatchError`
+    for an `error` entry. If the batched request fails, all of its callers
+    get the error.
+
+    Once `max_pending` calls are gathered or being sent, callers wait for a
+    batch to finish before their call is gathered. Use as an async context
+    manager, or call `aclose`, so that gathered calls are sent before
+    shutting down:
+
+    >>> async with RestletMultiplexer(ns.restlet) as mux:
+    ...     result = await mux.post(123, {"item": 1})
+
+    Args:
+        restlet:
+            Client to send the batches with
+        window:
+            Seconds to wait for more calls after the first of a batch
+        max_batch_size:
+            Maximum number of calls per request
+        max_pending:
+            Maximum number of calls gathered or being sent. Defaults to ten
+            batches.
+    """
+
+    def __init__(
+        self,
+        restlet: NetSuiteRestlet,
+        *,
+        window: float = 0.01,
+        max_batch_size: int = 50,
+        max_pending: Optional[int] = None,
+    ) -> None:
+        super().__init__(
+            max_batch_size=max_batch_size,
+            max_pending=10 * max_batch_size if max_pending is None else max_pending,
+        )
+        self._restlet = restlet
+        self.window = window
+        self.calls = 0
+        self.batches = 0
+
+    def __repr__(self) -> str:
+        name = self.__class__.__name__
+        return f"<{name} calls={self.calls} batches={self.batches}>"
+
+    @property
+    def _delay(self) -> float:
+        return self.window
+
+    async def post(self, script_id: int, payload: Any, *, deploy: int = 1) -> Any:
+        """POST `payload` to a Restlet, as part of a batch"""
+        self.calls += 1
+        return await self._submit((script_id, deploy), payload)
+
+    async def _send(self, target: Tuple[int, int], pending: _Pending) -> None:
+        script_id, deploy = target
+        self.batches += 1
+        envelope = {
+            "batch": [
+                {"id": str(index), "body": payload}
+                for index, (payload, _) in enumerate(pending)
+            ]
+        }
+        try:
+            response = await self._restlet.post(script_id, deploy=deploy, json=envelope)
+            entries = {entry["id"]: entry for entry in response["batch"]}
+        except Exception:
+            logger.debug(f"Batch of {len(pending)} calls to Restlet {script_id} failed")
+            raise
+
+        for index, (_, future) in enumerate(pending):
+            if future.done():
+                continue
+            entry = entries.get(str(index))
+            if entry is None:
+                future.set_exception(
+                    RestletBatchError("MISSING", "No result for the call in the batch")
+                )
+            elif "error" in entry:
+                error = entry["error"] or {}
+                future.set_exception(
+                    RestletBatchError(
+                        str(error.get("code", "ERROR")), str(error.get("message", ""))
+                    )
+                )
+            else:
+                future.set_result(entry.get("body"))
+
+
+class RestletBatchStub(httpx.MockTransport):
+    """
+    An HTTP transport playing a Restlet which implements the batch contract
+    of `RestletMultiplexer`, to test code using it without NetSuite
+
+    `handler` is called with the script ID, the deployment and the payload of
+    each call. An error it raises becomes an `error` entry of the call.
+
+    >>> stub = RestletBatchStub(lambda script_id, deploy, body: {"ok": True})
+    >>> restlet = NetSuiteRestlet(config, http_client=httpx.AsyncClient(transport=stub))
+    """
+
+    def __init__(self, handler: Callable[[int, int, Any], Any]) -> None:
+        super().__init__(self._handle)
+        self.dispatcher = handler
+        self.requests = 0
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        script_id = int(request.url.params["script"])
+        deploy = int(request.url.params["deploy"])
+        batch = []
+        for entry in json.loads(request.content)["batch"]:
+            try:
+                body = self.dispatcher(script_id, deploy, entry["body"])
+            except Exception as ex:
+                error = {"code": type(ex).__name__, "message": str(ex)}
+                batch.append({"id": entry["id"], "error": error})
+            else:
+                batch.append({"id": entry["id"], "body": body})
+        return httpx.Response(200, json={"batch": batch})
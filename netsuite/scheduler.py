@@ -0,0 +1,229 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Deque, Dict, Iterator, Optional, Tuple
+
+__all__ = ("PriorityScheduler", "PriorityStats", "current_priority", "priority")
+
+HIGH = "high"
+NORMAL = "normal"
+LOW = "low"
+
+DEFAULT_WEIGHTS = {HIGH: 8.0, NORMAL: 4.0, LOW: 1.0}
+
+_current_priority: ContextVar[str] = ContextVar("netsuite_priority", default=NORMAL)
+
+_Waiter = Tuple[float, "asyncio.Future[None]", float]
+
+
+class PriorityStats:
+    """Counters of a priority class of a `PriorityScheduler`"""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.waited = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.in_flight = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} requests={self.requests} "
+            f"queue_depth={self.queue_depth} in_flight={self.in_flight} "
+            f"mean_wait={self.mean_wait:.3f}s>"
+        )
+
+    @property
+    def mean_wait(self) -> float:
+        """Mean seconds a request of the class waited for a slot"""
+        return self.total_wait / self.requests if self.requests else 0.0
+
+    def as_dict(self) -> dict:
+        return dict(vars(self), mean_wait=self.mean_wait)
+
+
+class PriorityScheduler:
+    """
+    Concurrency limit shared by requests of several priority classes
+
+    Unlike a FIFO semaphore, requests waiting for a slot are let through by
+    weighted fair queuing: while all classes are busy, each class gets slots
+    in proportion to its weight, so a large batch job only slows interactive
+    requests down instead of queueing them behind all of its own. Within a
+    class, requests are let through in order.
+
+    The class of a request is the `priority` option of REST API and Restlet
+    requests, or else the one set by the `priority` context manager, which
+    defaults to `"normal"`.
+
+    Args:
+        limit:
+            Number of requests made at the same time
+        weights:
+            Relative share of each priority class. Defaults to `"high"`: 8,
+            `"normal"`: 4 and `"low"`: 1.
+        reserved:
+            Number of slots only the given classes may use, e.g.
+            `{"high": 2}` so that interactive requests never wait for a batch
+            job to finish its requests
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        *,
+        weights: Optional[Dict[str, float]] = None,
+        reserved: Optional[Dict[str, int]] = None,
+    ) -> None:
+        weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+        reserved = dict(reserved or {})
+        if not reserved.keys() <= weights.keys():
+            raise ValueError("Slots can only be reserved for weighted classes")
+        if sum(reserved.values()) > limit:
+            raise ValueError("Can't reserve more slots than the limit")
+        if any(weight <= 0 for weight in weights.values()):
+            raise ValueError("Weights must be positive")
+        self.limit = limit
+        self.weights = weights
+        self.reserved = reserved
+        self.stats = {name: PriorityStats() for name in weights}
+        self._queues: Dict[str, Deque[_Waiter]] = {name: deque() for name in weights}
+        self._finish_tags = {name: 0.0 for name in weights}
+        self._virtual_time = 0.0
+        self._in_use = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} in_use={self._in_use}/{self.limit} "
+            f"queued={sum(len(queue) for queue in self._queues.values())}>"
+        )
+
+    @asynccontextmanager
+    async def slot(self, priority: Optional[str] = None) -> AsyncIterator[None]:
+        """Hold a slot while in the block"""
+        name = await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release(name)
+
+    async def acquire(self, priority: Optional[str] = None) -> str:
+        """
+        Wait for a slot
+
+        Returns:
+            The priority class, to pass to `release`
+        """
+        name = current_priority() if priority is None else priority
+        if name not in self.weights:
+            raise ValueError(f"Unknown priority {name!r}")
+        stats = self.stats[name]
+        stats.requests += 1
+        if not any(self._queues.values()) and self._admissible(name):
+            self._take(name)
+            return name
+
+        # The virtual finish time of the request: a class with weight w is
+        # let through 1/w virtual time units after its previous request
+        tag = max(self._virtual_time, self._finish_tags[name]) + 1 / self.weights[name]
+        self._finish_tags[name] = tag
+        waiter: _Waiter = (
+            tag,
+            asyncio.get_running_loop().create_future(),
+            time.monotonic(),
+        )
+        queue = self._queues[name]
+        queue.append(waiter)
+        self._dispatch()
+        if waiter[1].done():
+            # Only queued behind requests which can't be let through yet
+            return name
+
+        stats.waited += 1
+        stats.queue_depth = len(queue)
+        stats.max_queue_depth = max(stats.max_queue_depth, stats.queue_depth)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            if waiter[1].cancelled():
+                if waiter in queue:
+                    queue.remove(waiter)
+                stats.queue_depth = len(queue)
+            else:
+                # Got the slot just before being cancelled
+                self.release(name)
+            raise
+        return name
+
+    def release(self, priority: str) -> None:
+        """Give back a slot taken by `acquire`"""
+        self._in_use -= 1
+        self.stats[priority].in_flight -= 1
+        self._dispatch()
+
+    def _admissible(self, name: str) -> bool:
+        if self._in_use >= self.limit:
+            return False
+        # Slots reserved for other classes, which they don't use right now
+        unused_reserved = sum(
+            max(slots - self.stats[other].in_flight, 0)
+            for other, slots in self.reserved.items()
+            if other != name
+        )
+        return self.limit - self._in_use > unused_reserved
+
+    def _take(self, name: str) -> None:
+        self._in_use += 1
+        self.stats[name].in_flight += 1
+
+    def _dispatch(self) -> None:
+        while True:
+            best: Optional[str] = None
+            for name, queue in self._queues.items():
+                # Cancelled waiters not yet removed by their task
+                while queue and queue[0][1].cancelled():
+                    queue.popleft()
+                if (
+                    queue
+                    and self._admissible(name)
+                    and (best is None or queue[0][0] < self._queues[best][0][0])
+                ):
+                    best = name
+            if best is None:
+                return
+
+            queue = self._queues[best]
+            tag, future, enqueued_at = queue.popleft()
+            stats = self.stats[best]
+            stats.queue_depth = len(queue)
+            wait = time.monotonic() - enqueued_at
+            stats.total_wait += wait
+            stats.max_wait = max(stats.max_wait, wait)
+            self._virtual_time = tag
+            self._take(best)
+            future.set_result(None)
+
+
+def current_priority() -> str:
+    """The priority class of requests made now"""
+    return _current_priority.get()
+
+
+@contextmanager
+def priority(name: str) -> Iterator[None]:
+    """
+    Set the priority class of all requests made inside the block, by any
+    client, including the SOAP API
+
+    >>> with priority("low"):
+    ...     await ns.soap_api.upsertList(records)
+    """
+    token = _current_priority.set(name)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
@@ -0,0 +1,48 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from .deadline import without_deadline
+
+__all__ = ("SingleFlight",)
+
+
+class SingleFlight:
+    """
+    Share one in-flight call among all concurrent callers asking for the same
+    key
+
+    The call runs in its own task, so a caller being cancelled doesn't cancel
+    it for the others. For the same reason it runs without the deadline of
+    the caller which started it, each caller only waiting for it until its
+    own deadline. Once it's done the key is forgotten, so later callers make
+    a new call; nothing is cached.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} calls={self.calls} "
+            f"coalesced={self.coalesced} in_flight={len(self._calls)}>"
+        )
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the result of `fn()`, or of the identical call in flight"""
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(without_deadline(fn))
+            task.add_done_callback(lambda task: self._forget(key, task))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        self._calls.pop(key, None)
+        # All callers might have been cancelled, leaving nobody to see the
+        # error. They're raised to the callers, so just mark them as retrieved.
+        if not task.cancelled():
+            task.exception()
@@ -1,2 +1,5 @@
+from .async_jobs import *  # noqa
 from .client import *  # noqa
 from .exceptions import *  # noqa
+from .results import *  # noqa
+from .write_buffer import *  # noqa
@@ -0,0 +1,177 @@
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, AsyncIterator, List, Optional
+
+from ..deadline import current_deadline
+from . import helpers
+from .exceptions import NetsuiteResponseError
+from .results import WriteResult
+
+if TYPE_CHECKING:
+    from .client import NetSuiteSoapApi
+
+logger = logging.getLogger(__name__)
+
+__all__ = ("AsyncJob",)
+
+FINISHED_STATUSES = frozenset(("finished", "finishedWithErrors", "failed"))
+
+
+class AsyncJob:
+    """
+    Handle for a job submitted through one of NetSuite's asynchronous SOAP
+    operations (`asyncAddList`, `asyncSearch` etc.)
+
+    The job runs server side, so no connection or concurrency slot is held
+    while waiting. Use `wait` to poll `checkAsyncStatus` until the job is done
+    and `results` to stream the outcome through `getAsyncResult`.
+    """
+
+    def __init__(
+        self,
+        soap_api: "NetSuiteSoapApi",
+        job_id: str,
+        *,
+        status: Optional[str] = None,
+        percent_completed: Optional[float] = None,
+        est_remaining_duration: Optional[float] = None,
+    ) -> None:
+        self.soap_api = soap_api
+        self.job_id = job_id
+        self.status = status
+        self.percent_completed = percent_completed
+        self.est_remaining_duration = est_remaining_duration
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} {self.job_id} status={self.status} "
+            f"percent_completed={self.percent_completed}>"
+        )
+
+    @classmethod
+    def from_status_result(
+        cls, soap_api: "NetSuiteSoapApi", status_result: Any
+    ) -> "AsyncJob":
+        job = cls(soap_api, status_result["jobId"])
+        job._update(status_result)
+        return job
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    @property
+    def is_success(self) -> bool:
+        return self.status == "finished"
+
+    async def refresh(self) -> "AsyncJob":
+        """Fetch the current status of the job"""
+        self._update(await self.soap_api.checkAsyncStatus(self.job_id))
+        return self
+
+    async def wait(
+        self,
+        *,
+        poll_interval: float = 5.0,
+        max_poll_interval: float = 60.0,
+        backoff: float = 2.0,
+        timeout: Optional[float] = None,
+    ) -> "AsyncJob":
+        """
+        Poll the job status until it's finished
+
+        Args:
+            poll_interval:
+                Seconds to wait before the first re-check of the status
+            max_poll_interval:
+                Upper limit for the wait between two checks
+            backoff:
+                Factor that the wait is multiplied with after each check
+            timeout:
+                Raise `asyncio.TimeoutError` if job hasn't finished after this
+                many seconds. Capped by the time left of the current `deadline`,
+                if any.
+        """
+        loop = asyncio.get_running_loop()
+        current = current_deadline()
+        if current is not None and (timeout is None or current.remaining < timeout):
+            timeout = current.remaining
+        deadline = None if timeout is None else loop.time() + timeout
+        interval = poll_interval
+
+        if self.status is None:
+            await self.refresh()
+
+        while not self.is_finished:
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError(
+                        f"Async job {self.job_id} not finished after {timeout}s"
+                    )
+                interval = min(interval, remaining)
+            logger.debug(
+                f"Async job {self.job_id} is {self.status} "
+                f"({self.percent_completed}%), checking again in {interval}s"
+            )
+            await asyncio.sleep(interval)
+            interval = min(interval * backoff, max_poll_interval)
+            await self.refresh()
+
+        return self
+
+    async def pages(self) -> AsyncIterator[List[Any]]:
+        """
+        Yield the job result one page at a time
+
+        Waits for the job to finish first. Write operations yield
+        `WriteResult`s (without the submitted record attached), read
+        operations yield records. Only search results span multiple pages.
+        """
+        if not self.is_finished:
+            await self.wait()
+        if self.status == "failed":
+            raise NetsuiteResponseError(f"Async job {self.job_id} failed")
+
+        page_index = 1
+        while True:
+            async_result = await self.soap_api.getAsyncResult(
+                self.job_id, pageIndex=page_index
+            )
+            items, total_pages = self._extract_page(async_result)
+            yield items
+            if page_index >= total_pages:
+                break
+            page_index += 1
+
+    async def results(self) -> AsyncIterator[Any]:
+        """Yield the job result one item at a time. See `pages`."""
+        async for page in self.pages():
+            for item in page:
+                yield item
+
+    def _update(self, status_result: Any) -> None:
+        self.status = status_result["status"]
+        self.percent_completed = status_result["percentCompleted"]
+        self.est_remaining_duration = status_result["estRemainingDuration"]
+
+    @staticmethod
+    def _extract_page(async_result: Any):
+        if "searchResult" in async_result:
+            search_result = async_result["searchResult"]
+            helpers.raise_for_status(search_result)
+            record_list = search_result["recordList"]
+            records = record_list["record"] if record_list is not None else []
+            return list(records or []), search_result["totalPages"] or 1
+        elif "writeResponseList" in async_result:
+            write_responses = async_result["writeResponseList"]["writeResponse"]
+            return [
+                WriteResult.from_response(None, write_response)
+                for write_response in write_responses or []
+            ], 1
+        elif "readResponseList" in async_result:
+            read_responses = async_result["readResponseList"]["readResponse"] or []
+            helpers.raise_for_status(read_responses)
+            return [read_response["record"] for read_response in read_responses], 1
+        else:
+            raise ValueError(f"Unknown async result: {async_result!r}")
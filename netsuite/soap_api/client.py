@@ -1,19 +1,77 @@
+import asyncio
+import base64
+import copy
 import logging
+import os
+import pathlib
 import re
-from contextlib import contextmanager
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import asynccontextmanager, contextmanager, nullcontext
 from datetime import datetime
 from functools import cached_property
-from typing import Dict, List, Optional, Sequence
-
-from ..config import Config
-from . import helpers, passport, zeep
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Union,
+    get_args,
+)
+
+import httpx
+
+from .. import constants, json
+from ..circuit_breaker import Attempt, CircuitBreaker, CircuitBreakers
+from ..config import Config, TokenAuth
+from ..deadline import check_deadline, deadline_errors, within_deadline
+from ..exceptions import CircuitOpenError
+from ..offload import Offloader, OffloadStats
+from ..record_cache import RecordCache
+from ..rest_api import NetSuiteRestApi
+from ..scheduler import PriorityScheduler, PriorityStats
+from . import files, helpers, passport, zeep
+from .async_jobs import AsyncJob
+from .converter import XmlConverter
 from .decorators import WebServiceCall
+from .exceptions import NetsuiteResponseError
+from .results import WriteListResult, WriteResult
+from .streaming import RecordStreamParser
 from .transports import AsyncNetSuiteTransport
 
 logger = logging.getLogger(__name__)
 
 __all__ = ("NetSuiteSoapApi",)
 
+ResponseMode = Literal["zeep", "builtin", "json"]
+RESPONSE_MODES = get_args(ResponseMode)
+
+# Failures of a chunk's request, giving each of its records a failed result.
+# Others, like deadlines or bugs, are raised.
+_WRITE_LIST_CHUNK_ERRORS = (
+    httpx.HTTPError,
+    zeep.exceptions.Fault,
+    zeep.exceptions.TransportError,
+    NetsuiteResponseError,
+    CircuitOpenError,
+)
+
+
+class _Slot:
+    """A request slot held with `NetSuiteSoapApi._limit`"""
+
+    def __init__(self, auth: Optional[TokenAuth]) -> None:
+        # The token credential to sign the request with, `None` meaning
+        # `config.auth`
+        self.auth = auth
+        self.attempt = Attempt()
+        # Whether the token credential was rejected or overused
+        self.credential_failed = False
+
 
 class NetSuiteSoapApi:
     version = "2021.1.0"
@@ -26,8 +84,26 @@ class NetSuiteSoapApi:
         version: Optional[str] = None,
         wsdl_url: Optional[str] = None,
         cache: Optional[zeep.cache.Base] = None,
+        concurrent_requests: int = 10,
+        response_mode: ResponseMode = "zeep",
+        offload_threshold: Optional[int] = None,
+        offload_executor: Optional[Executor] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        wsdl_client: Optional[httpx.Client] = None,
+        wsdl_documents: Optional[Dict[str, Any]] = None,
+        record_cache: Optional[RecordCache] = None,
+        circuit_breakers: Optional[CircuitBreakers] = None,
+        scheduler: Optional[PriorityScheduler] = None,
     ) -> None:
         self._ensure_required_dependencies()
+        if response_mode not in RESPONSE_MODES:
+            raise ValueError(f"`response_mode` must be one of {RESPONSE_MODES}")
+        if record_cache is not None and response_mode != "builtin":
+            raise ValueError("`record_cache` requires the `builtin` response mode")
+        if isinstance(offload_executor, ProcessPoolExecutor):
+            # Parsing needs the client's WSDL, and zeep objects can't be
+            # sent between processes
+            raise ValueError("SOAP responses can only be parsed in a thread pool")
         if version is not None:
             assert re.match(r"\d+\.\d+\.\d+", version)
             self.version = version
@@ -35,6 +111,15 @@ class NetSuiteSoapApi:
         self._wsdl_url: Optional[str] = wsdl_url
         self._cache: Optional[zeep.cache.Base] = cache
         self._client: Optional[zeep.client.AsyncClient] = None
+        self._concurrent_requests = concurrent_requests
+        self._response_mode = response_mode
+        self._offloader = Offloader(offload_threshold, offload_executor)
+        self._http_client = http_client
+        self._wsdl_client = wsdl_client
+        self._wsdl_documents = wsdl_documents
+        self._record_cache = record_cache
+        self._circuit_breakers = circuit_breakers
+        self._scheduler = scheduler
 
     def __repr__(self) -> str:
         return f"<{self.__class__.__name__} {self.hostname}({self.version})>"
@@ -68,6 +153,63 @@ class NetSuiteSoapApi:
             self._client = self._generate_client()
         return self._client
 
+    @cached_property
+    def _request_scheduler(self) -> PriorityScheduler:
+        if self._scheduler is not None:
+            return self._scheduler
+        return PriorityScheduler(self._concurrent_requests)
+
+    @property
+    def priority_stats(self) -> Dict[str, PriorityStats]:
+        """Queue depth and wait time of requests, per priority class"""
+        return self._request_scheduler.stats
+
+    @cached_property
+    def _circuit_breaker(self) -> Optional[CircuitBreaker]:
+        if self._circuit_breakers is None:
+            return None
+        return self._circuit_breakers.get(self.config.account, "soap_api")
+
+    @asynccontextmanager
+    async def _limit(self) -> AsyncIterator[_Slot]:
+        """
+        Hold a request slot, failing fast while NetSuite seems down and giving
+        up waiting once the deadline passes
+
+        When several token credentials are configured, the least loaded one
+        is taken once a slot is free, so that queued requests don't hold
+        credentials other clients could use.
+        """
+        check_deadline()
+        breaker = self._circuit_breaker
+        if breaker is not None:
+            # Checked before waiting for a slot too, so that queued requests
+            # fail fast once the circuit opens
+            breaker.raise_if_open()
+        # The priority class is the one of the `priority` context
+        priority = await within_deadline(self._request_scheduler.acquire())
+        pool = self.config.token_pool
+        token = None
+        try:
+            if pool is not None:
+                token = await within_deadline(pool.acquire())
+            slot = _Slot(None if token is None else token.auth)
+            attempt = (
+                nullcontext(slot.attempt)
+                if breaker is None
+                else breaker.attempt(helpers.is_outage)
+            )
+            try:
+                with attempt as slot.attempt, deadline_errors():
+                    yield slot
+            except Exception as ex:
+                slot.credential_failed = helpers.is_credential_failure(ex)
+                raise
+        finally:
+            if pool is not None and token is not None:
+                await pool.release(token, failed=slot.credential_failed)
+            self._request_scheduler.release(priority)
+
     @property
     def transport(self):
         return self.client.transport
@@ -101,15 +243,44 @@ class NetSuiteSoapApi:
         return AsyncNetSuiteTransport(
             self.wsdl_url,
             cache=self.cache,
+            client=self._http_client,
+            wsdl_client=self._wsdl_client,
         )
 
-    def generate_passport(self) -> Dict:
-        return passport.make(self, self.config)
+    @property
+    def _passport(self) -> passport.Passport:
+        return passport.get_passport(self, self.config)
+
+    def generate_passport(self, auth: Optional[TokenAuth] = None) -> Dict:
+        return passport.make(self, self.config, auth)
+
+    @property
+    def response_mode(self) -> str:
+        return self._response_mode
+
+    @property
+    def offload_stats(self) -> OffloadStats:
+        """Time spent parsing responses, on and off the event loop"""
+        return self._offloader.stats
+
+    @property
+    def record_cache(self) -> Optional[RecordCache]:
+        return self._record_cache
+
+    @cached_property
+    def converter(self) -> XmlConverter:
+        return XmlConverter(self.client.wsdl.types)
 
     def to_builtin(self, obj, *args, **kw):
         """Turn zeep XML object into python built-in data structures"""
         return helpers.to_builtin(obj, *args, **kw)
 
+    def _finalize_response(self, obj: Any) -> Any:
+        """Prepare an extracted response for returning, as per `response_mode`"""
+        if self._response_mode == "json":
+            return json.dumps_bytes(obj)
+        return obj
+
     @contextmanager
     def with_timeout(self, timeout: int):
         """Run SuiteTalk operation with the specified timeout"""
@@ -117,11 +288,30 @@ class NetSuiteSoapApi:
             yield
 
     def _generate_client(self) -> zeep.client.AsyncClient:
+        transport = self._generate_transport()
         return zeep.client.AsyncClient(
-            self.wsdl_url,
-            transport=self._generate_transport(),
+            self._get_wsdl(transport),
+            transport=transport,
         )
 
+    def _get_wsdl(self, transport: zeep.transports.AsyncTransport) -> Any:
+        """
+        The parsed WSDL, shared through `wsdl_documents` if given
+
+        The WSDL is the same for all accounts on a version, except for the
+        service address, which the transport rewrites to this account's domain
+        anyway. So the document parsed for one account can be used by all.
+        """
+        if self._wsdl_documents is None:
+            return self.wsdl_url
+        document = self._wsdl_documents.get(self.version)
+        if document is None:
+            # NOTE: zeep annotates `transport` as a class, but takes an instance
+            document = self._wsdl_documents[self.version] = zeep.wsdl.Document(
+                self.wsdl_url, transport  # type: ignore[arg-type]
+            )
+        return document
+
     def _get_namespace(self, name: str, sub_namespace: str) -> str:
         return "urn:{name}_{version}.{sub_namespace}.webservices.netsuite.com".format(
             name=name,
@@ -340,24 +530,119 @@ class NetSuiteSoapApi:
         Returns:
             The response from NetSuite
         """
-        svc = getattr(self.service, service_name)
-        headers = self.generate_passport()
+        if self._response_mode == "zeep" and not self._offloader.enabled:
+            svc = getattr(self.service, service_name)
+            async with self._limit() as slot:
+                headers = self._make_soapheaders(additionalHeaders, slot.auth)
+                return await within_deadline(svc(*args, _soapheaders=headers, **kw))
+
+        response = await self._request_raw(
+            service_name, *args, additionalHeaders=additionalHeaders, **kw
+        )
+        # Parsing is done off the event loop for large responses
+        return await self._offloader.run(
+            len(response.content), self._process_response, service_name, response
+        )
+
+    async def _request_raw(
+        self,
+        service_name: str,
+        *args,
+        additionalHeaders: Optional[dict] = None,
+        **kw,
+    ):
+        """Make a web service request, returning the HTTP response unparsed"""
+        binding = self.service._binding
+        options = self.service._binding_options
+        async with self._limit() as slot:
+            kw["_soapheaders"] = self._make_soapheaders(additionalHeaders, slot.auth)
+            envelope, http_headers = binding._create(
+                service_name, args, kw, client=self.client, options=options
+            )
+            response = await self.transport.post_xml(
+                options["address"], envelope, http_headers
+            )
+            slot.attempt.failed = helpers.is_outage_response(response)
+            # The response is only parsed once the slot is released
+            slot.credential_failed = helpers.is_credential_failure_response(response)
+            return response
+
+    def _process_response(self, service_name: str, response) -> Any:
+        """Parse the HTTP response of a web service request as per `response_mode`"""
+        binding = self.service._binding
+        operation = binding.get(service_name)
+        if self._response_mode == "zeep":
+            return binding.process_reply(self.client, operation, response)
+
+        envelope = None
+        if response.status_code == 200:
+            envelope = self.converter.parse(response.content)
+        if envelope is None or self.converter.is_fault(envelope):
+            # Let zeep raise the appropriate `Fault` or `TransportError`
+            binding.process_reply(self.client, operation, response)
+        return self.converter.envelope_to_builtin(envelope)
+
+    def _make_soapheaders(
+        self, additionalHeaders: Optional[dict], auth: Optional[TokenAuth] = None
+    ) -> Union[Dict, List]:
+        headers: Union[Dict, List]
         if additionalHeaders:
+            headers = self.generate_passport(auth)
             headers.update(additionalHeaders)
-        return await svc(*args, _soapheaders=headers, **kw)
+        else:
+            # Fast path, skips building zeep objects for the passport
+            token_passport = passport.get_passport(self, self.config, auth)
+            headers = [token_passport.get_xml_element()]
+        return headers
+
+    async def getList(
+        self,
+        recordType: str,
+        *,
+        internalIds: Optional[Sequence[int]] = None,
+        externalIds: Optional[Sequence[str]] = None,
+    ) -> List[zeep.xsd.CompoundValue]:
+        """Get a list of records"""
+        if self._record_cache is None or externalIds:
+            return await self._get_list(
+                recordType, internalIds=internalIds, externalIds=externalIds
+            )
+        ids = [int(internal_id) for internal_id in internalIds or ()]
+        records = await self._get_cached_records(recordType, ids)
+        return [records[id_] for id_ in ids if id_ in records]
+
+    async def _get_cached_records(
+        self, recordType: str, internalIds: List[int]
+    ) -> Dict[int, Any]:
+        async def fetch(ids):
+            records = await self._get_list(recordType, internalIds=ids)
+            return {int(record["internalId"]): record for record in records}
+
+        return await self._record_cache.get_many(  # type: ignore[union-attr]
+            f"{self.config.account}/soap",
+            recordType,
+            internalIds,
+            fetch,
+            self._suiteql_api.suiteql,
+        )
+
+    @cached_property
+    def _suiteql_api(self) -> NetSuiteRestApi:
+        # Versions of cached records are looked up with SuiteQL, which is only
+        # available through the REST API
+        return NetSuiteRestApi(self.config, http_client=self._http_client)
 
     @WebServiceCall(
         "body.readResponseList.readResponse",
         extract=lambda resp: [r["record"] for r in resp],
     )
-    async def getList(
+    async def _get_list(
         self,
         recordType: str,
         *,
         internalIds: Optional[Sequence[int]] = None,
         externalIds: Optional[Sequence[str]] = None,
     ) -> List[zeep.xsd.CompoundValue]:
-        """Get a list of records"""
         if internalIds is None:
             internalIds = []
         else:
@@ -390,10 +675,6 @@ class NetSuiteSoapApi:
             ),
         )
 
-    @WebServiceCall(
-        "body.readResponse",
-        extract=lambda resp: resp["record"],
-    )
     async def get(
         self,
         recordType: str,
@@ -405,6 +686,22 @@ class NetSuiteSoapApi:
         if len([v for v in (internalId, externalId) if v is not None]) != 1:
             raise ValueError("Specify either `internalId` or `externalId`")
 
+        if self._record_cache is not None and internalId is not None:
+            records = await self._get_cached_records(recordType, [int(internalId)])
+            return records[int(internalId)]
+        return await self._get(recordType, internalId=internalId, externalId=externalId)
+
+    @WebServiceCall(
+        "body.readResponse",
+        extract=lambda resp: resp["record"],
+    )
+    async def _get(
+        self,
+        recordType: str,
+        *,
+        internalId: Optional[int] = None,
+        externalId: Optional[str] = None,
+    ) -> zeep.xsd.CompoundValue:
         if internalId:
             record_ref = self.Core.RecordRef(
                 type=recordType,
@@ -431,29 +728,384 @@ class NetSuiteSoapApi:
             ),
         )
 
+    async def stream_get_all(self, recordType: str) -> AsyncIterator[Any]:
+        """
+        Get all records of a given type, one record at a time
+
+        Like `getAll`, but the response is parsed incrementally while it's
+        downloaded, so only a single record is kept in memory at a time.
+        """
+        async for record in self._stream_records(
+            "getAll",
+            self._make_record_stream_parser(),
+            record=self.Core.GetAllRecord(recordType=recordType),
+        ):
+            yield record
+
+    async def stream_search(
+        self, record: zeep.xsd.CompoundValue, additionalHeaders: Optional[dict] = None
+    ) -> AsyncIterator[Any]:
+        """
+        Search records, yielding one record at a time
+
+        Like `search`, but all result pages are fetched (using
+        `searchMoreWithId`) and each response is parsed incrementally while
+        it's downloaded, so only a single record is kept in memory at a time.
+        """
+        parser = self._make_record_stream_parser()
+        async for item in self._stream_records(
+            "search", parser, searchRecord=record, additionalHeaders=additionalHeaders
+        ):
+            yield item
+
+        for pageIndex in range(2, parser.total_pages + 1):
+            async for item in self._stream_records(
+                "searchMoreWithId",
+                self._make_record_stream_parser(),
+                searchId=parser.search_id,
+                pageIndex=pageIndex,
+                additionalHeaders=additionalHeaders,
+            ):
+                yield item
+
+    async def _stream_records(
+        self,
+        service_name: str,
+        parser: RecordStreamParser,
+        *args,
+        additionalHeaders: Optional[dict] = None,
+        **kw,
+    ) -> AsyncIterator[Any]:
+        binding = self.service._binding
+        options = self.service._binding_options
+
+        async with self._limit() as slot:
+            kw["_soapheaders"] = self._make_soapheaders(additionalHeaders, slot.auth)
+            envelope, http_headers = binding._create(
+                service_name, args, kw, client=self.client, options=options
+            )
+            message = zeep.etree.tostring(
+                envelope, xml_declaration=True, encoding="utf-8"
+            )
+            async with self.transport.post_stream(
+                options["address"], message, http_headers
+            ) as response:
+                slot.attempt.failed = helpers.is_outage_response(response)
+                if response.status_code != 200:
+                    # Let zeep raise the appropriate `Fault` or `TransportError`
+                    await response.aread()
+                    binding.process_reply(
+                        self.client,
+                        binding.get(service_name),
+                        self.transport.new_response(response),
+                    )
+                async for chunk in response.aiter_bytes():
+                    check_deadline()
+                    for record in parser.feed(chunk):
+                        yield record
+            for record in parser.close():
+                yield record
+            if parser.is_fault:
+                # Raised while the slot is held, so that a credential fault
+                # takes the token out of rotation
+                binding.process_error(parser.root, binding.get(service_name))
+
+    def _make_record_stream_parser(self) -> RecordStreamParser:
+        return RecordStreamParser(
+            convert_record=self._convert_streamed_record,
+            convert_status=self.converter.element_to_builtin,
+        )
+
+    def _convert_streamed_record(self, element: zeep.etree._Element) -> Any:
+        # A `record`, or a `searchRow` of a search returning columns
+        name = element.tag.rpartition("}")[2]
+        xsd_element = self._streamed_item_elements[name]
+        if self._response_mode == "zeep":
+            return xsd_element.parse(element, self.client.wsdl.types)
+        return self._finalize_response(
+            self.converter.element_to_builtin(element, xsd_element.type)
+        )
+
+    @cached_property
+    def _streamed_item_elements(self) -> Dict[str, zeep.xsd.Element]:
+        return {
+            "record": dict(self.Core.RecordList.elements)["record"],
+            "searchRow": dict(self.Core.SearchRowList.elements)["searchRow"],
+        }
+
     @WebServiceCall(
         "body.writeResponse",
         extract=lambda resp: resp["baseRef"],
     )
+    async def upload_file(
+        self,
+        path: Union[str, os.PathLike],
+        *,
+        folder: Optional[int] = None,
+        record: Optional[zeep.xsd.CompoundValue] = None,
+        operation: Literal["add", "update", "upsert"] = "add",
+        chunk_size: int = files.DEFAULT_CHUNK_SIZE,
+    ) -> zeep.xsd.CompoundValue:
+        """
+        Upload a file to the File Cabinet, streaming it from disk
+
+        The file is read and encoded to base64 a chunk at a time while the
+        request is sent, so memory use doesn't depend on the file's size.
+
+        Args:
+            path:
+                The file to upload
+            folder:
+                Internal ID of the folder to put the file in
+            record:
+                A `File` record with other fields to set, e.g. `externalId`
+                or `description`. Its name defaults to the file's name.
+            operation:
+                The write operation, e.g. `"upsert"` to replace the file with
+                the same external ID
+            chunk_size:
+                Bytes read at a time, a multiple of 3
+
+        Returns:
+            The `RecordRef` of the file
+        """
+        if operation not in ("add", "update", "upsert"):
+            raise ValueError("`operation` must be one of add, update or upsert")
+        if chunk_size < 3 or chunk_size % 3:
+            raise ValueError("`chunk_size` must be a multiple of 3")
+        path = pathlib.Path(path)
+        size = path.stat().st_size
+
+        record = self.Filecabinet.File() if record is None else copy.deepcopy(record)
+        if record.name is None:
+            record.name = path.name
+        if folder is not None:
+            record.folder = self.Core.RecordRef(internalId=folder)
+        if record.attachFrom is None:
+            record.attachFrom = "_computer"
+        # Replaced by the file's content once the request is serialized
+        marker = os.urandom(15)
+        record.content = marker
+
+        response = await self._post_streamed_content(
+            operation,
+            base64.b64encode(marker),
+            files.iter_base64(path, chunk_size),
+            files.encoded_size(size),
+            record=record,
+        )
+        return await self._offloader.run(
+            len(response.content), self._process_response, operation, response
+        )
+
+    async def upload_folder(
+        self,
+        directory: Union[str, os.PathLike],
+        *,
+        folder: int,
+        pattern: str = "*",
+        concurrency: int = 4,
+        operation: Literal["add", "update", "upsert"] = "add",
+        make_record: Optional[Callable[[pathlib.Path], Any]] = None,
+    ) -> WriteListResult:
+        """
+        Upload the files of a directory matching `pattern` to a folder
+
+        Up to `concurrency` files are uploaded at a time, each streamed from
+        disk (see `upload_file`). Files NetSuite rejects, or whose upload
+        fails otherwise, get a failed result without stopping the others, so
+        partial failures must be checked by the caller (see
+        `WriteListResult.raise_for_status`).
+
+        Args:
+            make_record:
+                Called with the path of each file, returning the `File`
+                record to upload it as, e.g. to set an external ID for
+                `"upsert"`
+        """
+        if concurrency < 1:
+            raise ValueError("`concurrency` must be at least 1")
+        paths = sorted(p for p in pathlib.Path(directory).glob(pattern) if p.is_file())
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def upload(path: pathlib.Path) -> WriteResult:
+            record = None if make_record is None else make_record(path)
+            async with semaphore:
+                try:
+                    base_ref = await self.upload_file(
+                        path, folder=folder, record=record, operation=operation
+                    )
+                except Exception as ex:
+                    if not isinstance(ex, NetsuiteResponseError):
+                        logger.warning(f"Upload of {path} failed: {ex!r}")
+                    return WriteResult.from_error(path, ex)
+            return WriteResult(path, is_success=True, base_ref=base_ref)
+
+        return WriteListResult(await asyncio.gather(*(upload(p) for p in paths)))
+
+    async def download_file(
+        self,
+        path: Union[str, os.PathLike],
+        *,
+        internalId: Optional[int] = None,
+        externalId: Optional[str] = None,
+    ) -> zeep.xsd.CompoundValue:
+        """
+        Download a file from the File Cabinet, streaming it to disk
+
+        The base64 content is decoded and written a chunk at a time while the
+        response is downloaded, so memory use doesn't depend on the file's
+        size. `path` is only replaced once the whole file was downloaded.
+
+        Returns:
+            The `File` record, without its content
+        """
+        if len([v for v in (internalId, externalId) if v is not None]) != 1:
+            raise ValueError("Specify either `internalId` or `externalId`")
+        path = pathlib.Path(path)
+        partial_path = path.with_name(f"{path.name}.part")
+        record_ref = self.Core.RecordRef(
+            type="file", internalId=internalId, externalId=externalId
+        )
+
+        try:
+            with open(partial_path, "wb") as fp:
+                extractor = files.FileContentExtractor(fp)
+                response = await self._get_streamed_content(
+                    extractor, baseRef=record_ref
+                )
+            read_response = response["body"]["readResponse"]
+            helpers.raise_for_status(read_response)
+            if not extractor.found:
+                raise RuntimeError("NetSuite returned no content for the file")
+            os.replace(partial_path, path)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+        return self._finalize_response(read_response["record"])
+
+    async def _post_streamed_content(
+        self,
+        service_name: str,
+        marker: bytes,
+        content: AsyncIterator[bytes],
+        content_size: int,
+        **kw,
+    ):
+        """
+        Make a web service request whose message is streamed, with `content`
+        in place of `marker`, returning the HTTP response unparsed
+        """
+        binding = self.service._binding
+        options = self.service._binding_options
+        async with self._limit() as slot:
+            kw["_soapheaders"] = self._make_soapheaders(None, slot.auth)
+            envelope, http_headers = binding._create(
+                service_name, (), kw, client=self.client, options=options
+            )
+            message = zeep.etree.tostring(
+                envelope, xml_declaration=True, encoding="utf-8"
+            )
+            head, found, tail = message.partition(marker)
+            if not found:
+                raise RuntimeError("The content marker is missing from the request")
+
+            async def body() -> AsyncIterator[bytes]:
+                yield head
+                async for chunk in content:
+                    check_deadline()
+                    yield chunk
+                yield tail
+
+            # Sent as is rather than in chunked encoding
+            http_headers["Content-Length"] = str(len(head) + content_size + len(tail))
+            async with self.transport.post_stream(
+                options["address"], body(), http_headers
+            ) as response:
+                await response.aread()
+            slot.attempt.failed = helpers.is_outage_response(response)
+            slot.credential_failed = helpers.is_credential_failure_response(response)
+            return self.transport.new_response(response)
+
+    async def _get_streamed_content(
+        self, extractor: files.FileContentExtractor, **kw
+    ) -> Any:
+        """
+        Make a `get` request, passing the response body to `extractor` as
+        it's downloaded, and return the rest of the response parsed
+        """
+        binding = self.service._binding
+        options = self.service._binding_options
+        async with self._limit() as slot:
+            kw["_soapheaders"] = self._make_soapheaders(None, slot.auth)
+            envelope, http_headers = binding._create(
+                "get", (), kw, client=self.client, options=options
+            )
+            message = zeep.etree.tostring(
+                envelope, xml_declaration=True, encoding="utf-8"
+            )
+            async with self.transport.post_stream(
+                options["address"], message, http_headers
+            ) as response:
+                slot.attempt.failed = helpers.is_outage_response(response)
+                if response.status_code != 200:
+                    # Let zeep raise the appropriate `Fault` or `TransportError`
+                    await response.aread()
+                    return self._process_response(
+                        "get", self.transport.new_response(response)
+                    )
+                async for chunk in response.aiter_bytes():
+                    check_deadline()
+                    extractor.feed(chunk)
+
+        stripped = httpx.Response(
+            200,
+            headers={"Content-Type": response.headers.get("Content-Type", "")},
+            content=extractor.close(),
+            request=response.request,
+        )
+        return self._process_response("get", self.transport.new_response(stripped))
+
     async def add(self, record: zeep.xsd.CompoundValue) -> zeep.xsd.CompoundValue:
         """Insert a single record."""
-        return await self.request("add", record=record)
+        return await self._write("add", record)
 
-    @WebServiceCall(
-        "body.writeResponse",
-        extract=lambda resp: resp["baseRef"],
-    )
     async def update(self, record: zeep.xsd.CompoundValue) -> zeep.xsd.CompoundValue:
         """Insert a single record."""
-        return await self.request("update", record=record)
+        return await self._write("update", record)
+
+    async def upsert(self, record: zeep.xsd.CompoundValue) -> zeep.xsd.CompoundValue:
+        """Upsert a single record."""
+        return await self._write("upsert", record)
+
+    async def _write(
+        self, service_name: str, record: zeep.xsd.CompoundValue
+    ) -> zeep.xsd.CompoundValue:
+        base_ref = await self._write_record(service_name, record)
+        self._invalidate_cached_records([base_ref])
+        return base_ref
 
     @WebServiceCall(
         "body.writeResponse",
         extract=lambda resp: resp["baseRef"],
     )
-    async def upsert(self, record: zeep.xsd.CompoundValue) -> zeep.xsd.CompoundValue:
-        """Upsert a single record."""
-        return await self.request("upsert", record=record)
+    async def _write_record(
+        self, service_name: str, record: zeep.xsd.CompoundValue
+    ) -> zeep.xsd.CompoundValue:
+        return await self.request(service_name, record=record)
+
+    def _invalidate_cached_records(self, base_refs: Iterable[Any]) -> None:
+        """Drop written records from the record cache, if any"""
+        if self._record_cache is None:
+            return
+        for base_ref in base_refs:
+            if base_ref is None or not base_ref["type"] or not base_ref["internalId"]:
+                continue
+            self._record_cache.invalidate(
+                f"{self.config.account}/soap",
+                base_ref["type"],
+                int(base_ref["internalId"]),
+            )
 
     @WebServiceCall(
         "body.searchResult",
@@ -479,15 +1131,200 @@ class NetSuiteSoapApi:
             "searchMoreWithId", searchId=searchId, pageIndex=pageIndex
         )
 
-    @WebServiceCall(
-        "body.writeResponseList",
-        extract=lambda resp: [record["baseRef"] for record in resp],
-    )
+    async def addList(
+        self,
+        records: Iterable[zeep.xsd.CompoundValue],
+        *,
+        chunk_size: int = constants.SOAP_WRITE_LIST_LIMIT,
+    ) -> WriteListResult:
+        """Insert a list of records.
+
+        Records are sent in chunks of `chunk_size`, concurrently. Each record
+        gets its own result, so partial failures must be checked by the caller
+        (see `WriteListResult.raise_for_status`). The records of a chunk whose
+        request failed as a whole, e.g. by timing out, have the error in
+        `WriteResult.error`, as they may or may not have been written.
+        """
+        return await self._write_list("addList", "record", records, chunk_size)
+
+    async def updateList(
+        self,
+        records: Iterable[zeep.xsd.CompoundValue],
+        *,
+        chunk_size: int = constants.SOAP_WRITE_LIST_LIMIT,
+    ) -> WriteListResult:
+        """Update a list of records. See `addList` for chunking details."""
+        return await self._write_list("updateList", "record", records, chunk_size)
+
     async def upsertList(
-        self, records: List[zeep.xsd.CompoundValue]
-    ) -> List[zeep.xsd.CompoundValue]:
-        """Upsert a list of records."""
-        return await self.request("upsertList", record=records)
+        self,
+        records: Iterable[zeep.xsd.CompoundValue],
+        *,
+        chunk_size: int = constants.SOAP_WRITE_LIST_LIMIT,
+    ) -> WriteListResult:
+        """Upsert a list of records. See `addList` for chunking details."""
+        return await self._write_list("upsertList", "record", records, chunk_size)
+
+    async def deleteList(
+        self,
+        baseRefs: Iterable[zeep.xsd.CompoundValue],
+        *,
+        chunk_size: int = constants.SOAP_WRITE_LIST_LIMIT,
+    ) -> WriteListResult:
+        """Delete a list of records given their `RecordRef`s.
+
+        See `addList` for chunking details.
+        """
+        return await self._write_list("deleteList", "baseRef", baseRefs, chunk_size)
+
+    async def _write_list(
+        self,
+        service_name: str,
+        arg_name: str,
+        items: Iterable[Any],
+        chunk_size: int,
+    ) -> WriteListResult:
+        # Chunks are made lazily, as workers are free to send them
+        chunks = enumerate(helpers.chunked(items, chunk_size))
+        results: Dict[int, List[WriteResult]] = {}
+
+        async def worker() -> None:
+            for index, chunk in chunks:
+                results[index] = await self._write_list_chunk_results(
+                    service_name, arg_name, chunk
+                )
+
+        workers = self._request_scheduler.limit
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        write_list_result = WriteListResult(
+            [result for index in sorted(results) for result in results[index]]
+        )
+        self._invalidate_cached_records(
+            result.base_ref for result in write_list_result if result.is_success
+        )
+        return write_list_result
+
+    async def _write_list_chunk_results(
+        self, service_name: str, arg_name: str, chunk: List[Any]
+    ) -> List[WriteResult]:
+        try:
+            write_responses = await self._write_list_chunk(
+                service_name, arg_name, chunk
+            )
+        except _WRITE_LIST_CHUNK_ERRORS as ex:
+            # Other chunks may have been written, so their results are kept
+            logger.warning(f"`{service_name}` of {len(chunk)} records failed: {ex!r}")
+            return [WriteResult.from_error(item, ex) for item in chunk]
+        return [
+            WriteResult.from_response(item, write_response)
+            for item, write_response in zip(chunk, write_responses)
+        ]
+
+    async def _write_list_chunk(
+        self, service_name: str, arg_name: str, chunk: List[Any]
+    ) -> List[Any]:
+        kw: Dict[str, Any] = {arg_name: chunk}
+        response = await self.request(service_name, **kw)
+        write_response_list = response["body"]["writeResponseList"]
+        status = write_response_list["status"]
+        if status is not None and not status["isSuccess"]:
+            raise NetsuiteResponseError(status["statusDetail"])
+        write_responses = write_response_list["writeResponse"] or []
+        if len(write_responses) != len(chunk):
+            raise RuntimeError(
+                f"NetSuite returned {len(write_responses)} results for "
+                f"{len(chunk)} records in `{service_name}`"
+            )
+        return write_responses
+
+    async def asyncAddList(self, records: Iterable[zeep.xsd.CompoundValue]) -> AsyncJob:
+        """Submit an asynchronous job inserting a list of records."""
+        return await self._submit_async_write_list("asyncAddList", "record", records)
+
+    async def asyncUpdateList(
+        self, records: Iterable[zeep.xsd.CompoundValue]
+    ) -> AsyncJob:
+        """Submit an asynchronous job updating a list of records."""
+        return await self._submit_async_write_list("asyncUpdateList", "record", records)
+
+    async def asyncUpsertList(
+        self, records: Iterable[zeep.xsd.CompoundValue]
+    ) -> AsyncJob:
+        """Submit an asynchronous job upserting a list of records."""
+        return await self._submit_async_write_list("asyncUpsertList", "record", records)
+
+    async def asyncDeleteList(
+        self, baseRefs: Iterable[zeep.xsd.CompoundValue]
+    ) -> AsyncJob:
+        """Submit an asynchronous job deleting a list of records."""
+        return await self._submit_async_write_list(
+            "asyncDeleteList", "baseRef", baseRefs
+        )
+
+    async def asyncGetList(
+        self,
+        recordType: str,
+        *,
+        internalIds: Optional[Sequence[int]] = None,
+        externalIds: Optional[Sequence[str]] = None,
+    ) -> AsyncJob:
+        """Submit an asynchronous job getting a list of records."""
+        base_refs = [
+            self.Core.RecordRef(type=recordType, internalId=internalId)
+            for internalId in internalIds or ()
+        ] + [
+            self.Core.RecordRef(type=recordType, externalId=externalId)
+            for externalId in externalIds or ()
+        ]
+        if len(base_refs) > constants.SOAP_ASYNC_GET_LIST_LIMIT:
+            raise ValueError(
+                f"`asyncGetList` accepts at most "
+                f"{constants.SOAP_ASYNC_GET_LIST_LIMIT} records"
+            )
+        return await self._submit_async_job("asyncGetList", baseRef=base_refs)
+
+    async def asyncSearch(
+        self, record: zeep.xsd.CompoundValue, additionalHeaders: Optional[dict] = None
+    ) -> AsyncJob:
+        """Submit an asynchronous search job."""
+        return await self._submit_async_job(
+            "asyncSearch", searchRecord=record, additionalHeaders=additionalHeaders
+        )
+
+    def async_job(self, job_id: str) -> AsyncJob:
+        """Get a handle for a previously submitted asynchronous job."""
+        return AsyncJob(self, job_id)
+
+    async def checkAsyncStatus(self, jobId: str) -> zeep.xsd.CompoundValue:
+        """Get the status of an asynchronous job"""
+        response = await self.request("checkAsyncStatus", jobId=jobId)
+        return response["body"]["asyncStatusResult"]
+
+    async def getAsyncResult(
+        self, jobId: str, pageIndex: int = 1
+    ) -> zeep.xsd.CompoundValue:
+        """Get a page of the result of a finished asynchronous job"""
+        response = await self.request(
+            "getAsyncResult", jobId=jobId, pageIndex=pageIndex
+        )
+        return response["body"]["asyncResult"]
+
+    async def _submit_async_write_list(
+        self, service_name: str, arg_name: str, items: Iterable[Any]
+    ) -> AsyncJob:
+        items = list(items)
+        if len(items) > constants.SOAP_ASYNC_WRITE_LIST_LIMIT:
+            raise ValueError(
+                f"`{service_name}` accepts at most "
+                f"{constants.SOAP_ASYNC_WRITE_LIST_LIMIT} records, use "
+                "`helpers.chunked` to submit one job per chunk"
+            )
+        kw: Dict[str, Any] = {arg_name: items}
+        return await self._submit_async_job(service_name, **kw)
+
+    async def _submit_async_job(self, service_name: str, **kw) -> AsyncJob:
+        response = await self.request(service_name, **kw)
+        return AsyncJob.from_status_result(self, response["body"]["asyncStatusResult"])
 
     @WebServiceCall(
         "body.getItemAvailabilityResult",
@@ -0,0 +1,258 @@
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import zeep
+
+logger = logging.getLogger(__name__)
+
+__all__ = ("XmlConverter",)
+
+SOAP_ENV_NS = "http://schemas.xmlsoap.org/soap/envelope/"
+XSI_NS = "http://www.w3.org/2001/XMLSchema-instance"
+XSI_TYPE = f"{{{XSI_NS}}}type"
+XSI_NIL = f"{{{XSI_NS}}}nil"
+
+
+def _localname(tag: str) -> str:
+    return tag.rpartition("}")[2]
+
+
+def _passthrough(value: str) -> str:
+    return value
+
+
+class _TypePlan:
+    """Everything needed to convert an XML element of a given complex type"""
+
+    __slots__ = ("children", "attributes", "template", "list_keys", "content")
+
+    def __init__(self, xsd_type: Any) -> None:
+        self.children: Dict[str, Tuple[str, Any, bool]] = {}
+        self.attributes: Dict[str, Tuple[str, Callable]] = {}
+        self.template: Dict[str, Any] = {}
+        self.list_keys: List[str] = []
+        # Converter for text content of types with simple content
+        self.content: Optional[Callable] = None
+
+        for name, element in xsd_type.elements:
+            if not isinstance(element, zeep.xsd.Element):
+                continue  # `xsd:any` etc. isn't used by NetSuite
+            is_list = element.accepts_multiple
+            if (
+                name == "_value_1"
+                and not is_list
+                and isinstance(element.type, zeep.xsd.AnySimpleType)
+            ):
+                self.content = _simple_converter(element.type)
+            else:
+                self.children[_localname(element.qname.text)] = (
+                    name,
+                    element.type,
+                    is_list,
+                )
+            self.template[name] = None
+            if is_list:
+                self.list_keys.append(name)
+
+        for name, attribute in xsd_type.attributes:
+            if attribute.type is None:
+                continue
+            self.attributes[name] = (name, _simple_converter(attribute.type))
+            self.template[name] = None
+
+
+def _simple_converter(xsd_type: Any) -> Callable[[str], Any]:
+    if isinstance(xsd_type, zeep.xsd.String):
+        return _passthrough
+
+    def convert(value: str) -> Any:
+        try:
+            return xsd_type.pythonvalue(value)
+        except (TypeError, ValueError):
+            logger.exception(f"Error during xml -> python translation of {value!r}")
+            return None
+
+    return convert
+
+
+class XmlConverter:
+    """
+    Convert NetSuite SOAP responses straight from XML into built-in python
+    data structures, skipping zeep's object graph
+
+    The result has the same shape as `helpers.to_builtin` gives for the
+    equivalent zeep object. Type information is looked up in the zeep schema
+    once per type and then cached, so text is converted to `int`, `bool`,
+    `datetime` etc. just like zeep does.
+    """
+
+    def __init__(self, types: Any) -> None:
+        self._types = types
+        self._plans: Dict[int, _TypePlan] = {}
+        self._simple_converters: Dict[int, Callable] = {}
+        self._xsi_types: Dict[Tuple[Optional[str], str], Any] = {}
+        # lxml parsers can't be shared between threads, and responses may be
+        # parsed in an executor
+        self._local = threading.local()
+
+    @property
+    def _parser(self) -> zeep.etree.XMLParser:
+        try:
+            return self._local.parser
+        except AttributeError:
+            parser = self._local.parser = zeep.etree.XMLParser(
+                resolve_entities=False, no_network=True, huge_tree=True
+            )
+            return parser
+
+    def parse(self, content: bytes) -> zeep.etree._Element:
+        return zeep.etree.fromstring(content, parser=self._parser)
+
+    def is_fault(self, envelope: zeep.etree._Element) -> bool:
+        return (
+            envelope.find(f"{{{SOAP_ENV_NS}}}Body/{{{SOAP_ENV_NS}}}Fault") is not None
+        )
+
+    def envelope_to_builtin(self, envelope: zeep.etree._Element) -> Dict[str, Any]:
+        """
+        Convert a parsed SOAP response envelope
+
+        Returns a dictionary with `header` and `body` keys, mirroring the
+        response object returned by zeep.
+        """
+        header = envelope.find(f"{{{SOAP_ENV_NS}}}Header")
+        body = envelope.find(f"{{{SOAP_ENV_NS}}}Body")
+        if body is not None and len(body) == 1:
+            converted_body = self.element_to_builtin(body[0])
+        else:
+            converted_body = self._convert_children(body)
+        return {
+            "header": self._convert_children(header),
+            "body": converted_body,
+        }
+
+    def element_to_builtin(
+        self, element: zeep.etree._Element, xsd_type: Any = None
+    ) -> Any:
+        """
+        Convert a single XML element
+
+        If `xsd_type` isn't given it's looked up from the global element
+        declaration matching the element's tag, or from its `xsi:type`.
+        """
+        if xsd_type is None:
+            xsd_type = self._element_type(element.tag)
+        return self._convert(element, xsd_type)
+
+    def _convert_children(self, element: Optional[zeep.etree._Element]) -> Any:
+        if element is None:
+            return None
+        return {
+            _localname(child.tag): self.element_to_builtin(child)
+            for child in element
+            if isinstance(child.tag, str)
+        }
+
+    def _element_type(self, tag: str) -> Any:
+        try:
+            return self._types.get_element(tag).type
+        except (ValueError, zeep.exceptions.LookupError):
+            return None
+
+    def _resolve_xsi_type(self, element: zeep.etree._Element, value: str) -> Any:
+        prefix, _, name = value.rpartition(":")
+        namespace = element.nsmap.get(prefix or None)
+        key = (namespace, name)
+        try:
+            return self._xsi_types[key]
+        except KeyError:
+            pass
+        try:
+            xsd_type = self._types.get_type(f"{{{namespace}}}{name}")
+        except (ValueError, zeep.exceptions.LookupError):
+            xsd_type = None
+        self._xsi_types[key] = xsd_type
+        return xsd_type
+
+    # NOTE: zeep types aren't hashable, but they live as long as the schema
+    #       (which we keep a reference to), so their ids are stable keys
+    def _plan(self, xsd_type: Any) -> _TypePlan:
+        try:
+            return self._plans[id(xsd_type)]
+        except KeyError:
+            plan = self._plans[id(xsd_type)] = _TypePlan(xsd_type)
+            return plan
+
+    def _get_simple_converter(self, xsd_type: Any) -> Callable:
+        try:
+            return self._simple_converters[id(xsd_type)]
+        except KeyError:
+            converter = _simple_converter(xsd_type)
+            self._simple_converters[id(xsd_type)] = converter
+            return converter
+
+    def _convert(self, element: zeep.etree._Element, xsd_type: Any) -> Any:
+        attrib = element.attrib
+        if attrib:
+            if attrib.get(XSI_NIL) in ("true", "1"):
+                return None
+            xsi_type = attrib.get(XSI_TYPE)
+            if xsi_type is not None:
+                xsd_type = self._resolve_xsi_type(element, xsi_type) or xsd_type
+
+        if xsd_type is None:
+            return self._convert_untyped(element)
+
+        if isinstance(xsd_type, zeep.xsd.AnySimpleType):
+            text = element.text
+            return None if text is None else self._get_simple_converter(xsd_type)(text)
+
+        plan = self._plan(xsd_type)
+        result = dict(plan.template)
+        for key in plan.list_keys:
+            result[key] = []
+
+        if attrib:
+            attributes = plan.attributes
+            for name, value in attrib.items():
+                try:
+                    key, converter = attributes[name]
+                except KeyError:
+                    continue
+                result[key] = converter(value)
+
+        if plan.content is not None:
+            text = element.text
+            result["_value_1"] = None if text is None else plan.content(text)
+            return result
+
+        children = plan.children
+        for child in element:
+            tag = child.tag
+            if not isinstance(tag, str):
+                continue  # Comments and processing instructions
+            try:
+                key, child_type, is_list = children[_localname(tag)]
+            except KeyError:
+                continue
+            value = self._convert(child, child_type)
+            if is_list:
+                result[key].append(value)
+            else:
+                result[key] = value
+
+        return result
+
+    def _convert_untyped(self, element: zeep.etree._Element) -> Any:
+        if len(element) == 0 and not element.attrib:
+            return element.text
+        result: Dict[str, Any] = {
+            name: value
+            for name, value in element.attrib.items()
+            if not name.startswith(f"{{{XSI_NS}}}")
+        }
+        for child in element:
+            if isinstance(child.tag, str):
+                result[_localname(child.tag)] = self._convert_untyped(child)
+        return result
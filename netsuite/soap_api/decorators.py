@@ -2,8 +2,7 @@ from functools import wraps
 from typing import Any, Callable, Optional
 
 from .. import constants
-from . import zeep
-from .exceptions import NetsuiteResponseError
+from . import helpers, zeep
 
 __all__ = ("WebServiceCall",)
 
@@ -32,41 +31,27 @@ def WebServiceCall(
 
     def decorator(fn):
         @wraps(fn)
-        def wrapper(self, *args, **kw):
-            response = fn(self, *args, **kw)
-            if not isinstance(response, zeep.xsd.ComplexType):
-                return response
+        async def wrapper(self, *args, **kw):
+            response = await fn(self, *args, **kw)
+            if not isinstance(response, (zeep.xsd.CompoundValue, dict)):
+                return self._finalize_response(response)
 
             if path is not None:
                 for part in path.split("."):
                     try:
-                        response = getattr(response, part)
-                    except AttributeError:
+                        response = response[part]
+                    except (KeyError, TypeError):
                         if default is constants.NOT_SET:
                             raise
                         else:
-                            return default
+                            return self._finalize_response(default)
 
-            try:
-                response_status = response["status"]
-            except TypeError:
-                response_status = None
-                for record in response:
-                    # NOTE: Status is set on each returned record for lists,
-                    #       really strange...
-                    response_status = record["status"]
-                    break
-
-            is_success = response_status["isSuccess"]
-
-            if not is_success:
-                response_detail = response_status["statusDetail"]
-                raise NetsuiteResponseError(response_detail)
+            helpers.raise_for_status(response)
 
             if extract is not None:
                 response = extract(response)
 
-            return response
+            return self._finalize_response(response)
 
         return wrapper
 
@@ -0,0 +1,109 @@
+import base64
+import binascii
+import pathlib
+import re
+from typing import IO, AsyncIterator
+
+__all__ = ("FileContentExtractor",)
+
+# Bytes of a file read at a time, a multiple of 3 so that each chunk is
+# encoded to base64 without padding
+DEFAULT_CHUNK_SIZE = 3 * 64 * 1024
+
+_CONTENT_START_RE = re.compile(rb"<(?:[A-Za-z_][\w.-]*:)?content(?=[\s/>])[^>]*>")
+_CONTENT_END_RE = re.compile(rb"</(?:[A-Za-z_][\w.-]*:)?content\s*>")
+_WHITESPACE = b" \t\r\n"
+
+
+def encoded_size(size: int) -> int:
+    """Length of `size` bytes encoded to base64"""
+    return 4 * ((size + 2) // 3)
+
+
+async def iter_base64(
+    path: pathlib.Path, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """Yield the content of a file encoded to base64, a chunk at a time"""
+    if chunk_size % 3:
+        raise ValueError("`chunk_size` must be a multiple of 3")
+    with path.open("rb") as fp:
+        while True:
+            chunk = fp.read(chunk_size)
+            if not chunk:
+                return
+            yield base64.b64encode(chunk)
+
+
+class FileContentExtractor:
+    """
+    Incrementally extract the content of a `File` record from a SOAP response
+
+    Feed it the response body in chunks. The base64 `content` element is
+    decoded as it comes and written to `fp`, and the rest of the response is
+    kept, to be parsed once complete without the content. Memory use is thus
+    bounded by the chunk size rather than the size of the file.
+
+    Args:
+        fp:
+            Binary file to write the content to
+    """
+
+    def __init__(self, fp: IO[bytes]) -> None:
+        self._fp = fp
+        self._head = bytearray()
+        self._tail = bytearray()
+        # Base64 characters not yet decoded, less than a group of 4
+        self._pending = b""
+        self._state = "head"
+        self.size = 0
+        self.found = False
+
+    def feed(self, data: bytes) -> None:
+        if self._state == "head":
+            self._head += data
+            match = _CONTENT_START_RE.search(self._head)
+            if match is None:
+                return
+            self.found = True
+            data = bytes(self._head[match.end() :])
+            del self._head[match.start() :]
+            self._state = "tail" if match[0].endswith(b"/>") else "content"
+            if self._state == "tail":
+                self._tail += data
+                return
+
+        if self._state == "content":
+            end = data.find(b"<")
+            if end == -1:
+                self._write(data)
+                return
+            self._write(data[:end])
+            if self._pending:
+                raise ValueError("Invalid base64 file content")
+            self._state = "tail"
+            data = data[end:]
+
+        self._tail += data
+
+    def close(self) -> bytes:
+        """Return the response without the content element"""
+        if self._state == "content":
+            raise ValueError("Truncated file content")
+        tail = bytes(self._tail)
+        match = _CONTENT_END_RE.match(tail)
+        if match is not None:
+            tail = tail[match.end() :]
+        return bytes(self._head) + tail
+
+    def _write(self, text: bytes) -> None:
+        text = self._pending + text.translate(None, _WHITESPACE)
+        size = len(text) - len(text) % 4
+        self._pending = text[size:]
+        if not size:
+            return
+        try:
+            decoded = base64.b64decode(text[:size], validate=True)
+        except binascii.Error as ex:
+            raise ValueError(f"Invalid base64 file content: {ex}") from None
+        self._fp.write(decoded)
+        self.size += len(decoded)
@@ -1,4 +1,11 @@
+from itertools import islice
+from typing import Iterable, Iterator, List, TypeVar
+
+from ..circuit_breaker import is_outage_error
 from . import zeep
+from .exceptions import NetsuiteResponseError
+
+T = TypeVar("T")
 
 
 def to_builtin(obj, *, target_cls=dict):
@@ -13,3 +20,90 @@ def to_builtin(obj, *, target_cls=dict):
             class as a default.
     """
     return zeep.helpers.serialize_object(obj, target_cls=target_cls)
+
+
+def chunked(iterable: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Split `iterable` into lists of at most `size` items"""
+    if size < 1:
+        raise ValueError("`size` must be at least 1")
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def raise_for_status(response) -> None:
+    """Raise `NetsuiteResponseError` if response (or any record in it) failed"""
+    try:
+        statuses = [response["status"]]
+    except TypeError:
+        # NOTE: Status is set on each returned record for lists,
+        #       really strange...
+        statuses = [record["status"] for record in response]
+
+    failed = [status for status in statuses if not status["isSuccess"]]
+    if failed:
+        raise NetsuiteResponseError(
+            [detail for status in failed for detail in status["statusDetail"] or ()]
+        )
+
+
+# Faults meaning that the token credential was rejected, or is already making
+# as many requests as its concurrency allocation allows
+CREDENTIAL_FAULTS = frozenset(
+    (
+        "invalidCredentialsFault",
+        "invalidSessionFault",
+        "exceededConcurrentRequestLimitFault",
+        "exceededRequestLimitFault",
+    )
+)
+
+
+def is_credential_failure(exc: BaseException) -> bool:
+    """Whether a request failed because of the token credential it used"""
+    if isinstance(exc, zeep.exceptions.Fault):
+        detail = exc.detail
+        return detail is not None and any(
+            isinstance(child.tag, str)
+            and child.tag.rpartition("}")[2] in CREDENTIAL_FAULTS
+            for child in detail
+        )
+    if isinstance(exc, zeep.exceptions.TransportError):
+        return exc.status_code in (401, 429)
+    return False
+
+
+def is_credential_failure_response(response) -> bool:
+    """
+    Whether an HTTP response means the token credential it used was rejected
+    or overused, before the response is parsed
+    """
+    if response.status_code in (401, 429):
+        return True
+    if response.status_code != 500:
+        return False
+    # Faults are only told apart by the name of their detail element
+    content = response.content
+    return any(fault.encode() in content for fault in CREDENTIAL_FAULTS)
+
+
+def is_outage(exc: BaseException) -> bool:
+    """Whether a request failed because NetSuite seems to be down"""
+    if isinstance(exc, zeep.exceptions.TransportError):
+        return exc.status_code >= 500
+    return is_outage_error(exc)
+
+
+def is_outage_response(response) -> bool:
+    """
+    Whether an HTTP response means NetSuite seems to be down
+
+    SOAP faults come with a `500` status too, but those are errors of the
+    request rather than of NetSuite, and are XML unlike error pages.
+    """
+    return response.status_code >= 500 and "xml" not in response.headers.get(
+        "Content-Type", ""
+    )
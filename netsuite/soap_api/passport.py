@@ -1,18 +1,31 @@
 import base64
+import hashlib
 import hmac
-import random
-from datetime import datetime
-from typing import Dict, TypeVar
+import secrets
+import time
+import weakref
+from functools import cached_property
+from typing import Any, Dict, Optional, Tuple, TypeVar
 
 from ..config import Config, TokenAuth
+from . import zeep
 
 NetSuite = TypeVar("NetSuite")
 
+# Passports are cached per `NetSuiteSoapApi` instance (and config and token
+# credential) so that signing keys and zeep types are only prepared once
+_passports: "weakref.WeakKeyDictionary[Any, Tuple[Config, Dict[int, Passport]]]" = (
+    weakref.WeakKeyDictionary()
+)
+
 
 class Passport:
     def get_element(self) -> str:
         raise NotImplementedError
 
+    def get_xml_element(self) -> zeep.etree._Element:
+        raise NotImplementedError
+
 
 class TokenPassport(Passport):
     def __init__(
@@ -31,6 +44,15 @@ class TokenPassport(Passport):
         self.consumer_secret = consumer_secret
         self.token_id = token_id
         self.token_secret = token_secret
+        # The static parts of the signature are prepared once. Copying the
+        # keyed HMAC object is cheaper than deriving the key pads every time.
+        self._message_prefix = "&".join((account, consumer_key, token_id, "")).encode(
+            "utf-8"
+        )
+        self._hmac = hmac.new(
+            key=self._get_signature_key().encode("utf-8"),
+            digestmod=hashlib.sha256,
+        )
 
     def _generate_timestamp(self) -> str:
         """Generate timestamp
@@ -38,11 +60,11 @@ class TokenPassport(Passport):
         Returns:
             str: A seconds precision timestamp
         """
-        return str(int(datetime.now().timestamp()))
+        return str(int(time.time()))
 
     def _generate_nonce(self, length: int = 20) -> str:
-        """Generate pseudorandom number"""
-        return "".join([str(random.randint(0, 9)) for i in range(length)])
+        """Generate cryptographically secure random alphanumeric string"""
+        return secrets.token_hex((length + 1) // 2)[:length]
 
     def _get_signature_message(self, nonce: str, timestamp: str) -> str:
         return "&".join(
@@ -59,15 +81,38 @@ class TokenPassport(Passport):
         return "&".join((self.consumer_secret, self.token_secret))
 
     def _get_signature_value(self, nonce: str, timestamp: str) -> str:
-        key = self._get_signature_key()
-        message = self._get_signature_message(nonce, timestamp)
-        hashed = hmac.new(
-            key=key.encode("utf-8"), msg=message.encode("utf-8"), digestmod="sha256"
-        ).digest()
-        return base64.b64encode(hashed).decode()
+        hashed = self._hmac.copy()
+        hashed.update(self._message_prefix)
+        hashed.update(f"{nonce}&{timestamp}".encode("utf-8"))
+        return base64.b64encode(hashed.digest()).decode()
+
+    @cached_property
+    def _passport_type(self):
+        return self.ns.Core.TokenPassport  # type: ignore[attr-defined]
+
+    @cached_property
+    def _signature_type(self):
+        return self.ns.Core.TokenPassportSignature  # type: ignore[attr-defined]
+
+    @cached_property
+    def _xml_nsmap(self) -> Dict[str, str]:
+        return {
+            "platformMsgs": self.ns._get_namespace("messages", "platform"),  # type: ignore[attr-defined]
+            "platformCore": self.ns._get_namespace("core", "platform"),  # type: ignore[attr-defined]
+        }
+
+    @cached_property
+    def _xml_tags(self) -> Dict[str, str]:
+        messages_ns = self._xml_nsmap["platformMsgs"]
+        core_ns = self._xml_nsmap["platformCore"]
+        tags = {"tokenPassport": f"{{{messages_ns}}}tokenPassport"}
+        for name in ("account", "consumerKey", "token", "nonce", "timestamp"):
+            tags[name] = f"{{{core_ns}}}{name}"
+        tags["signature"] = f"{{{core_ns}}}signature"
+        return tags
 
     def _get_signature(self, nonce: str, timestamp: str):
-        return self.ns.Core.TokenPassportSignature(  # type: ignore[attr-defined]
+        return self._signature_type(
             self._get_signature_value(nonce, timestamp),
             algorithm="HMAC-SHA256",
         )
@@ -76,7 +121,7 @@ class TokenPassport(Passport):
         nonce = self._generate_nonce()
         timestamp = self._generate_timestamp()
         signature = self._get_signature(nonce, timestamp)
-        return self.ns.Core.TokenPassport(
+        return self._passport_type(
             account=self.account,
             consumerKey=self.consumer_key,
             token=self.token_id,
@@ -85,9 +130,56 @@ class TokenPassport(Passport):
             signature=signature,
         )
 
+    def get_xml_element(self) -> zeep.etree._Element:
+        """
+        Build the `tokenPassport` SOAP header directly as an XML element
+
+        Much cheaper than `get_element`, as zeep doesn't have to construct
+        and later render its own value objects.
+        """
+        tags = self._xml_tags
+        nonce = self._generate_nonce()
+        timestamp = self._generate_timestamp()
+        element = zeep.etree.Element(tags["tokenPassport"], nsmap=self._xml_nsmap)
+        for name, value in (
+            ("account", self.account),
+            ("consumerKey", self.consumer_key),
+            ("token", self.token_id),
+            ("nonce", nonce),
+            ("timestamp", timestamp),
+        ):
+            zeep.etree.SubElement(element, tags[name]).text = value
+        signature = zeep.etree.SubElement(
+            element, tags["signature"], algorithm="HMAC-SHA256"
+        )
+        signature.text = self._get_signature_value(nonce, timestamp)
+        return element
+
+
+def get_passport(
+    ns: NetSuite, config: Config, auth: Optional[TokenAuth] = None
+) -> Passport:
+    """
+    Get the (cached) passport builder for the given client and config
+
+    `auth` picks one of the credentials of a config with several token
+    credentials. By default `config.auth` is used.
+    """
+    if auth is None:
+        auth = config.auth  # type: ignore[assignment]
+    try:
+        cached_config, passports = _passports[ns]
+    except KeyError:
+        cached_config = None
+    if cached_config is not config:
+        passports = {}
+        _passports[ns] = (config, passports)
+    else:
+        try:
+            return passports[id(auth)]
+        except KeyError:
+            pass
 
-def make(ns: NetSuite, config: Config) -> Dict:
-    auth = config.auth
     if isinstance(auth, TokenAuth):
         token_passport = TokenPassport(
             ns,
@@ -97,6 +189,13 @@ def make(ns: NetSuite, config: Config) -> Dict:
             token_id=auth.token_id,
             token_secret=auth.token_secret,
         )
-        return {"tokenPassport": token_passport.get_element()}
     else:
         raise NotImplementedError(auth.__class__)
+
+    # NOTE: The config keeps `auth` alive, so its id is a stable key
+    passports[id(auth)] = token_passport
+    return token_passport
+
+
+def make(ns: NetSuite, config: Config, auth: Optional[TokenAuth] = None) -> Dict:
+    return {"tokenPassport": get_passport(ns, config, auth).get_element()}
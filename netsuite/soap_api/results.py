@@ -0,0 +1,117 @@
+from typing import Any, Iterator, List, Optional, Sequence, overload
+
+from .exceptions import NetsuiteResponseError
+
+__all__ = ("WriteResult", "WriteListResult")
+
+
+class WriteResult:
+    """Outcome of writing a single record in a list operation"""
+
+    def __init__(
+        self,
+        record: Any,
+        *,
+        is_success: bool,
+        status_details: Sequence[Any] = (),
+        base_ref: Any = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        self.record = record
+        self.is_success = is_success
+        self.status_details = list(status_details)
+        self.base_ref = base_ref
+        # The error of the request, when the record's outcome isn't known
+        self.error = error
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} is_success={self.is_success} "
+            f"base_ref={self.base_ref!r} status_details={self.status_details!r}>"
+        )
+
+    @classmethod
+    def from_response(cls, record: Any, write_response: Any) -> "WriteResult":
+        """Build result from a `WriteResponse` returned by NetSuite"""
+        status = write_response["status"]
+        return cls(
+            record,
+            is_success=bool(status["isSuccess"]),
+            status_details=status["statusDetail"] or (),
+            base_ref=write_response["baseRef"],
+        )
+
+    @classmethod
+    def from_error(cls, record: Any, error: Exception) -> "WriteResult":
+        """Build result for a record whose request failed as a whole"""
+        if isinstance(error, NetsuiteResponseError) and error.args:
+            status_details = error.args[0] or ()
+        else:
+            status_details = [{"code": type(error).__name__, "message": str(error)}]
+        return cls(record, is_success=False, status_details=status_details, error=error)
+
+    @property
+    def internal_id(self) -> Optional[str]:
+        if self.base_ref is None:
+            return None
+        return self.base_ref["internalId"]
+
+    def raise_for_status(self) -> None:
+        if not self.is_success:
+            raise NetsuiteResponseError(self.status_details)
+
+
+class WriteListResult(Sequence[WriteResult]):
+    """Per-record outcome of a (possibly chunked) list write operation
+
+    Results are kept in the same order as the records that were passed in.
+    """
+
+    def __init__(self, results: Sequence[WriteResult]) -> None:
+        self.results: List[WriteResult] = list(results)
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} total={len(self)} "
+            f"failed={len(self.failed)}>"
+        )
+
+    @overload
+    def __getitem__(self, index: int) -> WriteResult: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[WriteResult]: ...
+
+    def __getitem__(self, index):
+        return self.results[index]
+
+    def __iter__(self) -> Iterator[WriteResult]:
+        return iter(self.results)
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    @property
+    def is_success(self) -> bool:
+        return all(result.is_success for result in self.results)
+
+    @property
+    def succeeded(self) -> List[WriteResult]:
+        return [result for result in self.results if result.is_success]
+
+    @property
+    def failed(self) -> List[WriteResult]:
+        return [result for result in self.results if not result.is_success]
+
+    @property
+    def base_refs(self) -> List[Any]:
+        """Record refs of successfully written records"""
+        return [result.base_ref for result in self.succeeded]
+
+    def raise_for_status(self) -> None:
+        """Raise `NetsuiteResponseError` if any of the records failed"""
+        failed = self.failed
+        if failed:
+            raise NetsuiteResponseError(
+                [detail for result in failed for detail in result.status_details]
+            )
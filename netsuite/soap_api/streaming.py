@@ -0,0 +1,95 @@
+from typing import Any, Callable, Dict, List, Optional
+
+from . import zeep
+from .exceptions import NetsuiteResponseError
+
+__all__ = ("RecordStreamParser",)
+
+RESULT_TAGS = frozenset(("searchResult", "getAllResult"))
+# Tags of the items yielded, by the tag of their list
+ITEM_TAGS = {"recordList": "record", "searchRowList": "searchRow"}
+RESULT_FIELDS = frozenset(
+    ("totalRecords", "pageSize", "totalPages", "pageIndex", "searchId")
+)
+
+
+def _localname(tag: str) -> str:
+    return tag.rpartition("}")[2]
+
+
+class RecordStreamParser:
+    """
+    Incrementally parse a search or getAll SOAP response
+
+    Feed it the response body in chunks, and get back the records that were
+    completed by each chunk. Parsed record elements are discarded right away,
+    so memory use is bounded by the size of a single record rather than the
+    whole response. The rows of searches returning columns
+    (`returnSearchColumns`) are yielded like records.
+
+    Args:
+        convert_record:
+            Called with each `record` or `searchRow` XML element, returning
+            what to yield
+        convert_status:
+            Called with the result's `status` element, returning it as a dict
+    """
+
+    def __init__(
+        self,
+        convert_record: Callable[[zeep.etree._Element], Any],
+        convert_status: Callable[[zeep.etree._Element], Dict[str, Any]],
+    ) -> None:
+        self._convert_record = convert_record
+        self._convert_status = convert_status
+        self._parser = zeep.etree.XMLPullParser(
+            events=("end",),
+            huge_tree=True,
+            resolve_entities=False,
+            no_network=True,
+        )
+        self.fields: Dict[str, Optional[str]] = {}
+        self.status: Optional[Dict[str, Any]] = None
+        self.root: Optional[zeep.etree._Element] = None
+        self.is_fault = False
+
+    def feed(self, data: bytes) -> List[Any]:
+        self._parser.feed(data)
+        return self._read_events()
+
+    def close(self) -> List[Any]:
+        self.root = self._parser.close()
+        return self._read_events()
+
+    @property
+    def total_pages(self) -> int:
+        return int(self.fields.get("totalPages") or 1)
+
+    @property
+    def search_id(self) -> Optional[str]:
+        return self.fields.get("searchId")
+
+    def _read_events(self) -> List[Any]:
+        records = []
+        for _, element in self._parser.read_events():
+            if not isinstance(element.tag, str):
+                continue
+            name = _localname(element.tag)
+            parent = element.getparent()
+            parent_name = _localname(parent.tag) if parent is not None else None
+
+            if parent_name in ITEM_TAGS and name == ITEM_TAGS[parent_name]:
+                records.append(self._convert_record(element))
+                element.clear()
+                while element.getprevious() is not None:
+                    del parent[0]
+            elif parent_name in RESULT_TAGS:
+                if name == "status":
+                    self.status = self._convert_status(element)
+                    if not self.status["isSuccess"]:
+                        raise NetsuiteResponseError(self.status["statusDetail"])
+                elif name in RESULT_FIELDS:
+                    self.fields[name] = element.text
+            elif name == "Fault":
+                self.is_fault = True
+        return records
@@ -1,5 +1,7 @@
 import urllib.parse
+from contextlib import asynccontextmanager
 
+from ..deadline import current_deadline
 from . import zeep
 
 __all__ = ("AsyncNetSuiteTransport",)
@@ -18,13 +20,21 @@ class AsyncNetSuiteTransport(zeep.transports.AsyncTransport):
     rather than the dynamic subscriber domain
 
     Wrap the zeep transports service with our address modifications
+
+    An HTTP `client` passed in is shared with others, so it's left open when
+    the transport is closed.
     """
 
     def __init__(self, wsdl_url, *args, **kwargs):
         parsed = urllib.parse.urlparse(wsdl_url)
         self._netsuite_base_url = f"{parsed.scheme}://{parsed.netloc}"
+        self._owns_client = kwargs.get("client") is None
         super().__init__(*args, **kwargs)
 
+    async def aclose(self):
+        if self._owns_client:
+            await super().aclose()
+
     def _fix_address(self, address):
         """Munge the address to the company-specific domain, not the default"""
         idx = address.index("/", 8)
@@ -35,4 +45,30 @@ class AsyncNetSuiteTransport(zeep.transports.AsyncTransport):
         return await super().get(self._fix_address(address), params, headers)
 
     async def post(self, address, message, headers):
-        return await super().post(self._fix_address(address), message, headers)
+        if current_deadline() is None:
+            return await super().post(self._fix_address(address), message, headers)
+        return await self.client.post(
+            self._fix_address(address),
+            content=message,
+            headers=headers,
+            timeout=self._timeout(),
+        )
+
+    @asynccontextmanager
+    async def post_stream(self, address, message, headers):
+        """POST `message`, yielding the response before its body is read"""
+        async with self.client.stream(
+            "POST",
+            self._fix_address(address),
+            content=message,
+            headers=headers,
+            timeout=self._timeout(),
+        ) as response:
+            yield response
+
+    def _timeout(self):
+        """The client's timeouts, capped by the time left of the deadline"""
+        current = current_deadline()
+        if current is None:
+            return self.client.timeout
+        return current.timeout(self.client.timeout)
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple
+
+from .. import constants
+from ..batching import Batcher
+from .results import WriteResult
+
+if TYPE_CHECKING:
+    from .client import NetSuiteSoapApi
+
+logger = logging.getLogger(__name__)
+
+__all__ = ("WriteBuffer",)
+
+_Pending = List[Tuple[Any, "asyncio.Future[WriteResult]"]]
+
+
+class WriteBuffer(Batcher[str, Any, WriteResult]):
+    """
+    Gather single record writes and send them as list operations
+
+    Records passed to `add`, `update` and `upsert` are buffered per
+    operation, and sent as one `addList`, `updateList` or `upsertList`
+    request once `max_batch_size` of them are buffered, or `linger` seconds
+    after the first of them. Each caller gets the `WriteResult` of its own
+    record, so a failed record doesn't fail the others of its batch.
+
+    Once `max_pending` records are buffered or being sent, callers wait for
+    a batch to finish before their record is buffered. Batches are sent
+    concurrently, so two writes of the same record may be applied in any
+    order.
+
+    Use as an async context manager, or call `aclose`, so that buffered
+    records are sent before shutting down:
+
+    >>> async with WriteBuffer(ns.soap_api) as buffer:
+    ...     result = await buffer.upsert(record)
+
+    Args:
+        soap_api:
+            Client to send the batches with
+        max_batch_size:
+            Maximum number of records per request
+        linger:
+            Seconds to wait for more records before sending a batch
+        max_pending:
+            Maximum number of records buffered or being sent. Defaults to
+            ten batches.
+    """
+
+    def __init__(
+        self,
+        soap_api: "NetSuiteSoapApi",
+        *,
+        max_batch_size: int = constants.SOAP_WRITE_LIST_LIMIT,
+        linger: float = 0.05,
+        max_pending: Optional[int] = None,
+    ) -> None:
+        if not 0 < max_batch_size <= constants.SOAP_WRITE_LIST_LIMIT:
+            raise ValueError(
+                "`max_batch_size` must be between 1 and "
+                f"{constants.SOAP_WRITE_LIST_LIMIT}"
+            )
+        super().__init__(
+            max_batch_size=max_batch_size,
+            max_pending=10 * max_batch_size if max_pending is None else max_pending,
+        )
+        self._soap_api = soap_api
+        self.linger = linger
+        self.batches = 0
+        self.records = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} batches={self.batches} "
+            f"records={self.records} buffered={self._buffered}>"
+        )
+
+    @property
+    def _delay(self) -> float:
+        return self.linger
+
+    async def add(self, record: Any) -> WriteResult:
+        """Insert a record, as part of an `addList` request"""
+        return await self._submit("addList", record)
+
+    async def update(self, record: Any) -> WriteResult:
+        """Update a record, as part of an `updateList` request"""
+        return await self._submit("updateList", record)
+
+    async def upsert(self, record: Any) -> WriteResult:
+        """Upsert a record, as part of an `upsertList` request"""
+        return await self._submit("upsertList", record)
+
+    async def _send(self, service_name: str, pending: _Pending) -> None:
+        self.batches += 1
+        self.records += len(pending)
+        records = [record for record, _ in pending]
+        try:
+            results = await getattr(self._soap_api, service_name)(
+                records, chunk_size=self.max_batch_size
+            )
+        except Exception:
+            logger.debug(f"Buffered {service_name} of {len(records)} records failed")
+            raise
+        for (_, future), result in zip(pending, results):
+            if future.done():
+                continue
+            if result.error is not None:
+                # The request of its chunk failed as a whole
+                future.set_exception(result.error)
+            else:
+                future.set_result(result)
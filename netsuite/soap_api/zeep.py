@@ -8,8 +8,9 @@ else:
 
 if ZEEP_INSTALLED:
     import requests
+    from lxml import etree
     from zeep import *  # noqa
-    from zeep import cache, client, helpers, transports, xsd
+    from zeep import cache, client, exceptions, helpers, transports, wsdl, xsd
 else:
 
     class _Transport: ...
@@ -43,12 +44,40 @@ else:
         Transport = _Transport
         AsyncTransport = _Transport
 
+    class _Element: ...
+
+    class _AnySimpleType: ...
+
+    class _String(_AnySimpleType): ...
+
+    class _LookupError(Exception): ...
+
+    class _Fault(Exception): ...
+
+    class _TransportError(Exception): ...
+
     class xsd:  # type: ignore[no-redef]
         CompoundValue = _CompoundValue
         valueobjects = _valueobjects
+        Element = _Element
+        AnySimpleType = _AnySimpleType
+        String = _String
+
+    class exceptions:  # type: ignore[no-redef]
+        LookupError = _LookupError
+        Fault = _Fault
+        TransportError = _TransportError
 
     class helpers:  # type: ignore[no-redef]
         serialize_object = None
 
+    class wsdl:  # type: ignore[no-redef]
+        Document = None
+
     class requests:  # type: ignore[no-redef]
         Session = None
+
+    class etree:  # type: ignore[no-redef]
+        _Element = None
+        ElementBase = None
+        XMLParser = None
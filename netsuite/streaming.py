@@ -0,0 +1,205 @@
+import codecs
+import json
+import re
+from typing import Any, List, Optional
+
+__all__ = ("JsonArrayStreamParser",)
+
+# Characters which change the parser's state, outside and inside of strings
+_STRUCTURAL_RE = re.compile(r'[\[\]{}",:]')
+_STRING_RE = re.compile(r'["\\]')
+_WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+_NUMBER_TAIL_RE = re.compile(r"[0-9.eE+-]*")
+
+
+class JsonArrayStreamParser:
+    """
+    Incrementally parse the items of a JSON array
+
+    Feed it a response body in chunks, and get back the items that were
+    completed by each chunk. Only the items of the last chunk are buffered,
+    so memory use is bounded by the chunk size and the size of a single item
+    rather than the whole response.
+
+    Items are decoded with the standard library's C accelerated decoder,
+    since the other JSON backends can't find where an item ends.
+
+    Args:
+        key:
+            If given, the body is an object and the items of the array at
+            this key of it are parsed, e.g. `"items"` for REST API
+            collections. Otherwise the body itself is an array.
+    """
+
+    def __init__(self, key: Optional[str] = None) -> None:
+        self.key = key
+        self.items_parsed = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._raw_decode = json.JSONDecoder().raw_decode
+        self._buffer = ""
+        # Scanning position in the buffer
+        self._pos = 0
+        # Nesting depth of arrays and objects, before the items are reached
+        self._depth = 0
+        self._in_string = False
+        self._in_target = False
+        self._found = False
+        self._done = False
+        # Whether an item was parsed since the last separator
+        self._after_item = False
+        # Items are only decoded again once this many characters are
+        # buffered, so an item spanning many chunks doesn't take quadratic
+        # time
+        self._retry_size = 0
+        # State of the keys of the top-level object, when parsing by key
+        self._key_start: Optional[int] = None
+        self._expect_key = False
+        self._key_matched = False
+
+    @property
+    def is_done(self) -> bool:
+        """Whether the end of the array was reached"""
+        return self._done
+
+    def feed(self, data: bytes) -> List[Any]:
+        if self._done:
+            return []
+        self._buffer += self._decoder.decode(data)
+        if not self._in_target:
+            self._scan()
+        items = self._parse_items() if self._in_target else []
+        self._compact()
+        return items
+
+    def close(self) -> List[Any]:
+        items = []
+        if self._in_target:
+            self._buffer += self._decoder.decode(b"", final=True)
+            self._retry_size = 0
+            items = self._parse_items(final=True)
+        if not self._done:
+            raise ValueError("Truncated JSON response")
+        if not self._found:
+            raise ValueError(f"No array at key {self.key!r} of the response")
+        return items
+
+    def _scan(self) -> None:
+        """Scan the body up to the start of the array to parse"""
+        buffer = self._buffer
+        while not self._in_target and not self._done:
+            if self._in_string:
+                match = _STRING_RE.search(buffer, self._pos)
+                if match is None:
+                    self._pos = len(buffer)
+                    return
+                if match[0] == "\\":
+                    if match.end() >= len(buffer):
+                        # Scanned again with the character it escapes
+                        self._pos = match.start()
+                        return
+                    self._pos = match.end() + 1
+                    continue
+                self._pos = match.end()
+                self._in_string = False
+                if self._key_start is not None:
+                    key = json.loads(buffer[self._key_start : self._pos])
+                    self._key_matched = key == self.key
+                    self._key_start = None
+                continue
+
+            match = _STRUCTURAL_RE.search(buffer, self._pos)
+            if match is None:
+                self._pos = len(buffer)
+                return
+            self._pos = match.end()
+            char = match[0]
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect_key:
+                    self._key_start = match.start()
+            elif char in "[{":
+                self._open(char)
+            elif char in "]}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._done = True
+            elif char == "," and self._depth == 1:
+                self._expect_key = True
+                self._key_matched = False
+            elif char == ":" and self._depth == 1:
+                self._expect_key = False
+
+    def _open(self, char: str) -> None:
+        self._depth += 1
+        if self._depth == 1:
+            if self.key is None:
+                if char != "[":
+                    raise ValueError("The response isn't a JSON array")
+                self._in_target = self._found = True
+            elif char != "{":
+                raise ValueError("The response isn't a JSON object")
+            self._expect_key = True
+        elif self._depth == 2 and char == "[" and self._key_matched:
+            self._in_target = self._found = True
+
+    def _parse_items(self, final: bool = False) -> List[Any]:
+        items = []
+        buffer = self._buffer
+        while True:
+            start = _skip_whitespace(buffer, self._pos)
+            if start == len(buffer):
+                break
+            char = buffer[start]
+            if char == "]":
+                # The rest of the body isn't needed
+                self._pos = start + 1
+                self._in_target = False
+                self._done = True
+                break
+            if self._after_item:
+                if char != ",":
+                    raise ValueError(f"Expected ',' or ']' but got {char!r}")
+                self._pos = start + 1
+                self._after_item = False
+                continue
+
+            if len(buffer) - start < self._retry_size:
+                break
+            try:
+                item, end = self._raw_decode(buffer, start)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                self._retry_size = 2 * (len(buffer) - start)
+                break
+            if not final and _may_go_on(buffer, item, end):
+                break
+            items.append(item)
+            self.items_parsed += 1
+            self._retry_size = 0
+            self._pos = end
+            self._after_item = True
+        return items
+
+    def _compact(self) -> None:
+        """Drop the parsed part of the buffer"""
+        keep = self._pos if self._key_start is None else self._key_start
+        if keep:
+            self._buffer = self._buffer[keep:]
+            self._pos -= keep
+            if self._key_start is not None:
+                self._key_start -= keep
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    return _WHITESPACE_RE.match(text, pos).end()  # type: ignore[union-attr]
+
+
+def _may_go_on(text: str, item: Any, end: int) -> bool:
+    """Whether `item`, decoded up to `end`, might go on in the next chunk"""
+    if _skip_whitespace(text, end) == len(text):
+        return True
+    # A number split in the middle, e.g. "12" then ".5", or "1e" then "5"
+    if isinstance(item, bool) or not isinstance(item, (int, float)):
+        return False
+    return _NUMBER_TAIL_RE.match(text, end).end() == len(text)  # type: ignore[union-attr]
@@ -0,0 +1,219 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional
+
+import httpx
+
+from .client import NetSuite
+from .config import Config
+from .soap_api.async_jobs import AsyncJob
+
+__all__ = ("SyncNetSuite",)
+
+# Results which have async methods themselves, and so are wrapped as well
+WRAPPED_RESULTS = (AsyncJob,)
+
+
+class _BackgroundLoop:
+    """An event loop running forever in a daemon thread, started on first use"""
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._loop is not None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=loop.run_forever, name=self._name, daemon=True
+                )
+                self._thread.start()
+                self._loop = loop
+            return self._loop
+
+    def run(self, awaitable: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        loop = self.loop
+        if self._thread is threading.current_thread():
+            raise RuntimeError(
+                "Can't block on the background event loop from within itself"
+            )
+        # Context variables of the caller, like its `deadline`, apply to the
+        # call made on the loop
+        context = contextvars.copy_context()
+        future = asyncio.run_coroutine_threadsafe(_wrap(awaitable, context), loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def stop(self) -> None:
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or thread is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+async def _wrap(awaitable: Awaitable[Any], context: contextvars.Context) -> Any:
+    # Set in the task's own copy of the context
+    for var, value in context.items():
+        var.set(value)
+    return await awaitable
+
+
+class _SyncProxy:
+    """
+    Blocking view of an object with async methods
+
+    Coroutine methods are run on the background loop and their result
+    returned. Async generators become generators, fetching each item from
+    the loop. Everything else is passed through as is.
+    """
+
+    def __init__(self, runner: "SyncNetSuite", target: Any) -> None:
+        self._runner = runner
+        self._target = target
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self._target!r}>"
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if inspect.iscoroutinefunction(attr):
+            return self._wrap_coroutine_function(attr)
+        if inspect.isasyncgenfunction(attr):
+            return self._wrap_async_generator_function(attr)
+        return attr
+
+    def _wrap_coroutine_function(self, fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def wrapper(*args, **kw):
+            result = self._runner.run(fn(*args, **kw))
+            if isinstance(result, WRAPPED_RESULTS):
+                return _SyncProxy(self._runner, result)
+            return result
+
+        return wrapper
+
+    def _wrap_async_generator_function(
+        self, fn: Callable[..., AsyncIterator[Any]]
+    ) -> Callable[..., Iterator[Any]]:
+        @functools.wraps(fn)
+        def wrapper(*args, **kw):
+            return self._runner.iterate(fn(*args, **kw))
+
+        return wrapper
+
+
+class SyncNetSuite:
+    """
+    Blocking `NetSuite` client, for code which isn't async (e.g. Celery tasks)
+
+    All requests run on a single event loop in a background thread, so
+    connection pools, concurrency limits and caches are kept between calls,
+    unlike with `asyncio.run` per call. It can be used from many threads at
+    once; their requests are made concurrently on the background loop.
+
+    `rest_api`, `restlet` and `soap_api` have the same methods as their async
+    counterparts, but blocking:
+
+    >>> ns = SyncNetSuite(config)
+    >>> ns.rest_api.suiteql("SELECT id FROM customer")
+    >>> for record in ns.soap_api.stream_get_all("currency"):
+    ...     print(record)
+    >>> ns.close()
+
+    Args:
+        config:
+            The NetSuite configuration
+        timeout:
+            Seconds to wait for each call before giving up, `None` (default)
+            waits forever
+        **netsuite_options:
+            Options for `NetSuite`
+    """
+
+    def __init__(
+        self, config: Config, *, timeout: Optional[float] = None, **netsuite_options
+    ) -> None:
+        self.timeout = timeout
+        self._loop = _BackgroundLoop(f"netsuite-{config.account}")
+        self._lock = threading.Lock()
+        self._proxies: Dict[str, _SyncProxy] = {}
+        # REST API and Restlets keep their connections open between calls
+        self._http_client = httpx.AsyncClient()
+        for name in ("rest_api_options", "restlet_options"):
+            options = dict(netsuite_options.get(name) or {})
+            options.setdefault("http_client", self._http_client)
+            netsuite_options[name] = options
+        self.ns = NetSuite(config, **netsuite_options)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.ns._config.account}>"
+
+    def __enter__(self) -> "SyncNetSuite":
+        return self
+
+    def __exit__(self, exc_type=None, exc_value=None, traceback=None) -> None:
+        self.close()
+
+    @property
+    def rest_api(self) -> Any:
+        return self._proxy("rest_api")
+
+    @property
+    def restlet(self) -> Any:
+        return self._proxy("restlet")
+
+    @property
+    def soap_api(self) -> Any:
+        return self._proxy("soap_api")
+
+    def run(self, awaitable: Awaitable[Any]) -> Any:
+        """Run a coroutine on the background loop and return its result"""
+        return self._loop.run(awaitable, self.timeout)
+
+    def iterate(self, iterator: AsyncIterator[Any]) -> Iterator[Any]:
+        """Iterate an async iterator on the background loop"""
+        try:
+            while True:
+                try:
+                    yield self.run(iterator.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            aclose = getattr(iterator, "aclose", None)
+            if aclose is not None and self._loop.is_running:
+                self.run(aclose())
+
+    def close(self) -> None:
+        """Close connections and stop the background loop"""
+        if self._loop.is_running:
+            self.run(self._http_client.aclose())
+            soap_api = self.ns.__dict__.get("soap_api")
+            if soap_api is not None and soap_api._client is not None:
+                self.run(soap_api._client.transport.aclose())
+        self._loop.stop()
+
+    def _proxy(self, name: str) -> _SyncProxy:
+        # Locked, as the API objects are created on first access
+        with self._lock:
+            proxy = self._proxies.get(name)
+            if proxy is None:
+                proxy = self._proxies[name] = _SyncProxy(self, getattr(self.ns, name))
+            return proxy
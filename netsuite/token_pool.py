@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, List, Optional, Sequence, Set
+
+if TYPE_CHECKING:
+    from .config import TokenAuth
+
+logger = logging.getLogger(__name__)
+
+__all__ = ("PooledToken", "TokenPool")
+
+
+class PooledToken:
+    """A token credential in a `TokenPool`, with its current load and health"""
+
+    def __init__(self, auth: "TokenAuth", concurrent_requests: int) -> None:
+        self.auth = auth
+        self.concurrent_requests = concurrent_requests
+        self.is_limited = auth.concurrent_requests is not None
+        self.in_flight = 0
+        self.failures = 0
+        self.available_at = 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} token_id={self.auth.token_id[:6]}... "
+            f"in_flight={self.in_flight}/{self.concurrent_requests} "
+            f"failures={self.failures}>"
+        )
+
+    @property
+    def load(self) -> float:
+        return self.in_flight / self.concurrent_requests
+
+    @property
+    def has_capacity(self) -> bool:
+        return not self.is_limited or self.in_flight < self.concurrent_requests
+
+    def is_available(self, now: float) -> bool:
+        return self.available_at <= now
+
+
+class TokenPool:
+    """
+    Spread requests over several token credentials (integration records)
+
+    NetSuite allocates concurrency per integration record, so using several
+    raises the number of requests that can be made at the same time. Each
+    request is made with the least loaded credential, relative to its
+    `concurrent_requests` budget. A credential whose request fails with an
+    authentication or concurrency limit error is taken out of rotation for
+    `cooldown` seconds, doubling with each consecutive failure up to
+    `max_cooldown`.
+
+    Args:
+        auths:
+            The token credentials. Those with `concurrent_requests` set never
+            get more requests than that at the same time.
+        default_concurrent_requests:
+            Budget used to weigh credentials without `concurrent_requests`
+        cooldown:
+            Seconds a failing credential is out of rotation
+        max_cooldown:
+            Upper limit of the cooldown after consecutive failures
+    """
+
+    def __init__(
+        self,
+        auths: Sequence["TokenAuth"],
+        *,
+        default_concurrent_requests: int = 5,
+        cooldown: float = 30.0,
+        max_cooldown: float = 300.0,
+    ) -> None:
+        if not auths:
+            raise ValueError("A token pool needs at least one credential")
+        self.tokens: List[PooledToken] = [
+            PooledToken(auth, auth.concurrent_requests or default_concurrent_requests)
+            for auth in auths
+        ]
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        # Not an `asyncio.Condition`, which is bound to a single event loop,
+        # as the pool is shared by clients used from several loops
+        self._lock = threading.Lock()
+        self._waiters: Set[asyncio.Future] = set()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} tokens={self.tokens!r}>"
+
+    async def acquire(self) -> PooledToken:
+        """
+        Take the least loaded available credential
+
+        Waits if all credentials are at their concurrency limit or cooling
+        down after failures.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                candidates = [token for token in self.tokens if token.has_capacity]
+                available = [token for token in candidates if token.is_available(now)]
+                if available:
+                    token = min(available, key=lambda token: token.load)
+                    token.in_flight += 1
+                    return token
+                waiter = loop.create_future()
+                self._waiters.add(waiter)
+
+            timeout = None
+            if candidates:
+                timeout = min(token.available_at for token in candidates) - now
+            try:
+                await asyncio.wait_for(waiter, timeout)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                with self._lock:
+                    self._waiters.discard(waiter)
+
+    async def release(self, token: PooledToken, *, failed: bool = False) -> None:
+        """Return a credential taken by `acquire`"""
+        with self._lock:
+            token.in_flight -= 1
+            if failed:
+                token.failures += 1
+                cooldown = min(
+                    self.cooldown * 2 ** (token.failures - 1), self.max_cooldown
+                )
+                token.available_at = time.monotonic() + cooldown
+            else:
+                token.failures = 0
+            waiters, self._waiters = self._waiters, set()
+        if failed:
+            logger.warning(
+                f"Taking token {token.auth.token_id[:6]}... out of rotation for "
+                f"{cooldown}s after {token.failures} consecutive failures"
+            )
+        for waiter in waiters:
+            try:
+                waiter.get_loop().call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                # Its event loop is closed
+                pass
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def is_credential_failure_status(status_code: Optional[int]) -> bool:
+    """Whether an HTTP status means the credential was rejected or overused"""
+    return status_code in (401, 429)
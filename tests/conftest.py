@@ -1,7 +1,11 @@
+import pathlib
+
 import pytest
 
 from netsuite import Config
 
+FIXTURES_DIR = pathlib.Path(__file__).parent / "fixtures"
+
 
 @pytest.fixture
 def dummy_config():
@@ -26,3 +30,48 @@ def dummy_username_password_config():
     return Config(
         account="123456_SB1", auth={"username": "username", "password": "password"}
     )
+
+
+@pytest.fixture
+def make_soap_api(dummy_config):
+    """
+    Create a `NetSuiteSoapApi` backed by a trimmed down NetSuite WSDL, where
+    requests are answered by `handler(request) -> httpx.Response`
+    """
+    httpx = pytest.importorskip("httpx")
+    zeep = pytest.importorskip("zeep")
+
+    from netsuite import NetSuiteSoapApi
+
+    def make(handler, config=None, **kw):
+        cache = zeep.cache.InMemoryCache()
+        soap_api = NetSuiteSoapApi(config or dummy_config, cache=cache, **kw)
+        cache.add(soap_api.wsdl_url, (FIXTURES_DIR / "netsuite.wsdl").read_bytes())
+        soap_api.transport.client = httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        )
+        return soap_api
+
+    return make
+
+
+def soap_response(body: str, *, status_code: int = 200):
+    """Wrap `body` in a NetSuite style SOAP envelope"""
+    import httpx
+
+    content = f"""<?xml version="1.0" encoding="UTF-8"?>
+<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
+    xmlns:xsd="http://www.w3.org/2001/XMLSchema"
+    xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+  <soapenv:Header>
+    <platformMsgs:documentInfo xmlns:platformMsgs="urn:messages_2021_1.platform.webservices.netsuite.com">
+      <platformMsgs:nsId>WEBSERVICES_123456_SB1</platformMsgs:nsId>
+    </platformMsgs:documentInfo>
+  </soapenv:Header>
+  <soapenv:Body>{body}</soapenv:Body>
+</soapenv:Envelope>"""
+    return httpx.Response(
+        status_code,
+        content=content.encode("utf-8"),
+        headers={"Content-Type": "text/xml; charset=utf-8"},
+    )
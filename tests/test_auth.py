@@ -0,0 +1,83 @@
+import httpx
+import oauthlib.oauth1
+import pytest
+
+from netsuite.auth import OAuth1Signer
+
+URLS = [
+    "https://123456-sb1.restlets.api.netsuite.com/app/site/hosting/restlet.nl"
+    "?script=12&deploy=1&q=a%20b",
+    "https://123456-sb1.suitetalk.api.netsuite.com/services/rest/record/v1/customer",
+]
+
+
+def _params(authorization: str) -> dict:
+    return dict(
+        param.split("=", 1) for param in authorization[len("OAuth ") :].split(", ")
+    )
+
+
+def _signature(authorization: str) -> str:
+    return _params(authorization)["oauth_signature"]
+
+
+@pytest.mark.parametrize("url", URLS)
+@pytest.mark.parametrize(
+    "signature_method,oauthlib_signature_method",
+    [
+        ("HMAC-SHA256", oauthlib.oauth1.SIGNATURE_HMAC_SHA256),
+        ("HMAC-SHA1", oauthlib.oauth1.SIGNATURE_HMAC_SHA1),
+    ],
+)
+def test_signature_matches_oauthlib(
+    dummy_config, url, signature_method, oauthlib_signature_method
+):
+    auth = dummy_config.auth
+    signer = OAuth1Signer.from_config(dummy_config, signature_method)
+    reference = oauthlib.oauth1.Client(
+        auth.consumer_key,
+        client_secret=auth.consumer_secret,
+        resource_owner_key=auth.token_id,
+        resource_owner_secret=auth.token_secret,
+        signature_method=oauthlib_signature_method,
+        realm=dummy_config.account,
+        nonce="abc123",
+        timestamp="1700000000",
+    )
+
+    authorization = signer.sign(
+        "POST", httpx.URL(url), nonce="abc123", timestamp="1700000000"
+    )
+    _, reference_headers, _ = reference.sign(url, "POST")
+
+    assert _signature(authorization) == _signature(reference_headers["Authorization"])
+    assert authorization.startswith('OAuth realm="123456_SB1", ')
+
+
+def test_only_form_encoded_bodies_are_signed(dummy_config):
+    signer = OAuth1Signer.from_config(dummy_config)
+    url = httpx.URL(URLS[1])
+
+    def check(content_type, content, form_params):
+        request = httpx.Request(
+            "POST", url, headers={"Content-Type": content_type}, content=content
+        )
+        authorization = next(signer.auth_flow(request)).headers["Authorization"]
+        params = _params(authorization)
+        expected = signer.sign(
+            "POST",
+            url,
+            form_params,
+            nonce=params["oauth_nonce"].strip('"'),
+            timestamp=params["oauth_timestamp"].strip('"'),
+        )
+        assert authorization == expected
+        assert "oauth_body_hash" not in authorization
+
+    check("application/json", b'{"a": 1}', [])
+    check("application/x-www-form-urlencoded", b"a=1&b=", [("a", "1"), ("b", "")])
+
+
+def test_unsupported_signature_method(dummy_config):
+    with pytest.raises(ValueError):
+        OAuth1Signer.from_config(dummy_config, "PLAINTEXT")
@@ -0,0 +1,177 @@
+import asyncio
+
+import httpx
+import pytest
+
+from netsuite import BulkWritePlan, NetsuiteResponseError, NetSuiteRestApi, Ref, json
+from netsuite.soap_api.zeep import ZEEP_INSTALLED
+
+from .test_soap_api import _write_response
+
+
+def test_records_are_layered_by_their_references():
+    plan = BulkWritePlan()
+    plan.add("SO-1", {"entity": Ref("CUST-1"), "items": [{"item": Ref("ITEM-1")}]})
+    plan.add("CUST-1", {"name": "Acme"})
+    plan.add("ITEM-1", {"name": "Widget"})
+    plan.add("NOTE-1", {"text": "Hi"}, depends_on=["SO-1"])
+
+    assert plan.layers() == [["CUST-1", "ITEM-1"], ["SO-1"], ["NOTE-1"]]
+
+
+def test_cycles_and_unknown_references_are_rejected():
+    plan = BulkWritePlan()
+    plan.add("A", {"parent": Ref("B")})
+    plan.add("B", {"parent": Ref("A")})
+    with pytest.raises(ValueError, match="cycle"):
+        plan.layers()
+
+    plan = BulkWritePlan()
+    plan.add("A", {"parent": Ref("C")})
+    with pytest.raises(ValueError, match="unknown"):
+        plan.layers()
+
+
+def test_rest_api_writes_layers_and_skips_dependents_of_failures(dummy_config):
+    requests = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        requests.append((request.method, request.url.path, body))
+        if body.get("name") == "Broken":
+            return httpx.Response(400, json={"title": "Invalid"})
+        internal_id = 100 + len(requests)
+        return httpx.Response(
+            204,
+            headers={"Location": f"https://x/services/rest/record/v1/t/{internal_id}"},
+        )
+
+    rest_api = NetSuiteRestApi(
+        dummy_config,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    plan = BulkWritePlan()
+    plan.add("CUST-1", {"name": "Acme"}, record_type="customer")
+    plan.add("CUST-2", {"name": "Broken"}, record_type="customer")
+    plan.add(
+        "SO-1",
+        {"entity": Ref("CUST-1")},
+        operation="upsert",
+        record_type="salesOrder",
+    )
+    plan.add("SO-2", {"entity": Ref("CUST-2")}, record_type="salesOrder")
+
+    result = asyncio.run(plan.run(rest_api))
+
+    assert requests[-1] == (
+        "PUT",
+        "/services/rest/record/v1/salesOrder/eid:SO-1",
+        {"entity": {"id": "101"}},
+    )
+    assert result.internal_ids == {"CUST-1": "101", "SO-1": "103"}
+    assert list(result.failed) == ["CUST-2"]
+    assert result.skipped == ["SO-2"]
+    with pytest.raises(NetsuiteResponseError):
+        result.raise_for_status()
+
+
+@pytest.mark.skipif(not ZEEP_INSTALLED, reason="Requires zeep")
+def test_soap_api_writes_each_layer_with_list_operations(make_soap_api):
+    soap_api = make_soap_api(lambda request: httpx.Response(500))
+    calls = []
+
+    async def fake_request(service_name, **kw):
+        calls.append((service_name, [record["id"] for record in kw["record"]]))
+        return {
+            "body": {
+                "writeResponseList": {
+                    "status": None,
+                    "writeResponse": [_write_response(r) for r in kw["record"]],
+                }
+            }
+        }
+
+    soap_api.request = fake_request
+    plan = BulkWritePlan()
+    orders = [{"id": 10 + i, "entity": Ref(f"CUST-{i}")} for i in range(2)]
+    for i, order in enumerate(orders):
+        plan.add(f"SO-{i}", order, operation="upsert")
+        plan.add(f"CUST-{i}", {"id": i})
+
+    result = asyncio.run(plan.run(soap_api))
+
+    assert calls == [("addList", [0, 1]), ("upsertList", [10, 11])]
+    assert orders[1]["entity"].internalId == "1"
+    assert result.is_success
+
+
+def test_references_to_records_written_without_id_fail(dummy_config):
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        # No `Location` header
+        return httpx.Response(204)
+
+    rest_api = NetSuiteRestApi(
+        dummy_config,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    plan = BulkWritePlan()
+    plan.add("CUST-1", {"name": "Acme"}, record_type="customer")
+    plan.add("SO-1", {"entity": Ref("CUST-1")}, record_type="salesOrder")
+    plan.add("SO-2", {}, record_type="salesOrder", depends_on=["CUST-1"])
+    plan.add("INV-1", {"createdFrom": Ref("SO-1")}, record_type="invoice")
+
+    result = asyncio.run(plan.run(rest_api))
+
+    assert requests == [
+        "/services/rest/record/v1/customer",
+        "/services/rest/record/v1/salesOrder",
+    ]
+    assert result.results["CUST-1"].is_success
+    assert result.results["SO-2"].is_success
+    assert "CUST-1" in result.failed["SO-1"].status_details[0]
+    assert result.skipped == ["INV-1"]
+
+
+def test_rest_api_plan_without_record_types_is_rejected_before_writing(dummy_config):
+    requests = []
+    rest_api = NetSuiteRestApi(
+        dummy_config,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(requests.append)),
+    )
+    plan = BulkWritePlan()
+    plan.add("CUST-1", {"name": "Acme"}, record_type="customer")
+    plan.add("SO-1", {"entity": Ref("CUST-1")})
+
+    with pytest.raises(ValueError, match="SO-1"):
+        asyncio.run(plan.run(rest_api))
+
+    assert requests == []
+
+
+def test_failed_requests_only_fail_their_records(dummy_config):
+    def handler(request):
+        if json.loads(request.content)["name"] == "Unreachable":
+            raise httpx.ConnectError("down")
+        return httpx.Response(
+            204, headers={"Location": "https://x/services/rest/record/v1/t/1"}
+        )
+
+    rest_api = NetSuiteRestApi(
+        dummy_config,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    plan = BulkWritePlan()
+    plan.add("CUST-1", {"name": "Acme"}, record_type="customer")
+    plan.add("CUST-2", {"name": "Unreachable"}, record_type="customer")
+    plan.add(
+        "SO-2", {"name": "Order", "entity": Ref("CUST-2")}, record_type="salesOrder"
+    )
+
+    result = asyncio.run(plan.run(rest_api))
+
+    assert result.internal_ids == {"CUST-1": "1"}
+    assert result.failed["CUST-2"].status_details[0]["code"] == "ConnectError"
+    assert result.skipped == ["SO-2"]
@@ -0,0 +1,151 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from netsuite import CircuitBreakers, NetSuiteRestApi, NetSuiteRestlet, deadline
+from netsuite.exceptions import (
+    CircuitOpenError,
+    DeadlineExceeded,
+    NetsuiteAPIRequestError,
+)
+from netsuite.soap_api.zeep import ZEEP_INSTALLED
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("netsuite.circuit_breaker.time.monotonic", lambda: now[0])
+    return now
+
+
+def test_circuit_opens_rejects_and_recovers_through_half_open(clock):
+    changes = []
+    breakers = CircuitBreakers(
+        failure_threshold=2,
+        reset_timeout=10,
+        on_state_change=lambda breaker, old, new: changes.append((old, new)),
+    )
+    breaker = breakers.get("123", "rest_api")
+    assert breakers.get("123", "rest_api") is breaker
+    assert breakers.get("123", "restlet") is not breaker
+
+    for _ in range(2):
+        breaker.allow()
+        breaker.record(True)
+    with pytest.raises(CircuitOpenError) as exc_info:
+        breaker.allow()
+    assert exc_info.value.retry_after == 10
+
+    clock[0] += 10
+    breaker.allow()
+    # Only one trial request at a time
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.record(False)
+
+    assert breaker.state == "closed"
+    assert changes == [
+        ("closed", "open"),
+        ("open", "half_open"),
+        ("half_open", "closed"),
+    ]
+    assert breaker.rejected == 2
+
+
+def test_failed_trial_reopens_circuit(clock):
+    breaker = CircuitBreakers(failure_threshold=1, reset_timeout=10).get("1", "x")
+    breaker.allow()
+    breaker.record(True)
+    clock[0] += 10
+    breaker.allow()
+    breaker.record(True)
+
+    assert breaker.state == "open"
+    assert breaker.retry_after == 10
+
+
+def test_rest_requests_fail_fast_while_open(dummy_config):
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.host)
+        return httpx.Response(503, text="Down for maintenance")
+
+    breakers = CircuitBreakers(failure_threshold=3)
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    options = {"http_client": http_client, "circuit_breakers": breakers}
+    rest_api = NetSuiteRestApi(dummy_config, **options)
+    restlet = NetSuiteRestlet(dummy_config, **options)
+
+    async def run():
+        errors = []
+        for _ in range(5):
+            try:
+                await rest_api.get("/record/v1/customer/1")
+            except Exception as ex:
+                errors.append(type(ex))
+        with pytest.raises(NetsuiteAPIRequestError):
+            await restlet.get(1)
+        return errors
+
+    errors = asyncio.run(run())
+
+    assert errors == [NetsuiteAPIRequestError] * 3 + [CircuitOpenError] * 2
+    assert len(requests) == 4
+    assert breakers.get("123456_SB1", "restlet").state == "closed"
+
+
+@pytest.mark.skipif(not ZEEP_INSTALLED, reason="Requires zeep")
+@pytest.mark.parametrize("response_mode", ["zeep", "builtin"])
+def test_soap_requests_fail_fast_while_open(make_soap_api, response_mode):
+    def handler(request):
+        return httpx.Response(
+            503, text="Service Unavailable", headers={"Content-Type": "text/html"}
+        )
+
+    breakers = CircuitBreakers(failure_threshold=2)
+    soap_api = make_soap_api(
+        handler, response_mode=response_mode, circuit_breakers=breakers
+    )
+
+    async def run():
+        errors = []
+        for _ in range(3):
+            try:
+                await soap_api.getList("customer", internalIds=[1])
+            except Exception as ex:
+                errors.append(type(ex).__name__)
+        return errors
+
+    errors = asyncio.run(run())
+
+    assert errors == ["TransportError", "TransportError", "CircuitOpenError"]
+    assert breakers.get("123456_SB1", "soap_api").state == "open"
+
+
+def test_deadline_expiry_is_neither_failure_nor_success(dummy_config):
+    def handler(request):
+        time.sleep(0.15)
+        raise httpx.ReadTimeout("Timed out", request=request)
+
+    breakers = CircuitBreakers(failure_threshold=3)
+    rest_api = NetSuiteRestApi(
+        dummy_config,
+        circuit_breakers=breakers,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    breaker = breakers.get("123456_SB1", "rest_api")
+    breaker.allow()
+    breaker.record(True)
+
+    async def run():
+        with deadline(0.1):
+            await rest_api.get("/record/v1/customer/1")
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(run())
+
+    assert breaker.failures == 1
+    assert breaker.state == "closed"
@@ -0,0 +1,85 @@
+import asyncio
+
+import httpx
+import pytest
+
+from netsuite import NetSuiteRestApi, current_deadline, deadline
+from netsuite.exceptions import DeadlineExceeded
+from netsuite.soap_api.zeep import ZEEP_INSTALLED
+
+from .conftest import soap_response
+from .test_soap_api import GET_LIST_RESPONSE_BODY
+
+
+def test_timeouts_are_capped_by_time_left():
+    with deadline(60, connect=2) as outer:
+        timeout = outer.timeout(10)
+        assert timeout.connect == 2
+        assert 9.9 < timeout.read <= 10
+        assert timeout.pool <= 10
+
+        with deadline(120, read=5) as inner:
+            # Can't extend the outer deadline, but inherits its phase limits
+            assert inner.expires_at == outer.expires_at
+            assert inner.timeout(None).connect == 2
+            assert inner.timeout(None).read == 5
+
+        with deadline(1) as inner:
+            assert inner.timeout(10).read <= 1
+
+    assert current_deadline() is None
+
+
+def test_rest_requests_share_one_budget(dummy_config):
+    timeouts = []
+
+    async def handler(request):
+        timeouts.append(request.extensions["timeout"]["read"])
+        await asyncio.sleep(0.5)
+        return httpx.Response(200, json={})
+
+    rest_api = NetSuiteRestApi(
+        dummy_config,
+        concurrent_requests=1,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    async def run():
+        with deadline(0.3):
+            # The second request is cancelled while still waiting for the
+            # semaphore, so it's never sent
+            return await asyncio.gather(
+                rest_api.get("/record/v1/customer/1"),
+                rest_api.get("/record/v1/customer/2"),
+                return_exceptions=True,
+            )
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, DeadlineExceeded) for result in results)
+    assert isinstance(results[0], asyncio.TimeoutError)
+    assert len(timeouts) == 1
+    assert timeouts[0] <= 0.3
+
+
+@pytest.mark.skipif(not ZEEP_INSTALLED, reason="Requires zeep")
+def test_soap_requests_share_one_budget(make_soap_api):
+    timeouts = []
+
+    def handler(request):
+        timeouts.append(request.extensions["timeout"]["read"])
+        return soap_response(GET_LIST_RESPONSE_BODY)
+
+    soap_api = make_soap_api(handler)
+
+    async def run():
+        with deadline(5):
+            await soap_api.getList("customer", internalIds=[1])
+        with deadline(0):
+            await soap_api.getList("customer", internalIds=[1])
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(run())
+
+    assert len(timeouts) == 1
+    assert timeouts[0] <= 5
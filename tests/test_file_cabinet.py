@@ -0,0 +1,185 @@
+import asyncio
+import base64
+import io
+import re
+
+import httpx
+import pytest
+
+from netsuite.soap_api import zeep
+from netsuite.soap_api.exceptions import NetsuiteResponseError
+from netsuite.soap_api.files import FileContentExtractor
+
+from .conftest import soap_response
+
+CONTENT = bytes(range(256)) * 10
+
+WRITE_RESPONSE_BODY = """
+<{tag} xmlns="urn:messages_2021_1.platform.webservices.netsuite.com">
+  <writeResponse>
+    <platformCore:status isSuccess="{is_success}"
+        xmlns:platformCore="urn:core_2021_1.platform.webservices.netsuite.com"/>
+    <baseRef internalId="{internal_id}" type="file" xsi:type="platformCore:RecordRef"
+        xmlns:platformCore="urn:core_2021_1.platform.webservices.netsuite.com"/>
+  </writeResponse>
+</{tag}>
+"""
+
+
+def _get_response_body(content, is_success=True):
+    lines = "\n".join(re.findall(".{1,76}", base64.b64encode(content).decode()))
+    return f"""
+<getResponse xmlns="urn:messages_2021_1.platform.webservices.netsuite.com">
+  <platformCore:readResponse xmlns:platformCore="urn:core_2021_1.platform.webservices.netsuite.com">
+    <platformCore:status isSuccess="{str(is_success).lower()}"/>
+    <platformCore:record internalId="7" xsi:type="docFileCab:File"
+        xmlns:docFileCab="urn:filecabinet_2021_1.documents.webservices.netsuite.com">
+      <docFileCab:name>report.bin</docFileCab:name>
+      <docFileCab:content>{lines}</docFileCab:content>
+      <docFileCab:description>Monthly</docFileCab:description>
+    </platformCore:record>
+  </platformCore:readResponse>
+</getResponse>
+"""
+
+
+def _uploaded_content(request):
+    match = re.search(rb"<(?:\w+:)?content[^>]*>([^<]*)<", request.content)
+    return base64.b64decode(match[1])
+
+
+@pytest.mark.parametrize("response_mode", ["zeep", "builtin"])
+def test_upload_file_streams_content(make_soap_api, response_mode, tmp_path):
+    path = tmp_path / "report.bin"
+    path.write_bytes(CONTENT)
+
+    def handler(request):
+        assert int(request.headers["Content-Length"]) == len(request.content)
+        assert _uploaded_content(request) == CONTENT
+        assert b">report.bin</" in request.content
+        body = WRITE_RESPONSE_BODY.format(
+            tag="addResponse", is_success="true", internal_id="7"
+        )
+        return soap_response(body)
+
+    soap_api = make_soap_api(handler, response_mode=response_mode)
+    base_ref = asyncio.run(soap_api.upload_file(path, folder=3, chunk_size=30))
+
+    assert base_ref["internalId"] == "7"
+
+
+def test_upload_folder_reports_each_file(make_soap_api, tmp_path):
+    for name in ("a.txt", "b.txt", "c.csv"):
+        (tmp_path / name).write_bytes(name.encode())
+
+    def handler(request):
+        name = _uploaded_content(request).decode()
+        body = WRITE_RESPONSE_BODY.format(
+            tag="upsertResponse",
+            is_success=str(name != "b.txt").lower(),
+            internal_id=name,
+        )
+        return soap_response(body)
+
+    soap_api = make_soap_api(handler, response_mode="builtin")
+
+    def make_record(path):
+        return soap_api.Filecabinet.File(externalId=path.name)
+
+    result = asyncio.run(
+        soap_api.upload_folder(
+            tmp_path,
+            folder=3,
+            pattern="*.txt",
+            concurrency=1,
+            operation="upsert",
+            make_record=make_record,
+        )
+    )
+
+    assert [r.record.name for r in result] == ["a.txt", "b.txt"]
+    assert [r.is_success for r in result] == [True, False]
+    assert result[0].internal_id == "a.txt"
+
+
+def test_upload_folder_keeps_going_after_a_failed_upload(make_soap_api, tmp_path):
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (tmp_path / name).write_bytes(name.encode())
+
+    def handler(request):
+        name = _uploaded_content(request).decode()
+        if name == "b.txt":
+            return httpx.Response(502, text="Bad Gateway")
+        body = WRITE_RESPONSE_BODY.format(
+            tag="addResponse", is_success="true", internal_id=name
+        )
+        return soap_response(body)
+
+    soap_api = make_soap_api(handler, response_mode="builtin")
+    result = asyncio.run(soap_api.upload_folder(tmp_path, folder=3))
+
+    assert [r.is_success for r in result] == [True, False, True]
+    assert result[1].record.name == "b.txt"
+    assert result[1].status_details[0]["code"] == "TransportError"
+    assert isinstance(result[1].error, zeep.exceptions.TransportError)
+
+
+def test_upload_file_checks_chunk_size_up_front(make_soap_api, tmp_path):
+    requests = []
+    soap_api = make_soap_api(requests.append)
+
+    # Before the file is even opened
+    with pytest.raises(ValueError, match="multiple of 3"):
+        asyncio.run(
+            soap_api.upload_file(tmp_path / "missing.bin", folder=3, chunk_size=1000)
+        )
+
+    assert requests == []
+
+
+@pytest.mark.parametrize("response_mode", ["zeep", "builtin"])
+def test_download_file_streams_content(make_soap_api, response_mode, tmp_path):
+    path = tmp_path / "report.bin"
+
+    def handler(request):
+        assert b'internalId="7"' in request.content
+        return soap_response(_get_response_body(CONTENT))
+
+    soap_api = make_soap_api(handler, response_mode=response_mode)
+    record = asyncio.run(soap_api.download_file(path, internalId=7))
+
+    assert path.read_bytes() == CONTENT
+    assert record["name"] == "report.bin"
+    assert record["description"] == "Monthly"
+    assert record["content"] is None
+
+
+def test_failed_download_keeps_existing_file(make_soap_api, tmp_path):
+    path = tmp_path / "report.bin"
+    path.write_bytes(b"old")
+
+    def handler(request):
+        return soap_response(_get_response_body(b"new", is_success=False))
+
+    soap_api = make_soap_api(handler)
+    with pytest.raises(NetsuiteResponseError):
+        asyncio.run(soap_api.download_file(path, externalId="report"))
+
+    assert path.read_bytes() == b"old"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_content_extractor_decodes_across_chunks():
+    body = soap_response(_get_response_body(CONTENT)).content
+    fp = io.BytesIO()
+    extractor = FileContentExtractor(fp)
+    for i in range(0, len(body), 7):
+        extractor.feed(body[i : i + 7])
+
+    rest = extractor.close()
+
+    assert fp.getvalue() == CONTENT
+    assert extractor.size == len(CONTENT)
+    assert b"content" not in rest
+    assert b"<docFileCab:name>report.bin</docFileCab:name>" in rest
+    assert b"<docFileCab:description>Monthly</docFileCab:description>" in rest
@@ -0,0 +1,157 @@
+import asyncio
+
+import httpx
+
+from netsuite import Hedger, NetSuiteRestApi
+
+
+def _warm_hedger(latency=0.01, **kw):
+    hedger = Hedger(min_samples=5, min_delay=0, **kw)
+    for _ in range(5):
+        hedger.record(latency)
+    return hedger
+
+
+def test_slow_call_is_hedged_and_loser_cancelled():
+    hedger = _warm_hedger()
+    delays = iter([1.0, 0.0])
+    cancelled = []
+
+    async def call():
+        delay = next(delays)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(delay)
+            raise
+        return delay
+
+    assert asyncio.run(hedger.run(call)) == 0.0
+    assert cancelled == [1.0]
+    assert hedger.stats.hedged == 1
+    assert hedger.stats.hedge_wins == 1
+
+
+def test_fast_calls_and_cold_hedger_are_not_hedged():
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    async def run():
+        cold = Hedger()
+        await cold.run(call)
+        warm = _warm_hedger(latency=1.0)
+        await warm.run(call)
+        return cold, warm
+
+    cold, warm = asyncio.run(run())
+
+    assert len(calls) == 2
+    assert cold.stats.hedged == warm.stats.hedged == 0
+    assert cold.delay is None
+
+
+def test_failed_hedge_falls_back_to_primary():
+    hedger = _warm_hedger()
+    outcomes = iter([(0.05, None), (0.0, ValueError("boom"))])
+
+    async def call():
+        delay, error = next(outcomes)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return "primary"
+
+    assert asyncio.run(hedger.run(call)) == "primary"
+    assert hedger.stats.hedge_wins == 0
+
+
+def test_rest_api_hedges_slow_reads_only(dummy_config):
+    requests = []
+
+    async def handler(request):
+        requests.append(request.method)
+        if len(requests) == 1:
+            await asyncio.sleep(1)
+        return httpx.Response(200, json={"n": len(requests)})
+
+    rest_api = NetSuiteRestApi(
+        dummy_config,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        hedger=_warm_hedger(),
+    )
+
+    async def run():
+        read = await rest_api.get("/record/v1/customer/1")
+        write = await rest_api.post("/record/v1/customer", json={})
+        return read, write
+
+    read, write = asyncio.run(run())
+
+    assert read == {"n": 2}
+    assert write == {"n": 3}
+    assert requests == ["GET", "GET", "POST"]
+    assert rest_api.hedge_stats.hedge_wins == 1
+
+
+def test_primary_latency_is_recorded_when_hedge_wins():
+    hedger = _warm_hedger(latency=0.05)
+    delays = iter([1.0, 0.0])
+
+    async def call():
+        await asyncio.sleep(next(delays))
+
+    asyncio.run(hedger.run(call))
+
+    # The cancelled primary ran for about the delay, not the hedge's ~0s
+    assert 0.05 <= hedger._latencies[-1] < 0.5
+    assert len(hedger._latencies) == 6
+
+
+def test_latency_excludes_wait_for_concurrency_slot(dummy_config):
+    async def handler(request):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={})
+
+    hedger = Hedger(min_samples=1000)
+    rest_api = NetSuiteRestApi(
+        dummy_config,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        concurrent_requests=1,
+        hedger=hedger,
+    )
+
+    async def run():
+        await asyncio.gather(*(rest_api.get("/record/v1/customer/1") for _ in range(4)))
+
+    asyncio.run(run())
+
+    # Queued for up to 0.15s, but each took 0.05s once sent
+    assert len(hedger._latencies) == 4
+    assert max(hedger._latencies) < 0.1
+
+
+def test_requests_queued_for_a_slot_are_not_hedged(dummy_config):
+    async def handler(request):
+        await asyncio.sleep(0.02)
+        return httpx.Response(200, json={})
+
+    hedger = _warm_hedger(latency=0.05)
+    rest_api = NetSuiteRestApi(
+        dummy_config,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        concurrent_requests=1,
+        hedger=hedger,
+    )
+
+    async def run():
+        await asyncio.gather(*(rest_api.get("/record/v1/customer/1") for _ in range(5)))
+
+    asyncio.run(run())
+
+    # Queued for up to 0.08s, more than the delay, but each took 0.02s once sent
+    assert hedger.stats.requests == 5
+    assert hedger.stats.hedged == 0
@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+
+from netsuite import Journal, WriteResult
+
+
+class FakeRestApi:
+    def __init__(self, rows, fail_at=None):
+        self.rows = rows
+        self.fail_at = fail_at
+        self.offsets = []
+
+    async def suiteql(self, q, limit, offset):
+        if offset == self.fail_at:
+            raise ConnectionError("down")
+        self.offsets.append(offset)
+        items = self.rows[offset : offset + limit]
+        return {"items": items, "hasMore": offset + limit < len(self.rows)}
+
+
+async def _collect(pages):
+    return [item async for page in pages for item in page]
+
+
+def test_extraction_resumes_after_last_processed_page(tmp_path):
+    journal = Journal(tmp_path / "jobs.sqlite")
+    rows = list(range(10))
+
+    crashing = FakeRestApi(rows, fail_at=6)
+    collected = []
+    job = journal.job("extract")
+
+    async def crash():
+        async for page in job.suiteql(crashing, "SELECT id", page_size=3):
+            collected.extend(page)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(crash())
+
+    assert crashing.offsets == [0, 3]
+    assert journal.job("extract").checkpoint == 1
+
+    # A new process picks up where the last one stopped
+    resumed = FakeRestApi(rows)
+    job = Journal(tmp_path / "jobs.sqlite").job("extract")
+    collected += asyncio.run(_collect(job.suiteql(resumed, "SELECT id", page_size=3)))
+
+    assert resumed.offsets == [6, 9]
+    assert collected == rows
+    assert job.is_finished
+    assert asyncio.run(_collect(job.suiteql(resumed, "SELECT id"))) == []
+
+
+def _write_batch(calls, rejected=(), errors=0):
+    errors = [errors]
+
+    async def write_batch(batch):
+        if errors[0]:
+            errors[0] -= 1
+            raise ConnectionError("down")
+        calls.append([item["id"] for item in batch])
+        return [
+            WriteResult(
+                item,
+                is_success=item["id"] not in rejected,
+                status_details=[] if item["id"] not in rejected else ["INVALID"],
+            )
+            for item in batch
+        ]
+
+    return write_batch
+
+
+def test_writes_skip_done_items_and_keep_dead_letters(tmp_path):
+    job = Journal(tmp_path / "jobs.sqlite").job("push")
+    items = [{"id": i} for i in range(5)]
+    calls = []
+
+    first = asyncio.run(
+        job.write(
+            items[:3],
+            _write_batch(calls, rejected={1}, errors=1),
+            key=lambda item: item["id"],
+            batch_size=2,
+            backoff=0,
+        )
+    )
+    second = asyncio.run(
+        job.write(items, _write_batch(calls), key=lambda item: item["id"])
+    )
+
+    assert (first.written, first.dead) == (2, 1)
+    assert (second.written, second.skipped) == (2, 3)
+    assert sorted(calls) == [[0, 1], [2], [3, 4]]
+    [letter] = job.dead_letters()
+    assert (letter.key, letter.item, letter.error) == ("1", {"id": 1}, "['INVALID']")
+
+    replayed = asyncio.run(job.replay(_write_batch(calls)))
+
+    assert replayed.written == 1
+    assert job.dead_letters() == []
+
+
+def test_failed_batch_stops_the_job_once_others_are_journaled(tmp_path):
+    job = Journal(tmp_path / "jobs.sqlite").job("push")
+    items = [{"id": i} for i in range(10)]
+    started = []
+
+    async def write_batch(batch):
+        ids = [item["id"] for item in batch]
+        started.append(ids)
+        if ids == [0, 1]:
+            await asyncio.sleep(0.001)
+            raise ConnectionError("down")
+        # Still being written when the other batch fails
+        await asyncio.sleep(0.01)
+        return [WriteResult(item, is_success=True) for item in batch]
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(
+            job.write(
+                items,
+                write_batch,
+                key=lambda item: item["id"],
+                batch_size=2,
+                concurrency=2,
+                max_attempts=1,
+            )
+        )
+
+    assert started == [[0, 1], [2, 3]]
+    resumed = asyncio.run(
+        job.write(items, _write_batch([]), key=lambda item: item["id"])
+    )
+    assert (resumed.written, resumed.skipped) == (8, 2)
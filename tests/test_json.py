@@ -0,0 +1,96 @@
+import datetime
+import enum
+import pathlib
+import uuid
+from decimal import Decimal
+
+import pytest
+
+from netsuite import json
+
+
+class Color(enum.Enum):
+    RED = "red"
+
+
+class Text(str):
+    pass
+
+
+class Amount(Decimal):
+    pass
+
+
+def test_dumps_bytes_encodes_non_native_types():
+    obj = {
+        "amount": Decimal("1.5"),
+        "subclassed_amount": Amount("2.5"),
+        "text": Text("abc"),
+        "tags": {"a"},
+        "path": pathlib.Path("a/b"),
+        "id": uuid.UUID(int=1),
+        "date": datetime.date(2021, 3, 4),
+        "color": Color.RED,
+    }
+
+    data = json.dumps_bytes(obj)
+
+    assert isinstance(data, bytes)
+    assert json.loads(data) == {
+        "amount": 1.5,
+        "subclassed_amount": 2.5,
+        "text": "abc",
+        "tags": ["a"],
+        "path": str(pathlib.Path("a/b")),
+        "id": "00000000-0000-0000-0000-000000000001",
+        "date": "2021-03-04",
+        "color": "red",
+    }
+    assert json.dumps(obj) == data.decode("utf-8")
+
+
+def test_encoders_are_cached_per_type():
+    json.dumps_bytes([Amount("1")])
+    assert json._encoder_cache[Amount] is float
+
+
+def test_dumps_raises_type_error_for_unknown_types():
+    with pytest.raises(TypeError):
+        json.dumps_bytes({"obj": object()})
+
+
+def test_loads_accepts_bytes_and_str():
+    assert json.loads(b'{"a": [1, "\xc3\xa5"]}') == {"a": [1, "å"]}
+    assert json.loads('{"a": [1, "å"]}') == {"a": [1, "å"]}
+
+
+@pytest.mark.parametrize(
+    "backend,expected",
+    [
+        ("json", b'["abc", 90.0, "2021-03-04T05:06:07+00:00"]'),
+        ("orjson", b'["abc",90.0,"2021-03-04T05:06:07+00:00"]'),
+        ("msgspec", b'["YWJj","PT90S","2021-03-04T05:06:07Z"]'),
+    ],
+)
+def test_backends_encoding_of_bytes_timedelta_and_datetime(backend, expected):
+    pytest.importorskip(backend)
+    obj = [
+        b"abc",
+        datetime.timedelta(seconds=90),
+        datetime.datetime(2021, 3, 4, 5, 6, 7, tzinfo=datetime.timezone.utc),
+    ]
+    previous = json.BACKEND
+    json.set_backend(backend)
+    try:
+        assert json.dumps_bytes(obj) == expected
+        assert json.dumps(obj) == expected.decode()
+    finally:
+        json.set_backend(previous)
+
+
+def test_orjson_is_preferred_over_msgspec():
+    pytest.importorskip("orjson")
+    # msgspec changes the encoding of some types, so is never picked implicitly
+    assert json.BACKEND == "orjson"
+    with pytest.raises(ValueError):
+        json.set_backend("ujson")
@@ -0,0 +1,225 @@
+import asyncio
+import base64
+import json as stdlib_json
+import threading
+import time
+
+import httpx
+import pytest
+
+from netsuite import (
+    AccessToken,
+    Config,
+    FileTokenStore,
+    NetSuiteRestApi,
+    OAuth2ClientCredentials,
+    OAuth2TokenCache,
+)
+
+cryptography = pytest.importorskip("cryptography")
+
+from cryptography.hazmat.primitives import hashes, serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import ec, padding, rsa  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric.utils import (  # noqa: E402
+    encode_dss_signature,
+)
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def _pem(private_key) -> str:
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+
+
+def _make_config(private_key, algorithm="PS256"):
+    return Config(
+        account="123456_SB1",
+        auth={
+            "client_id": "client-id",
+            "certificate_id": "certificate-id",
+            "private_key": _pem(private_key),
+            "algorithm": algorithm,
+        },
+    )
+
+
+@pytest.fixture(scope="module")
+def rsa_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+class CountingAuth(OAuth2ClientCredentials):
+    def __init__(self, *args, expires_in=3600, **kw):
+        super().__init__(*args, **kw)
+        self.expires_in = expires_in
+        self.requested = 0
+
+    async def request_token(self):
+        self.requested += 1
+        await asyncio.sleep(0.01)
+        return AccessToken(f"token-{self.requested}", time.time() + self.expires_in)
+
+
+def test_config_accepts_oauth2_client_credentials(rsa_key):
+    config = _make_config(rsa_key)
+
+    assert config.is_oauth2_auth
+    assert not config.is_token_auth
+    assert config.auth.scopes == ["rest_webservices", "restlets"]
+
+
+def test_client_assertion_is_a_signed_jwt(rsa_key):
+    auth = OAuth2ClientCredentials(_make_config(rsa_key))
+
+    assertion = auth.make_client_assertion(now=1700000000)
+    header, claims, signature = assertion.split(".")
+
+    assert stdlib_json.loads(_b64decode(header)) == {
+        "alg": "PS256",
+        "typ": "JWT",
+        "kid": "certificate-id",
+    }
+    assert stdlib_json.loads(_b64decode(claims)) == {
+        "iss": "client-id",
+        "scope": ["rest_webservices", "restlets"],
+        "aud": "https://123456-sb1.suitetalk.api.netsuite.com"
+        "/services/rest/auth/oauth2/v1/token",
+        "iat": 1700000000,
+        "exp": 1700000300,
+    }
+    rsa_key.public_key().verify(
+        _b64decode(signature),
+        f"{header}.{claims}".encode(),
+        padding.PSS(
+            mgf=padding.MGF1(hashes.SHA256()),
+            salt_length=padding.PSS.DIGEST_LENGTH,
+        ),
+        hashes.SHA256(),
+    )
+
+
+def test_client_assertion_with_ec_key():
+    ec_key = ec.generate_private_key(ec.SECP256R1())
+    auth = OAuth2ClientCredentials(_make_config(ec_key, algorithm="ES256"))
+
+    header, claims, signature = auth.make_client_assertion().split(".")
+    raw_signature = _b64decode(signature)
+
+    assert len(raw_signature) == 64
+    ec_key.public_key().verify(
+        encode_dss_signature(
+            int.from_bytes(raw_signature[:32], "big"),
+            int.from_bytes(raw_signature[32:], "big"),
+        ),
+        f"{header}.{claims}".encode(),
+        ec.ECDSA(hashes.SHA256()),
+    )
+
+
+def test_concurrent_requests_share_a_single_token_request(rsa_key):
+    auth = CountingAuth(_make_config(rsa_key), OAuth2TokenCache())
+
+    async def get_tokens():
+        return await asyncio.gather(
+            *(auth.token_cache.get_token(auth) for _ in range(10))
+        )
+
+    tokens = asyncio.run(get_tokens())
+
+    assert auth.requested == 1
+    assert {token.access_token for token in tokens} == {"token-1"}
+
+
+def test_cache_is_shared_by_event_loops_of_several_threads(rsa_key):
+    class SlowAuth(CountingAuth):
+        async def request_token(self):
+            await asyncio.sleep(0.1)
+            return await super().request_token()
+
+    auth = SlowAuth(_make_config(rsa_key), OAuth2TokenCache())
+    tokens, errors = [], []
+
+    def get_token():
+        try:
+            tokens.append(asyncio.run(auth.token_cache.get_token(auth)))
+        except Exception as ex:
+            errors.append(ex)
+
+    threads = [threading.Thread(target=get_token) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Each loop waits for a refresh of its own
+    assert errors == []
+    assert len(tokens) == 2
+
+
+def test_token_is_refreshed_in_background_before_expiry(rsa_key):
+    cache = OAuth2TokenCache(refresh_margin=60)
+    auth = CountingAuth(_make_config(rsa_key), cache, expires_in=30)
+
+    async def run():
+        first = await cache.get_token(auth)
+        auth.expires_in = 3600
+        # Within the refresh margin, the current token is still used
+        second = await cache.get_token(auth)
+        third = await cache.get_token(auth)
+        await asyncio.sleep(0.05)
+        return first, second, third, await cache.get_token(auth)
+
+    first, second, third, fourth = asyncio.run(run())
+
+    assert first is second is third
+    assert fourth.access_token == "token-2"
+    assert auth.requested == 2
+
+
+def test_tokens_are_persisted_in_file_store(rsa_key, tmp_path):
+    path = tmp_path / "tokens.json"
+    auth = CountingAuth(_make_config(rsa_key), OAuth2TokenCache(FileTokenStore(path)))
+    asyncio.run(auth.token_cache.get_token(auth))
+
+    restarted = CountingAuth(
+        _make_config(rsa_key), OAuth2TokenCache(FileTokenStore(path))
+    )
+    token = asyncio.run(restarted.token_cache.get_token(restarted))
+
+    assert token.access_token == "token-1"
+    assert restarted.requested == 0
+    assert path.stat().st_mode & 0o077 == 0
+
+
+def test_rejected_token_is_replaced_and_request_retried(rsa_key):
+    auth = CountingAuth(_make_config(rsa_key), OAuth2TokenCache())
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers["Authorization"])
+        return httpx.Response(401 if len(seen) == 1 else 200, json={})
+
+    async def run():
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler), auth=auth
+        ) as client:
+            return await client.get("https://example.com")
+
+    response = asyncio.run(run())
+
+    assert response.status_code == 200
+    assert seen == ["Bearer token-1", "Bearer token-2"]
+
+
+def test_rest_api_uses_oauth2_for_oauth2_config(rsa_key):
+    cache = OAuth2TokenCache()
+    rest_api = NetSuiteRestApi(_make_config(rsa_key), token_cache=cache)
+
+    assert isinstance(rest_api._auth, OAuth2ClientCredentials)
+    assert rest_api._auth.token_cache is cache
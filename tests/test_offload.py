@@ -0,0 +1,37 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from netsuite import json
+from netsuite.offload import Offloader
+
+
+def test_offloader_runs_large_payloads_in_executor():
+    offloader = Offloader(threshold=10, executor=ThreadPoolExecutor(1))
+
+    async def run(data):
+        return await offloader.run(
+            len(data), lambda d: (json.loads(d), threading.get_ident()), data
+        )
+
+    small, small_thread = asyncio.run(run(b"[1]"))
+    large, large_thread = asyncio.run(run(b"[1, 2, 3, 4, 5]"))
+
+    assert small == [1]
+    assert large == [1, 2, 3, 4, 5]
+    assert small_thread == threading.get_ident()
+    assert large_thread != threading.get_ident()
+    stats = offloader.stats
+    assert (stats.inline_calls, stats.inline_bytes) == (1, 3)
+    assert (stats.offloaded_calls, stats.offloaded_bytes) == (1, 15)
+    assert stats.offloaded_seconds > 0
+
+
+def test_offloader_without_threshold_runs_inline():
+    offloader = Offloader()
+
+    result = asyncio.run(offloader.run(10**9, json.loads, b"{}"))
+
+    assert result == {}
+    assert offloader.stats.offloaded_calls == 0
+    assert offloader.stats.inline_calls == 1
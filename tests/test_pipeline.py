@@ -0,0 +1,100 @@
+import asyncio
+
+import httpx
+import pytest
+
+from netsuite import NetSuite, Pipeline, suiteql_rows
+
+
+def test_items_flow_through_stages_in_batches():
+    batches = []
+
+    async def double(item):
+        await asyncio.sleep(0)
+        return item * 2
+
+    stats = asyncio.run(
+        Pipeline(range(10))
+        .filter(lambda item: item % 5)
+        .map(double, workers=3)
+        .batch(3)
+        .sink(batches.append)
+    )
+
+    flattened = sorted(item for batch in batches for item in batch)
+    assert flattened == [i * 2 for i in range(10) if i % 5]
+    assert [len(batch) for batch in batches] == [3, 3, 2]
+    assert [stage.name for stage in stats] == [
+        "source",
+        "filter(<lambda>)",
+        "map(double)",
+        "batch(3)",
+        "sink(append)",
+    ]
+    assert [stage.items_out for stage in stats] == [10, 8, 8, 3, 3]
+
+
+def test_slow_sink_holds_back_the_source():
+    produced = []
+
+    async def source():
+        for i in range(20):
+            produced.append(i)
+            yield i
+
+    async def slow_sink(item):
+        await asyncio.sleep(0.01)
+        # The source can't be more than the queue sizes ahead
+        assert len(produced) - int(item) <= 2 + 2 + 3
+
+    stats = asyncio.run(Pipeline(source(), queue_size=2).map(str).sink(slow_sink))
+
+    assert stats[-1].items_in == 20
+    assert stats[-1].max_queue_fill == 1.0
+    assert stats[-1].throughput > 0
+
+
+def test_stage_errors_stop_the_pipeline():
+    def explode(item):
+        if item == 3:
+            raise ValueError(item)
+        return item
+
+    pipeline = Pipeline(iter(range(1000))).map(explode, workers=2)
+    with pytest.raises(ValueError):
+        asyncio.run(pipeline.sink(lambda item: None))
+    with pytest.raises(RuntimeError):
+        asyncio.run(pipeline.sink(print))
+
+
+def test_suiteql_source_pages_through_rows(dummy_config):
+    offsets = []
+
+    def handler(request):
+        limit = int(request.url.params["limit"])
+        offset = int(request.url.params["offset"])
+        offsets.append(offset)
+        items = [{"id": i} for i in range(offset, min(offset + limit, 5))]
+        return httpx.Response(200, json={"items": items, "hasMore": offset + limit < 5})
+
+    ns = NetSuite(
+        dummy_config,
+        rest_api_options={
+            "http_client": httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        },
+    )
+    rows, paged_rows = [], []
+
+    asyncio.run(ns.pipeline("SELECT id FROM customer").sink(rows.append))
+    source = suiteql_rows(ns.rest_api, "SELECT id FROM customer", page_size=2)
+    asyncio.run(Pipeline(source).sink(paged_rows.append))
+
+    assert offsets == [0, 0, 2, 4]
+    assert rows == paged_rows == [{"id": i} for i in range(5)]
+
+
+def test_unbounded_queues_are_rejected():
+    with pytest.raises(ValueError):
+        Pipeline(range(3), queue_size=0)
+    with pytest.raises(ValueError):
+        Pipeline(range(3)).map(str, queue_size=0)
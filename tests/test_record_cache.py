@@ -0,0 +1,127 @@
+import asyncio
+
+import httpx
+import pytest
+
+from netsuite import NetSuiteRestApi, RecordCache
+
+
+class FakeAccount:
+    """Records and their versions, counting requests"""
+
+    def __init__(self):
+        self.versions = {1: "v1", 2: "v1", 3: "v1"}
+        self.fetched = []
+        self.queries = []
+
+    async def fetch(self, ids):
+        self.fetched.append(ids)
+        return {id_: {"id": id_, "version": self.versions[id_]} for id_ in ids}
+
+    async def suiteql(self, q, limit):
+        self.queries.append(q)
+        return {
+            "items": [
+                {"id": str(id_), "version": version}
+                for id_, version in self.versions.items()
+                if str(id_) in q
+            ]
+        }
+
+
+def _get_many(cache, account, ids):
+    return asyncio.run(
+        cache.get_many("acct", "item", ids, account.fetch, account.suiteql)
+    )
+
+
+def test_fresh_records_are_served_from_memory():
+    cache, account = RecordCache(), FakeAccount()
+
+    first = _get_many(cache, account, [1, 2])
+    first[1]["id"] = "changed"
+    second = _get_many(cache, account, [1, 2])
+
+    assert account.fetched == [[1, 2]]
+    assert second == {1: {"id": 1, "version": "v1"}, 2: {"id": 2, "version": "v1"}}
+    assert cache.stats.hits == 2
+    assert cache.stats.misses == 2
+
+
+def test_stale_records_are_revalidated_with_one_query():
+    cache, account = RecordCache(ttl=0), FakeAccount()
+    _get_many(cache, account, [1, 2, 3])
+    account.versions[2] = "v2"
+    account.queries.clear()
+
+    records = _get_many(cache, account, [1, 2, 3])
+
+    assert len(account.queries) == 1
+    assert account.fetched == [[1, 2, 3], [2]]
+    assert records[2]["version"] == "v2"
+    assert cache.stats.revalidated == 2
+    assert cache.stats.changed == 1
+
+
+def test_least_recently_used_records_are_evicted_above_budget():
+    cache, account = RecordCache(), FakeAccount()
+    _get_many(cache, account, [1])
+    cache.max_bytes = cache.size * 2
+    _get_many(cache, account, [2])
+    _get_many(cache, account, [1])
+    _get_many(cache, account, [3])
+
+    assert cache.stats.evictions == 1
+    _get_many(cache, account, [1])
+    assert account.fetched == [[1], [2], [3]]
+
+
+def test_sqlite_tier_survives_restarts(tmp_path):
+    account = FakeAccount()
+    _get_many(RecordCache(sqlite_path=tmp_path / "records.db"), account, [1])
+
+    cache = RecordCache(sqlite_path=tmp_path / "records.db")
+    records = _get_many(cache, account, [1])
+
+    assert records == {1: {"id": 1, "version": "v1"}}
+    assert account.fetched == [[1]]
+    assert cache.stats.sqlite_hits == 1
+
+
+def test_rest_api_caches_record_gets(dummy_config):
+    requests = []
+
+    def handler(request):
+        requests.append((request.method, request.url.path))
+        if request.url.path.endswith("suiteql"):
+            return httpx.Response(200, json={"items": [{"id": "5", "version": "x"}]})
+        return httpx.Response(200, json={"id": "5", "companyName": "ACME"})
+
+    cache = RecordCache(ttl=0)
+    rest_api = NetSuiteRestApi(
+        dummy_config,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        record_cache=cache,
+    )
+
+    async def run():
+        return [await rest_api.get("/record/v1/customer/5") for _ in range(3)]
+
+    records = asyncio.run(run())
+
+    assert records[2] == {"id": "5", "companyName": "ACME"}
+    assert requests.count(("GET", "/services/rest/record/v1/customer/5")) == 1
+    assert requests.count(("POST", "/services/rest/query/v1/suiteql")) == 3
+    assert cache.stats.revalidated == 2
+
+
+@pytest.mark.parametrize("response_mode", ["zeep", "json"])
+def test_soap_api_record_cache_requires_builtin_mode(dummy_config, response_mode):
+    soap_api = pytest.importorskip("netsuite.soap_api")
+    if not soap_api.zeep.ZEEP_INSTALLED:
+        pytest.skip("Requires zeep")
+
+    with pytest.raises(ValueError):
+        soap_api.NetSuiteSoapApi(
+            dummy_config, response_mode=response_mode, record_cache=RecordCache()
+        )
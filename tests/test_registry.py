@@ -0,0 +1,98 @@
+import asyncio
+
+import httpx
+import pytest
+
+from netsuite import ClientRegistry, Config
+from netsuite.soap_api.zeep import ZEEP_INSTALLED
+
+from .conftest import FIXTURES_DIR, soap_response
+from .test_soap_api import GET_LIST_RESPONSE_BODY
+
+
+def _config(account, dummy_config):
+    return Config(account=account, auth=dummy_config.auth)
+
+
+@pytest.fixture
+def registry(dummy_config):
+    registry = ClientRegistry(max_clients=2)
+    for account in ("111", "222", "333"):
+        registry.register(_config(account, dummy_config))
+    return registry
+
+
+def test_least_recently_used_clients_are_evicted(registry):
+    first = registry.get("111")
+    registry.get("222")
+    assert registry.get("111") is first
+
+    registry.get("333")
+
+    assert registry.active_accounts == ["111", "333"]
+    assert registry.evicted == 1
+    assert registry.get("222") is not None
+    assert registry.created == 4
+
+
+def test_idle_clients_are_evicted(registry, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("netsuite.registry.time.monotonic", lambda: now[0])
+    registry.idle_timeout = 60
+    registry.get("111")
+    now[0] += 30
+    registry.get("222")
+    now[0] += 40
+
+    assert registry.evict() == ["111"]
+    assert registry.active_accounts == ["222"]
+
+
+def test_clients_share_http_pool_with_per_account_limits(registry, dummy_config):
+    registry.register(_config("333", dummy_config), concurrent_requests=3)
+
+    first, second = registry.get("111"), registry.get("333")
+
+    assert first.rest_api._http_client is second.restlet._http_client
+    assert first.rest_api._concurrent_requests == 10
+    assert second.rest_api._concurrent_requests == 3
+    assert second.restlet._concurrent_requests == 3
+
+
+def test_unknown_account_raises(registry):
+    with pytest.raises(KeyError):
+        registry.get("444")
+
+
+@pytest.mark.skipif(not ZEEP_INSTALLED, reason="Requires zeep")
+def test_soap_clients_share_parsed_wsdl(dummy_config):
+    import zeep
+
+    hosts = []
+
+    def handler(request):
+        hosts.append(request.url.host)
+        return soap_response(GET_LIST_RESPONSE_BODY)
+
+    cache = zeep.cache.InMemoryCache()
+    registry = ClientRegistry(soap_api_options={"cache": cache})
+    registry._soap_http_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler)
+    )
+    for account in ("111", "222"):
+        registry.register(_config(account, dummy_config))
+    first, second = registry.get("111").soap_api, registry.get("222").soap_api
+    cache.add(first.wsdl_url, (FIXTURES_DIR / "netsuite.wsdl").read_bytes())
+
+    async def run():
+        async with registry:
+            await first.getList("customer", internalIds=[1])
+            await second.getList("customer", internalIds=[1])
+
+    asyncio.run(run())
+
+    assert first.client.wsdl is second.client.wsdl
+    assert hosts == [
+        "111.suitetalk.api.netsuite.com",
+        "222.suitetalk.api.netsuite.com",
+    ]
@@ -1,6 +1,94 @@
-from netsuite import NetSuiteRestApi
+import asyncio
+
+import httpx
+
+from netsuite import NetSuiteRestApi, deadline
+from netsuite.exceptions import DeadlineExceeded
 
 
 def test_expected_hostname(dummy_config):
     rest_api = NetSuiteRestApi(dummy_config)
     assert rest_api.hostname == "123456-sb1.suitetalk.api.netsuite.com"
+
+
+def _counting_rest_api(config, **kw):
+    requests = []
+
+    async def handler(request):
+        requests.append((request.method, request.url.path))
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"id": "123", "items": [1, 2]})
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return NetSuiteRestApi(config, http_client=http_client, **kw), requests
+
+
+def test_identical_concurrent_reads_are_coalesced(dummy_config):
+    rest_api, requests = _counting_rest_api(dummy_config, coalesce_reads=True)
+
+    async def run():
+        return await asyncio.gather(
+            rest_api.get("/record/v1/item/123"),
+            rest_api.get("/record/v1/item/123"),
+            rest_api.get("/record/v1/item/456"),
+            rest_api.suiteql("SELECT id FROM item"),
+            rest_api.suiteql("SELECT id FROM item"),
+            rest_api.post("/record/v1/item", json={}),
+            rest_api.post("/record/v1/item", json={}),
+        )
+
+    results = asyncio.run(run())
+
+    assert requests.count(("GET", "/services/rest/record/v1/item/123")) == 1
+    assert requests.count(("POST", "/services/rest/query/v1/suiteql")) == 1
+    assert requests.count(("POST", "/services/rest/record/v1/item")) == 2
+    assert len(requests) == 5
+    assert rest_api.coalesced_requests == 2
+    # Every caller gets its own copy
+    assert results[0] == results[1]
+    results[0]["items"].append(3)
+    assert results[1]["items"] == [1, 2]
+
+
+def test_reads_are_not_coalesced_by_default(dummy_config):
+    rest_api, requests = _counting_rest_api(dummy_config)
+
+    async def run():
+        await asyncio.gather(
+            rest_api.get("/record/v1/item/123"),
+            rest_api.get("/record/v1/item/123"),
+        )
+
+    asyncio.run(run())
+
+    assert len(requests) == 2
+
+
+def test_coalesced_read_outlives_the_deadline_of_its_first_caller(dummy_config):
+    read_timeouts = []
+
+    async def handler(request):
+        read_timeouts.append(request.extensions["timeout"]["read"])
+        await asyncio.sleep(0.1)
+        return httpx.Response(200, json={"id": "123"})
+
+    rest_api = NetSuiteRestApi(
+        dummy_config,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        coalesce_reads=True,
+    )
+
+    async def get(seconds):
+        with deadline(seconds):
+            return await rest_api.get("/record/v1/item/123")
+
+    async def run():
+        return await asyncio.gather(get(0.05), get(1), return_exceptions=True)
+
+    short, long = asyncio.run(run())
+
+    assert isinstance(short, DeadlineExceeded)
+    assert long == {"id": "123"}
+    assert rest_api.coalesced_requests == 1
+    # Not capped by the first caller's deadline
+    assert read_timeouts == [60]
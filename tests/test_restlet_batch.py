@@ -0,0 +1,121 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from netsuite import NetSuiteRestlet, RestletBatchStub, RestletMultiplexer
+from netsuite.exceptions import RestletBatchError
+
+
+def _restlet(dummy_config, stub):
+    return NetSuiteRestlet(dummy_config, http_client=httpx.AsyncClient(transport=stub))
+
+
+def test_concurrent_calls_share_one_request(dummy_config):
+    stub = RestletBatchStub(lambda script_id, deploy, body: body * script_id)
+
+    async def run():
+        mux = RestletMultiplexer(_restlet(dummy_config, stub))
+        results = await asyncio.gather(
+            *(mux.post(2, i) for i in range(5)), mux.post(3, 1, deploy=2)
+        )
+        return mux, results
+
+    mux, results = asyncio.run(run())
+
+    assert results == [0, 2, 4, 6, 8, 3]
+    assert stub.requests == mux.batches == 2
+    assert mux.calls == 6
+
+
+def test_batches_are_split_at_max_size(dummy_config):
+    stub = RestletBatchStub(lambda script_id, deploy, body: body)
+
+    async def run():
+        mux = RestletMultiplexer(_restlet(dummy_config, stub), max_batch_size=2)
+        return await asyncio.gather(*(mux.post(1, i) for i in range(5)))
+
+    assert asyncio.run(run()) == [0, 1, 2, 3, 4]
+    assert stub.requests == 3
+
+
+def test_errors_only_fail_their_own_call(dummy_config):
+    def handler(script_id, deploy, body):
+        if body == "bad":
+            raise ValueError("Invalid item")
+        return "ok"
+
+    stub = RestletBatchStub(handler)
+
+    async def run():
+        mux = RestletMultiplexer(_restlet(dummy_config, stub))
+        return await asyncio.gather(
+            mux.post(1, "good"), mux.post(1, "bad"), return_exceptions=True
+        )
+
+    good, bad = asyncio.run(run())
+
+    assert good == "ok"
+    assert isinstance(bad, RestletBatchError)
+    assert (bad.code, bad.message) == ("ValueError", "Invalid item")
+    assert stub.requests == 1
+
+
+def test_failed_request_fails_all_calls(dummy_config):
+    transport = httpx.MockTransport(lambda request: httpx.Response(500, json={}))
+
+    async def run():
+        mux = RestletMultiplexer(_restlet(dummy_config, transport))
+        return await asyncio.gather(
+            mux.post(1, "a"), mux.post(1, "b"), return_exceptions=True
+        )
+
+    errors = asyncio.run(run())
+
+    assert all(isinstance(error, Exception) for error in errors)
+    assert not any(isinstance(error, RestletBatchError) for error in errors)
+
+
+def test_invalid_sizes_are_rejected():
+    with pytest.raises(ValueError):
+        RestletMultiplexer(None, max_batch_size=0)
+    with pytest.raises(ValueError):
+        RestletMultiplexer(None, max_pending=0)
+
+
+def test_pending_calls_are_bounded_and_flushed_on_close(dummy_config):
+    in_request = []
+
+    async def handler(request):
+        in_request.append(len(json.loads(request.content)["batch"]))
+        await asyncio.sleep(0.01)
+        batch = json.loads(request.content)["batch"]
+        return httpx.Response(
+            200, json={"batch": [{"id": e["id"], "body": e["body"]} for e in batch]}
+        )
+
+    transport = httpx.MockTransport(handler)
+
+    async def run():
+        async with RestletMultiplexer(
+            _restlet(dummy_config, transport),
+            window=10,
+            max_batch_size=2,
+            max_pending=2,
+        ) as mux:
+            calls = [asyncio.ensure_future(mux.post(1, i)) for i in range(3)]
+            await asyncio.sleep(0.005)
+            # Two calls fill a batch, the third waits for it to be done
+            assert mux._buffered == 0
+            assert in_request == [2]
+            await asyncio.gather(*calls[:2])
+            await asyncio.sleep(0)
+            assert mux._buffered == 1
+        with pytest.raises(RuntimeError):
+            await mux.post(1, 3)
+        return await asyncio.gather(*calls)
+
+    # Closing sends the last call without waiting for the window
+    assert asyncio.run(asyncio.wait_for(run(), 1)) == [0, 1, 2]
+    assert in_request == [2, 1]
@@ -0,0 +1,104 @@
+import asyncio
+
+import httpx
+import pytest
+
+from netsuite import NetSuiteRestApi, PriorityScheduler, priority
+
+
+async def _run_queued(scheduler, priorities):
+    """Queue requests behind a held slot, returning the order they run in"""
+    order = []
+
+    async def request(name):
+        async with scheduler.slot(name):
+            order.append(name)
+            await asyncio.sleep(0)
+
+    held = await scheduler.acquire(priorities[0])
+    tasks = [asyncio.ensure_future(request(name)) for name in priorities]
+    await asyncio.sleep(0)
+    scheduler.release(held)
+    await asyncio.gather(*tasks)
+    return order
+
+
+def test_waiting_requests_are_let_through_by_weight():
+    scheduler = PriorityScheduler(1, weights={"high": 3, "low": 1})
+
+    order = asyncio.run(_run_queued(scheduler, ["low"] * 4 + ["high"] * 6))
+
+    # Queued first, but low priority requests only get one in four slots
+    assert order[:8] == ["high"] * 3 + ["low"] + ["high"] * 3 + ["low"]
+    assert order.count("low") == 4
+    assert scheduler.stats["low"].waited == 4
+    assert scheduler.stats["low"].max_queue_depth == 4
+    assert scheduler.stats["low"].queue_depth == 0
+
+
+def test_reserved_slots_are_kept_free_for_their_class():
+    scheduler = PriorityScheduler(2, reserved={"high": 1})
+
+    async def run():
+        first = await scheduler.acquire("low")
+        second = asyncio.ensure_future(scheduler.acquire("low"))
+        await asyncio.sleep(0)
+        queued = not second.done()
+        # Doesn't wait, although a low priority request is queued
+        high = await scheduler.acquire("high")
+        scheduler.release(first)
+        await second
+        scheduler.release(high)
+        scheduler.release("low")
+        return queued
+
+    assert asyncio.run(run())
+    assert scheduler.stats["high"].waited == 0
+    assert scheduler.stats["low"].waited == 1
+
+
+def test_cancelled_waiters_give_up_their_place():
+    scheduler = PriorityScheduler(1)
+
+    async def run():
+        held = await scheduler.acquire()
+        waiter = asyncio.ensure_future(scheduler.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        scheduler.release(held)
+        await scheduler.acquire()
+
+    asyncio.run(run())
+
+    stats = scheduler.stats["normal"]
+    assert stats.queue_depth == 0
+    assert stats.in_flight == 1
+
+
+def test_unknown_priority_is_rejected():
+    with pytest.raises(ValueError):
+        asyncio.run(PriorityScheduler(1).acquire("urgent"))
+
+
+def test_rest_api_requests_use_their_priority(dummy_config):
+    async def handler(request):
+        return httpx.Response(200, json={})
+
+    rest_api = NetSuiteRestApi(
+        dummy_config,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    async def run():
+        await rest_api.get("/record/v1/customer/1", priority="high")
+        with priority("low"):
+            await rest_api.get("/record/v1/customer/1")
+            await rest_api.get("/record/v1/customer/2")
+
+    asyncio.run(run())
+
+    assert rest_api.priority_stats["high"].requests == 1
+    assert rest_api.priority_stats["low"].requests == 2
+    assert rest_api.priority_stats["normal"].requests == 0
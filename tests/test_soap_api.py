@@ -1,7 +1,18 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
 import pytest
 
-from netsuite import NetSuiteSoapApi
-from netsuite.soap_api.zeep import ZEEP_INSTALLED
+from netsuite import AsyncJob, NetsuiteResponseError, NetSuiteSoapApi, RecordCache, json
+from netsuite.exceptions import DeadlineExceeded
+from netsuite.soap_api import helpers, passport
+from netsuite.soap_api.zeep import ZEEP_INSTALLED, etree
+
+from .conftest import soap_response
 
 pytestmark = pytest.mark.skipif(not ZEEP_INSTALLED, reason="Requires zeep")
 
@@ -22,3 +33,398 @@ def test_netsuite_wsdl_url(dummy_config):
 def test_netsuite_transport_initialization(dummy_config):
     soap_api = NetSuiteSoapApi(dummy_config)
     soap_api._generate_transport()
+
+
+def _write_response(record, *, is_success=True):
+    return {
+        "status": {
+            "isSuccess": is_success,
+            "statusDetail": None if is_success else [{"code": "INVALID_FLD_VALUE"}],
+        },
+        "baseRef": {"internalId": str(record["id"])} if is_success else None,
+    }
+
+
+def test_write_list_chunks_records_and_reports_per_record_status(dummy_config):
+    soap_api = NetSuiteSoapApi(dummy_config)
+    calls = []
+
+    async def fake_request(service_name, **kw):
+        calls.append((service_name, len(kw["record"])))
+        return {
+            "body": {
+                "writeResponseList": {
+                    "status": None,
+                    "writeResponse": [
+                        _write_response(record, is_success=record["id"] != 3)
+                        for record in kw["record"]
+                    ],
+                }
+            }
+        }
+
+    soap_api.request = fake_request
+    records = ({"id": i} for i in range(5))
+    result = asyncio.run(soap_api.upsertList(records, chunk_size=2))
+
+    assert calls == [("upsertList", 2), ("upsertList", 2), ("upsertList", 1)]
+    assert len(result) == 5
+    assert not result.is_success
+    assert [r.record["id"] for r in result.failed] == [3]
+    assert [ref["internalId"] for ref in result.base_refs] == ["0", "1", "2", "4"]
+    with pytest.raises(NetsuiteResponseError):
+        result.raise_for_status()
+
+
+def test_async_job_polls_status_and_pages_through_search_results():
+    statuses = iter(["processing", "processing", "finished"])
+    requested_pages = []
+
+    class FakeSoapApi:
+        async def checkAsyncStatus(self, jobId):
+            return {
+                "jobId": jobId,
+                "status": next(statuses),
+                "percentCompleted": 50.0,
+                "estRemainingDuration": 1.0,
+            }
+
+        async def getAsyncResult(self, jobId, pageIndex):
+            requested_pages.append(pageIndex)
+            return {
+                "searchResult": {
+                    "status": {"isSuccess": True, "statusDetail": None},
+                    "totalPages": 2,
+                    "recordList": {"record": [f"{pageIndex}a", f"{pageIndex}b"]},
+                }
+            }
+
+    async def run():
+        job = AsyncJob(FakeSoapApi(), "JOB1", status="pending")
+        await job.wait(poll_interval=0.001, backoff=1.0)
+        assert job.is_success
+        return [record async for record in job.results()]
+
+    assert asyncio.run(run()) == ["1a", "1b", "2a", "2b"]
+    assert requested_pages == [1, 2]
+
+
+def test_token_passport_is_cached_and_correctly_signed(dummy_config):
+    soap_api = NetSuiteSoapApi(dummy_config)
+    token_passport = passport.get_passport(soap_api, dummy_config)
+    assert passport.get_passport(soap_api, dummy_config) is token_passport
+
+    element = token_passport.get_xml_element()
+    values = {etree.QName(child).localname: child.text for child in element}
+    auth = dummy_config.auth
+    message = "&".join(
+        (
+            dummy_config.account,
+            auth.consumer_key,
+            auth.token_id,
+            values["nonce"],
+            values["timestamp"],
+        )
+    )
+    key = f"{auth.consumer_secret}&{auth.token_secret}"
+    expected = hmac.new(key.encode(), message.encode(), hashlib.sha256).digest()
+
+    assert etree.QName(element).localname == "tokenPassport"
+    assert len(values["nonce"]) == 20
+    assert values["signature"] == base64.b64encode(expected).decode()
+    assert token_passport.get_xml_element()[3].text != values["nonce"]
+
+
+GET_LIST_RESPONSE_BODY = """
+<getListResponse xmlns="urn:messages_2021_1.platform.webservices.netsuite.com">
+  <platformCore:readResponseList xmlns:platformCore="urn:core_2021_1.platform.webservices.netsuite.com">
+    <platformCore:status isSuccess="true"/>
+    <platformCore:readResponse>
+      <platformCore:status isSuccess="true"/>
+      <platformCore:record internalId="1" externalId="C1" xsi:type="listRel:Customer"
+          xmlns:listRel="urn:relationships_2021_1.lists.webservices.netsuite.com">
+        <listRel:entityId>Customer 1</listRel:entityId>
+        <listRel:isPerson>false</listRel:isPerson>
+        <listRel:balance>1234.5</listRel:balance>
+        <listRel:dateCreated>2021-03-04T05:06:07.000-08:00</listRel:dateCreated>
+        <listRel:subsidiary internalId="1" type="subsidiary">
+          <platformCore:name>Parent Company</platformCore:name>
+        </listRel:subsidiary>
+      </platformCore:record>
+    </platformCore:readResponse>
+    <platformCore:readResponse>
+      <platformCore:status isSuccess="true"/>
+      <platformCore:record internalId="2" xsi:type="tranSales:SalesOrder"
+          xmlns:tranSales="urn:sales_2021_1.transactions.webservices.netsuite.com">
+        <tranSales:tranId>SO2</tranSales:tranId>
+        <tranSales:itemList>
+          <tranSales:item>
+            <tranSales:item internalId="10"/>
+            <tranSales:line>1</tranSales:line>
+            <tranSales:quantity>2.0</tranSales:quantity>
+          </tranSales:item>
+          <tranSales:item>
+            <tranSales:line>2</tranSales:line>
+            <tranSales:description xsi:nil="true"/>
+          </tranSales:item>
+        </tranSales:itemList>
+      </platformCore:record>
+    </platformCore:readResponse>
+  </platformCore:readResponseList>
+</getListResponse>
+"""
+
+
+@pytest.mark.parametrize("response_mode", ["builtin", "json"])
+def test_response_modes_match_zeep_serialization(make_soap_api, response_mode):
+    def handler(request):
+        return soap_response(GET_LIST_RESPONSE_BODY)
+
+    async def get_list(soap_api):
+        return await soap_api.getList("customer", internalIds=[1, 2])
+
+    zeep_result = helpers.to_builtin(asyncio.run(get_list(make_soap_api(handler))))
+    result = asyncio.run(get_list(make_soap_api(handler, response_mode=response_mode)))
+
+    if response_mode == "json":
+        assert isinstance(result, bytes)
+        assert result == json.dumps(zeep_result).encode("utf-8")
+    else:
+        assert result == zeep_result
+    assert zeep_result[0]["balance"] == 1234.5
+    assert zeep_result[1]["itemList"]["item"][0]["line"] == 1
+
+
+def _search_response_body(tag, page_index, total_pages, internal_ids):
+    records = "".join(
+        f"""
+        <platformCore:record internalId="{internal_id}" xsi:type="listRel:Customer"
+            xmlns:listRel="urn:relationships_2021_1.lists.webservices.netsuite.com">
+          <listRel:entityId>Customer {internal_id}</listRel:entityId>
+          <listRel:balance>{internal_id}.5</listRel:balance>
+        </platformCore:record>"""
+        for internal_id in internal_ids
+    )
+    return f"""
+<{tag} xmlns="urn:messages_2021_1.platform.webservices.netsuite.com">
+  <platformCore:searchResult xmlns:platformCore="urn:core_2021_1.platform.webservices.netsuite.com">
+    <platformCore:status isSuccess="true"/>
+    <platformCore:totalRecords>3</platformCore:totalRecords>
+    <platformCore:pageSize>2</platformCore:pageSize>
+    <platformCore:totalPages>{total_pages}</platformCore:totalPages>
+    <platformCore:pageIndex>{page_index}</platformCore:pageIndex>
+    <platformCore:searchId>SEARCH-1</platformCore:searchId>
+    <platformCore:recordList>{records}</platformCore:recordList>
+  </platformCore:searchResult>
+</{tag}>
+"""
+
+
+@pytest.mark.parametrize("response_mode", ["zeep", "builtin"])
+def test_stream_search_yields_records_from_all_pages(make_soap_api, response_mode):
+    requests = []
+
+    def handler(request):
+        requests.append(request.headers["SOAPAction"].strip('"'))
+        if len(requests) == 1:
+            body = _search_response_body("searchResponse", 1, 2, [1, 2])
+        else:
+            assert b"SEARCH-1" in request.content
+            body = _search_response_body("searchMoreWithIdResponse", 2, 2, [3])
+        return soap_response(body)
+
+    soap_api = make_soap_api(handler, response_mode=response_mode)
+
+    async def stream():
+        search_record = soap_api.client.get_type(
+            "{urn:relationships_2021_1.lists.webservices.netsuite.com}CustomerSearch"
+        )()
+        return [record async for record in soap_api.stream_search(search_record)]
+
+    records = asyncio.run(stream())
+
+    assert requests == ["search", "searchMoreWithId"]
+    assert [record["internalId"] for record in records] == ["1", "2", "3"]
+    assert [record["balance"] for record in records] == [1.5, 2.5, 3.5]
+    if response_mode == "builtin":
+        assert isinstance(records[0], dict)
+
+
+@pytest.mark.parametrize("response_mode", ["zeep", "builtin"])
+def test_stream_search_yields_rows_of_searches_returning_columns(
+    make_soap_api, response_mode
+):
+    rows = "".join(
+        f"""
+        <platformCore:searchRow xsi:type="listRel:CustomerSearchRow"
+            xmlns:listRel="urn:relationships_2021_1.lists.webservices.netsuite.com">
+          <listRel:basic>
+            <listRel:entityId>
+              <platformCore:searchValue>Customer {internal_id}</platformCore:searchValue>
+            </listRel:entityId>
+          </listRel:basic>
+        </platformCore:searchRow>"""
+        for internal_id in (1, 2)
+    )
+    body = f"""
+<searchResponse xmlns="urn:messages_2021_1.platform.webservices.netsuite.com">
+  <platformCore:searchResult xmlns:platformCore="urn:core_2021_1.platform.webservices.netsuite.com">
+    <platformCore:status isSuccess="true"/>
+    <platformCore:totalRecords>2</platformCore:totalRecords>
+    <platformCore:totalPages>1</platformCore:totalPages>
+    <platformCore:searchRowList>{rows}</platformCore:searchRowList>
+  </platformCore:searchResult>
+</searchResponse>
+"""
+    soap_api = make_soap_api(
+        lambda request: soap_response(body), response_mode=response_mode
+    )
+
+    async def stream():
+        search_record = soap_api.client.get_type(
+            "{urn:relationships_2021_1.lists.webservices.netsuite.com}CustomerSearch"
+        )()
+        return [row async for row in soap_api.stream_search(search_record)]
+
+    rows = asyncio.run(stream())
+
+    assert [row["basic"]["entityId"][0]["searchValue"] for row in rows] == [
+        "Customer 1",
+        "Customer 2",
+    ]
+
+
+@pytest.mark.parametrize("response_mode", ["zeep", "builtin"])
+def test_large_responses_are_parsed_off_the_event_loop(make_soap_api, response_mode):
+    def handler(request):
+        return soap_response(GET_LIST_RESPONSE_BODY)
+
+    soap_api = make_soap_api(
+        handler, response_mode=response_mode, offload_threshold=1024
+    )
+    result = asyncio.run(soap_api.getList("customer", internalIds=[1, 2]))
+
+    assert helpers.to_builtin(result)[0]["balance"] == 1234.5
+    assert soap_api.offload_stats.offloaded_calls == 1
+
+
+def test_get_list_reads_through_record_cache(make_soap_api):
+    requested_ids = []
+
+    def handler(request):
+        requested_ids.append(request.read().count(b"internalId="))
+        return soap_response(GET_LIST_RESPONSE_BODY)
+
+    async def suiteql(q, limit):
+        return {"items": [{"id": "1", "version": "x"}, {"id": "2", "version": "x"}]}
+
+    cache = RecordCache(ttl=0)
+    soap_api = make_soap_api(handler, response_mode="builtin", record_cache=cache)
+    soap_api.__dict__["_suiteql_api"] = type("FakeRestApi", (), {"suiteql": suiteql})
+
+    async def get_lists():
+        first = await soap_api.getList("customer", internalIds=[1, 2])
+        second = await soap_api.getList("customer", internalIds=[2, 1])
+        single = await soap_api.get("customer", internalId=2)
+        return first, second, single
+
+    first, second, single = asyncio.run(get_lists())
+
+    assert requested_ids == [2]
+    assert second == first[::-1]
+    assert single == first[1]
+    assert cache.stats.revalidated == 3
+
+
+UPDATE_RESPONSE_BODY = """
+<updateResponse xmlns="urn:messages_2021_1.platform.webservices.netsuite.com">
+  <writeResponse>
+    <platformCore:status isSuccess="true"
+        xmlns:platformCore="urn:core_2021_1.platform.webservices.netsuite.com"/>
+    <baseRef internalId="1" type="customer" xsi:type="platformCore:RecordRef"
+        xmlns:platformCore="urn:core_2021_1.platform.webservices.netsuite.com"/>
+  </writeResponse>
+</updateResponse>
+"""
+
+
+def test_soap_writes_invalidate_record_cache(make_soap_api):
+    actions = []
+
+    def handler(request):
+        action = request.headers["SOAPAction"].strip('"')
+        actions.append(action)
+        if action == "update":
+            return soap_response(UPDATE_RESPONSE_BODY)
+        return soap_response(GET_LIST_RESPONSE_BODY)
+
+    cache = RecordCache(ttl=600)
+    soap_api = make_soap_api(handler, response_mode="builtin", record_cache=cache)
+
+    async def run():
+        await soap_api.getList("customer", internalIds=[1])
+        await soap_api.getList("customer", internalIds=[1])
+        await soap_api.update(soap_api.Relationships.Customer(internalId="1"))
+        # Fetched again, rather than served from the cache
+        await soap_api.getList("customer", internalIds=[1])
+
+    asyncio.run(run())
+
+    assert actions == ["getList", "update", "getList"]
+
+
+def test_write_list_keeps_results_of_chunks_written_before_an_error(dummy_config):
+    soap_api = NetSuiteSoapApi(dummy_config, concurrent_requests=2)
+    chunks_made, sent = [], []
+
+    def records():
+        for i in range(7):
+            if i % 2 == 0:
+                chunks_made.append(i)
+            yield {"id": i}
+
+    async def fake_request(service_name, **kw):
+        # Chunks are made as workers are free to send them, not all up front
+        if not sent:
+            assert len(chunks_made) <= 2
+        sent.append(kw["record"][0]["id"])
+        await asyncio.sleep(0)
+        if kw["record"][0]["id"] == 2:
+            raise httpx.ReadTimeout("Timed out")
+        return {
+            "body": {
+                "writeResponseList": {
+                    "status": None,
+                    "writeResponse": [_write_response(r) for r in kw["record"]],
+                }
+            }
+        }
+
+    soap_api.request = fake_request
+    result = asyncio.run(soap_api.addList(records(), chunk_size=2))
+
+    assert [r.record["id"] for r in result] == list(range(7))
+    assert [r.record["id"] for r in result.failed] == [2, 3]
+    assert isinstance(result[2].error, httpx.ReadTimeout)
+    assert result[2].status_details[0]["code"] == "ReadTimeout"
+    assert result[0].error is None and result[4].internal_id == "4"
+
+
+@pytest.mark.parametrize("error", [DeadlineExceeded(1), TypeError("Bug")])
+def test_write_list_raises_errors_other_than_request_failures(dummy_config, error):
+    soap_api = NetSuiteSoapApi(dummy_config)
+
+    async def fake_request(service_name, **kw):
+        raise error
+
+    soap_api.request = fake_request
+    with pytest.raises(type(error)):
+        asyncio.run(soap_api.addList([{"id": 1}]))
+
+
+def test_process_pool_offloading_is_rejected(dummy_config):
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        with pytest.raises(ValueError, match="thread pool"):
+            NetSuiteSoapApi(
+                dummy_config, offload_threshold=0, offload_executor=executor
+            )
@@ -0,0 +1,125 @@
+import asyncio
+import json
+from typing import Any, List
+
+import httpx
+import pytest
+
+from netsuite import JsonArrayStreamParser, NetSuiteRestApi, NetSuiteRestlet
+from netsuite.exceptions import NetsuiteAPIRequestError, NetsuiteAPIResponseParsingError
+
+ITEMS: List[Any] = [
+    {"id": 1, "name": 'a "quoted", [odd] name'},
+    None,
+    3.5,
+    [],
+    {"x": {}},
+]
+
+
+def _parse(body, key=None, chunk_size=3):
+    parser = JsonArrayStreamParser(key)
+    data = body.encode()
+    items = []
+    for i in range(0, len(data), chunk_size):
+        items.extend(parser.feed(data[i : i + chunk_size]))
+    return items + parser.close()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1000])
+def test_parser_yields_items_across_chunks(chunk_size):
+    body = json.dumps(ITEMS, ensure_ascii=False)
+    assert _parse(body, chunk_size=chunk_size) == ITEMS
+    collection = {"links": [], "key": "items", "items": ITEMS, "hasMore": False}
+    assert _parse(json.dumps(collection), key="items", chunk_size=chunk_size) == ITEMS
+    assert _parse("[12345]", chunk_size=chunk_size) == [12345]
+    assert _parse('{"items": []}', key="items", chunk_size=chunk_size) == []
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4])
+def test_parser_yields_numbers_split_across_chunks(chunk_size):
+    body = "[12.5, 1e5, 2.5E-3, -7, 3e+2, true]"
+    assert _parse(body, chunk_size=chunk_size) == [12.5, 1e5, 2.5e-3, -7, 300.0, True]
+
+
+def test_parser_holds_back_number_until_it_ends():
+    parser = JsonArrayStreamParser()
+    assert parser.feed(b"[12.") == []
+    assert parser.feed(b"5, 1") == [12.5]
+    assert parser.feed(b"e") == []
+    assert parser.feed(b"5]") == [1e5]
+    assert parser.close() == []
+
+
+@pytest.mark.parametrize(
+    "body,key",
+    [("[1, 2", None), ('{"items": [1]}', None), ('{"count": 1}', "items")],
+)
+def test_parser_rejects_other_bodies(body, key):
+    with pytest.raises(ValueError):
+        _parse(body, key=key)
+
+
+def _transport(body, status_code=200):
+    return httpx.MockTransport(
+        lambda request: httpx.Response(status_code, content=body.encode())
+    )
+
+
+def test_rest_api_streams_items(dummy_config):
+    body = json.dumps({"items": ITEMS})
+    rest_api = NetSuiteRestApi(
+        dummy_config, http_client=httpx.AsyncClient(transport=_transport(body))
+    )
+
+    async def run():
+        chunks = [c async for c in rest_api.stream("GET", "/x", chunk_size=4)]
+        items = [i async for i in rest_api.stream_items("GET", "/x", key="items")]
+        return chunks, items
+
+    chunks, items = asyncio.run(run())
+
+    assert b"".join(chunks) == body.encode()
+    assert max(len(chunk) for chunk in chunks) == 4
+    assert items == ITEMS
+    assert rest_api.priority_stats["normal"].in_flight == 0
+
+
+def test_restlet_streams_errors(dummy_config):
+    def restlet(body, status_code=200):
+        return NetSuiteRestlet(
+            dummy_config,
+            http_client=httpx.AsyncClient(transport=_transport(body, status_code)),
+        )
+
+    async def consume(restlet):
+        return [item async for item in restlet.stream_items(1)]
+
+    with pytest.raises(NetsuiteAPIResponseParsingError):
+        asyncio.run(consume(restlet('{"error": true}')))
+    with pytest.raises(NetsuiteAPIRequestError) as info:
+        asyncio.run(consume(restlet("Not found", 404)))
+    assert info.value.response_text == "Not found"
+
+
+def test_download_replaces_file_when_complete(dummy_config, tmp_path):
+    path = tmp_path / "export.json"
+    path.write_text("old")
+    restlet = NetSuiteRestlet(
+        dummy_config, http_client=httpx.AsyncClient(transport=_transport("[1, 2]"))
+    )
+
+    size = asyncio.run(restlet.download(1, path, deploy=2))
+
+    assert size == 6
+    assert path.read_text() == "[1, 2]"
+    assert list(tmp_path.iterdir()) == [path]
+
+    failing = NetSuiteRestlet(
+        dummy_config,
+        http_client=httpx.AsyncClient(transport=_transport("Oops", 500)),
+    )
+    with pytest.raises(NetsuiteAPIRequestError):
+        asyncio.run(failing.download(1, path))
+    assert path.read_text() == "[1, 2]"
+    assert list(tmp_path.iterdir()) == [path]
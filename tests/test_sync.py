@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from netsuite import SyncNetSuite, deadline
+from netsuite.exceptions import DeadlineExceeded, NetsuiteAPIRequestError
+from netsuite.soap_api.zeep import ZEEP_INSTALLED
+
+from .conftest import soap_response
+from .test_soap_api import GET_LIST_RESPONSE_BODY, _search_response_body
+
+
+def test_calls_from_many_threads_share_one_background_loop(dummy_config):
+    loop_threads = set()
+
+    def handler(request):
+        loop_threads.add(threading.current_thread().name)
+        return httpx.Response(200, json={"items": [], "q": request.read().decode()})
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with SyncNetSuite(
+        dummy_config, rest_api_options={"http_client": http_client}
+    ) as ns:
+        with ThreadPoolExecutor(8) as executor:
+            results = list(
+                executor.map(
+                    lambda i: ns.rest_api.suiteql(f"SELECT {i} FROM dual"), range(20)
+                )
+            )
+        stats = ns.ns.rest_api.priority_stats["normal"]
+
+    assert len(results) == 20
+    assert '"SELECT 7 FROM dual"' in results[7]["q"]
+    assert loop_threads == {"netsuite-123456_SB1"}
+    assert stats.requests == 20
+    assert stats.in_flight == 0
+
+
+def test_errors_are_raised_in_the_calling_thread(dummy_config):
+    def handler(request):
+        return httpx.Response(400, json={})
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with SyncNetSuite(
+        dummy_config, rest_api_options={"http_client": http_client}
+    ) as ns:
+        with pytest.raises(NetsuiteAPIRequestError):
+            ns.rest_api.get("/record/v1/customer/1")
+
+
+@pytest.mark.skipif(not ZEEP_INSTALLED, reason="Requires zeep")
+def test_soap_api_methods_and_streams_are_blocking(dummy_config, make_soap_api):
+    pages = iter(
+        [
+            _search_response_body("searchResponse", 1, 2, [1, 2]),
+            _search_response_body("searchMoreWithIdResponse", 2, 2, [3]),
+        ]
+    )
+
+    def handler(request):
+        if b"getList" in request.read():
+            return soap_response(GET_LIST_RESPONSE_BODY)
+        return soap_response(next(pages))
+
+    with SyncNetSuite(dummy_config) as ns:
+        ns.ns.__dict__["soap_api"] = make_soap_api(handler, response_mode="builtin")
+        records = ns.soap_api.getList("customer", internalIds=[1, 2])
+        search_record = ns.soap_api.client.get_type(
+            "{urn:relationships_2021_1.lists.webservices.netsuite.com}CustomerSearch"
+        )()
+        streamed = list(ns.soap_api.stream_search(search_record))
+
+    assert len(records) == 2
+    assert [record["internalId"] for record in streamed] == ["1", "2", "3"]
+
+
+def test_deadline_around_a_blocking_call_is_honored(dummy_config):
+    async def handler(request):
+        await asyncio.sleep(1)
+        return httpx.Response(200, json={})
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with SyncNetSuite(
+        dummy_config, rest_api_options={"http_client": http_client}
+    ) as ns:
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            with deadline(0.05):
+                ns.rest_api.get("/record/v1/customer/1")
+        assert time.monotonic() - start < 0.5
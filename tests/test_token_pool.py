@@ -0,0 +1,141 @@
+import asyncio
+import re
+
+import httpx
+import pytest
+
+from netsuite import Config, NetSuiteRestApi, TokenPool, TokenPoolAuth
+
+from .conftest import soap_response
+from .test_soap_api import GET_LIST_RESPONSE_BODY
+
+
+def _token(token_id, concurrent_requests=None):
+    return {
+        "consumer_key": "consumer-key",
+        "consumer_secret": "consumer-secret",
+        "token_id": token_id,
+        "token_secret": f"{token_id}-secret",
+        "concurrent_requests": concurrent_requests,
+    }
+
+
+@pytest.fixture
+def pool_config():
+    return Config(account="123456_SB1", auth=[_token("a", 1), _token("b", 2)])
+
+
+def test_least_loaded_token_is_picked_within_budgets(pool_config):
+    pool = pool_config.token_pool
+
+    async def acquire(count):
+        return [(await pool.acquire()).auth.token_id for _ in range(count)]
+
+    assert asyncio.run(acquire(3)) == ["a", "b", "b"]
+    assert [token.in_flight for token in pool.tokens] == [1, 2]
+
+
+def test_acquire_waits_for_capacity(pool_config):
+    pool = pool_config.token_pool
+
+    async def run():
+        held = [await pool.acquire() for _ in range(3)]
+        waiter = asyncio.ensure_future(pool.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        await pool.release(held[0])
+        return await asyncio.wait_for(waiter, 1)
+
+    assert asyncio.run(run()).auth.token_id == "a"
+
+
+def test_pool_is_usable_from_several_event_loops(pool_config):
+    pool = pool_config.token_pool
+
+    async def run():
+        held = [await pool.acquire() for _ in range(3)]
+        waiter = asyncio.ensure_future(pool.acquire())
+        await asyncio.sleep(0.01)
+        for token in held:
+            await pool.release(token)
+        await pool.release(await asyncio.wait_for(waiter, 1))
+
+    asyncio.run(run())
+    asyncio.run(run())
+
+    assert [token.in_flight for token in pool.tokens] == [0, 0]
+
+
+def test_failing_token_is_taken_out_of_rotation(pool_config):
+    pool = TokenPool(pool_config.auth, cooldown=0.05)
+
+    async def run():
+        token_a = await pool.acquire()
+        await pool.release(token_a, failed=True)
+        during_cooldown = [await pool.acquire() for _ in range(2)]
+        for token in during_cooldown:
+            await pool.release(token)
+        await asyncio.sleep(0.06)
+        after_cooldown = await pool.acquire()
+        return during_cooldown, after_cooldown
+
+    during_cooldown, after_cooldown = asyncio.run(run())
+
+    assert [token.auth.token_id for token in during_cooldown] == ["b", "b"]
+    assert after_cooldown.auth.token_id == "a"
+    assert after_cooldown.failures == 1
+
+
+def test_rest_requests_are_spread_over_tokens(pool_config):
+    rest_api = NetSuiteRestApi(pool_config)
+    auth = rest_api._auth
+    assert isinstance(auth, TokenPoolAuth)
+    used_tokens = []
+
+    def handler(request):
+        authorization = request.headers["Authorization"]
+        token_id = authorization.split('oauth_token="')[1].split('"')[0]
+        used_tokens.append(token_id)
+        return httpx.Response(429 if token_id == "a" else 200, json={})
+
+    async def run():
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler), auth=auth
+        ) as client:
+            return [
+                (await client.get("https://example.com")).status_code for _ in range(3)
+            ]
+
+    assert asyncio.run(run()) == [429, 200, 200]
+    assert used_tokens == ["a", "b", "b"]
+    assert auth.pool.tokens[0].failures == 1
+
+
+def test_soap_requests_take_a_token_once_they_have_a_slot(pool_config, make_soap_api):
+    pool = pool_config.token_pool
+    tokens_held = []
+
+    async def handler(request):
+        tokens_held.append(sum(token.in_flight for token in pool.tokens))
+        await asyncio.sleep(0.01)
+        if re.search(rb"token>a<", request.content):
+            return httpx.Response(429)
+        return soap_response(GET_LIST_RESPONSE_BODY)
+
+    soap_api = make_soap_api(
+        handler, config=pool_config, concurrent_requests=1, response_mode="builtin"
+    )
+
+    async def run():
+        return await asyncio.gather(
+            *(soap_api.getList("customer", internalIds=[1]) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+
+    # Queued requests don't hold a token while waiting for the slot
+    assert tokens_held == [1, 1, 1]
+    assert sum(isinstance(result, Exception) for result in results) == 1
+    assert [token.failures for token in pool.tokens] == [1, 0]
+    assert [token.in_flight for token in pool.tokens] == [0, 0]
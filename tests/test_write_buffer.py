@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+from netsuite import NetSuiteSoapApi, WriteBuffer, deadline
+from netsuite.deadline import within_deadline
+from netsuite.exceptions import DeadlineExceeded
+from netsuite.soap_api.zeep import ZEEP_INSTALLED
+
+from .test_soap_api import _write_response
+
+pytestmark = pytest.mark.skipif(not ZEEP_INSTALLED, reason="Requires zeep")
+
+
+def _fake_soap_api(dummy_config, calls, delay=0.0):
+    soap_api = NetSuiteSoapApi(dummy_config)
+
+    async def fake_request(service_name, **kw):
+        calls.append((service_name, [record["id"] for record in kw["record"]]))
+        # Like requests, honors the deadline of the context
+        await within_deadline(asyncio.sleep(delay))
+        return {
+            "body": {
+                "writeResponseList": {
+                    "status": None,
+                    "writeResponse": [
+                        _write_response(record, is_success=record["id"] != 3)
+                        for record in kw["record"]
+                    ],
+                }
+            }
+        }
+
+    soap_api.request = fake_request
+    return soap_api
+
+
+def test_writes_are_batched_by_size_and_linger(dummy_config):
+    calls = []
+    soap_api = _fake_soap_api(dummy_config, calls)
+
+    async def run():
+        async with WriteBuffer(soap_api, max_batch_size=3, linger=0.01) as buffer:
+            return await asyncio.gather(
+                *(buffer.upsert({"id": i}) for i in range(4)),
+                buffer.add({"id": 10}),
+            )
+
+    results = asyncio.run(run())
+
+    assert sorted(calls) == [
+        ("addList", [10]),
+        ("upsertList", [0, 1, 2]),
+        ("upsertList", [3]),
+    ]
+    # Each caller gets the result of its own record
+    assert [result.internal_id for result in results] == ["0", "1", "2", None, "10"]
+    assert not results[3].is_success
+
+
+def test_full_buffer_applies_backpressure(dummy_config):
+    calls = []
+    soap_api = _fake_soap_api(dummy_config, calls, delay=0.05)
+
+    async def run():
+        buffer = WriteBuffer(soap_api, max_batch_size=2, linger=10, max_pending=2)
+        first = [asyncio.ensure_future(buffer.update({"id": i})) for i in range(2)]
+        blocked = asyncio.ensure_future(buffer.update({"id": 2}))
+        await asyncio.sleep(0.01)
+        waited = not blocked.done() and buffer._slots.locked()
+        await asyncio.gather(*first)
+        # Takes a slot freed by the first batch
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+        # Sent on close, although `linger` is far from over
+        await buffer.aclose()
+        await blocked
+        with pytest.raises(RuntimeError):
+            await buffer.update({"id": 4})
+        return waited
+
+    assert asyncio.run(run())
+    assert calls == [("updateList", [0, 1]), ("updateList", [2])]
+
+
+def test_failed_batch_fails_all_its_callers(dummy_config):
+    soap_api = NetSuiteSoapApi(dummy_config)
+
+    async def failing_request(service_name, **kw):
+        raise ConnectionError("down")
+
+    soap_api.request = failing_request
+
+    async def run():
+        async with WriteBuffer(soap_api, linger=0) as buffer:
+            return await asyncio.gather(
+                buffer.add({"id": 1}), buffer.add({"id": 2}), return_exceptions=True
+            )
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+
+def test_callers_wait_until_their_own_deadline(dummy_config):
+    calls = []
+    soap_api = _fake_soap_api(dummy_config, calls, delay=0.1)
+
+    async def write_within(buffer, seconds, record):
+        with deadline(seconds):
+            return await buffer.update(record)
+
+    async def run():
+        async with WriteBuffer(soap_api, max_batch_size=2, linger=10) as buffer:
+            return await asyncio.gather(
+                # Starts the batch, but its deadline only applies to its wait
+                write_within(buffer, 0.05, {"id": 0}),
+                write_within(buffer, 1, {"id": 1}),
+                return_exceptions=True,
+            )
+
+    first, second = asyncio.run(run())
+
+    assert isinstance(first, DeadlineExceeded)
+    assert second.internal_id == "1"
+    assert calls == [("updateList", [0, 1])]